@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+"""Run the VoxPDF benchmarks (see voxpdf/bench.py)."""
+
+import sys
+
+from voxpdf.bench import main
+
+sys.exit(main())
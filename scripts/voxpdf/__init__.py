@@ -0,0 +1,22 @@
+"""VoxPDF: PDF document generation for VoxApp.
+
+fpdf is only imported once a document is actually rendered, so importing
+this package (and listing or validating sections) stays cheap.
+"""
+
+from .cache import BuildCache
+from .document import DocumentSpec, build_document, render
+from .spec import SpecError, compile_spec, load_spec
+from .text import Normalized, clean, clean_lines
+
+
+def __getattr__(name):
+    if name == "VoxPDF":
+        from .pdf import VoxPDF
+
+        return VoxPDF
+    if name == "PROJECT_DOCUMENT":
+        from .project import project_document
+
+        return project_document()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,120 @@
+"""Batch generation of per-tenant documents across a process pool.
+
+Tenants are split into chunks and rendered by worker processes. After
+every finished chunk the main process rewrites a manifest in the output
+directory; a rerun skips every tenant whose manifest entry still matches
+its build key and output file, so an interrupted run resumes. A tenant
+that fails to compile or render is logged and left out of the manifest;
+the other tenants of its chunk are still rendered.
+"""
+
+import json
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .cache import BuildCache, atomic_write
+from .tenant import tenant_document
+
+MANIFEST = "manifest.json"
+
+
+def read_businesses(path):
+    """Businesses from a JSON array or a JSONL dump, one row per tenant."""
+    with open(path, encoding="utf-8") as f:
+        if str(path).endswith(".json"):
+            return json.load(f)
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def output_name(business):
+    name = unicodedata.normalize("NFKD", business.get("name") or "tenant")
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+    return f"{slug or 'tenant'}-{str(business.get('id', ''))[:8]}.pdf"
+
+
+def tenant_id(business):
+    """Manifest key of `business`: its id, or its output name without one."""
+    return str(business.get("id") or output_name(business))
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _render_chunk(tenants, out_dir, cache_root):
+    """Worker: render a chunk of (id, file, spec, key); returns (pid,
+    seconds, [(id, file, key, status)]), with the error message in place of
+    the key when the status is "failed"."""
+    start = time.perf_counter()
+    cache = BuildCache(cache_root)
+    done = []
+    for tenant, name, spec, key in tenants:
+        try:
+            _, status = cache.build(spec, os.path.join(out_dir, name))
+        except Exception as e:  # one bad tenant must not end the batch
+            done.append((tenant, name, f"{type(e).__name__}: {e}", "failed"))
+            continue
+        done.append((tenant, name, key, status))
+    return os.getpid(), time.perf_counter() - start, done
+
+
+def run_batch(businesses, out_dir, jobs=None, chunk_size=None, cache_root=None, log=print):
+    """Render one document per business into `out_dir`; returns the manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    cache = BuildCache(cache_root)
+    manifest = load_manifest(out_dir)
+    todo, failed = [], 0
+    for business in businesses:
+        tenant = tenant_id(business)
+        try:
+            spec = tenant_document(business)
+        except Exception as e:  # a bad row: the other tenants still render
+            log(f"  failed {tenant}: {type(e).__name__}: {e}")
+            failed += 1
+            continue
+        key = cache.key(spec)
+        entry = manifest.get(tenant)
+        if (entry and entry["key"] == key
+                and os.path.exists(os.path.join(out_dir, entry["file"]))):
+            continue
+        todo.append((tenant, output_name(business), spec, key))
+    log(f"{len(businesses)} tenants, {len(businesses) - len(todo) - failed} already done,"
+        f" {len(todo)} to render")
+    if not todo:
+        return manifest
+
+    jobs = jobs or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, math.ceil(len(todo) / (jobs * 4)))
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    per_worker = defaultdict(lambda: [0, 0.0])
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_render_chunk, chunk, out_dir, cache.root) for chunk in chunks]
+        for future in as_completed(futures):
+            pid, seconds, done = future.result()
+            for tenant, name, key, status in done:
+                if status == "failed":
+                    log(f"  failed {tenant}: {key}")
+                    failed += 1
+                else:
+                    manifest[tenant] = {"file": name, "key": key}
+            atomic_write(os.path.join(out_dir, MANIFEST),
+                          json.dumps(manifest, indent=1, sort_keys=True).encode())
+            per_worker[pid][0] += len(done)
+            per_worker[pid][1] += seconds
+    elapsed = time.perf_counter() - started
+    for pid, (docs, seconds) in sorted(per_worker.items()):
+        log(f"  worker {pid}: {docs} docs, {docs / seconds:.1f} docs/sec")
+    log(f"{len(todo)} docs in {elapsed:.2f}s, {len(todo) / elapsed:.1f} docs/sec with {jobs} workers"
+        + (f", {failed} failed" if failed else ""))
+    return manifest
@@ -0,0 +1,504 @@
+"""Benchmarks for the VoxPDF hot paths.
+
+The suite (default) measures the drawing primitives, ticket throughput,
+menu booklet layout, transcript and knowledge-base export and full builds,
+and can store its results as a JSON baseline or compare against one;
+--micro runs the old-versus-new implementation comparisons instead, and
+--tickets N only the ticket benchmark.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import textwrap
+import time
+import timeit
+import tracemalloc
+from importlib import metadata
+
+from .text import _translate, clean
+
+
+def chained_clean(text):
+    """The original 16-pass str.replace chain, kept as the baseline."""
+    return (text
+        .replace("\u2014", "-")
+        .replace("\u2013", "-")
+        .replace("\u2018", "'")
+        .replace("\u2019", "'")
+        .replace("\u201c", '"')
+        .replace("\u201d", '"')
+        .replace("\u2026", "...")
+        .replace("\u2022", "*")
+        .replace("\u2192", "->")
+        .replace("\u2190", "<-")
+        .replace("\u2193", "v")
+        .replace("\u2191", "^")
+        .replace("\u2265", ">=")
+        .replace("\u2264", "<=")
+        .replace("\u20ac", "E")
+        .replace("\u00e9", "e")
+    )
+
+
+def sample_lines(n=2000):
+    """Report-like lines: mostly ASCII, some typography, many repeats."""
+    labels = ["Route", "Functie", "Status", "WERKEND", "BASIS", "Bestand"]
+    lines = []
+    for i in range(n):
+        if i % 3 == 0:
+            lines.append(labels[i % len(labels)])
+        elif i % 3 == 1:
+            lines.append(f"Regel {i} — prijs €{i % 250},00 “per maand” → incl. btw…")
+        else:
+            lines.append(f"/api/tenant/{i}/appointments: afspraak opslaan en bevestigen")
+    return lines
+
+
+def bench_clean(number=20):
+    """Time clean() against the chained version; returns seconds per pass."""
+    lines = sample_lines()
+
+    def old():
+        # body_text/table_row, the cell() override and _put_text each cleaned.
+        for line in lines:
+            chained_clean(chained_clean(chained_clean(line)))
+
+    def new():
+        for line in lines:
+            clean(clean(clean(line)))
+
+    def new_cold():
+        _translate.cache_clear()
+        new()
+
+    results = {}
+    for name, fn in (("chained", old), ("clean (cold memo)", new_cold), ("clean", new)):
+        results[name] = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    return results
+
+
+def bench_wrap(number=50):
+    """Time width-based wrap_text() against textwrap on a long paragraph."""
+    from . import metrics
+    from .document import new_pdf
+
+    pdf = new_pdf()
+    pdf.add_page()
+    pdf.set_font("Helvetica", "", 9)
+    paragraph = clean(" ".join(sample_lines(400)))
+    widths = metrics.glyph_widths(pdf.current_font.fontkey)
+    max_units = pdf.text_width() * pdf.k * 1000 / pdf.font_size_pt
+
+    def per_word():
+        # What a naive width-aware wrapper costs: one measurement per candidate.
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if pdf.get_string_width(candidate, normalized=True) > pdf.text_width():
+                line = word
+            else:
+                line = candidate
+
+    results = {}
+    for name, fn in (
+        ("textwrap (chars)", lambda: textwrap.wrap(paragraph, width=95)),
+        ("get_string_width", per_word),
+        ("metrics.wrap", lambda: metrics.wrap(paragraph, max_units, widths)),
+    ):
+        results[name] = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    return results
+
+
+def bench_table(rows=2000):
+    """Rows per second through table_row(), wrapped and truncated."""
+    from .document import new_pdf
+
+    results = {}
+    for name, wrap in (("table_row wrap", True), ("table_row truncate", False)):
+        pdf = new_pdf()
+        pdf.add_page()
+        widths = [35, 35, 110]
+        pdf.table_row(["Tabel", "Scope", "Kolommen"], widths, bold=True)
+        start = timeit.default_timer()
+        for i in range(rows):
+            pdf.table_row([f"tabel_{i}", "Per tenant", "id, business_id, " * (i % 12)],
+                          widths, wrap=wrap)
+        results[name] = (timeit.default_timer() - start) / rows
+    return results
+
+
+def synthetic_orders(n):
+    """Lazily generated `orders` rows, as read_rows() would yield them."""
+    for i in range(n):
+        yield {
+            "created_at": f"2026-02-{i % 28 + 1:02d}T18:{i % 60:02d}:00Z",
+            "customer_name": f"Klant {i}",
+            "order_type": "delivery" if i % 3 else "pickup",
+            "status": "completed",
+            "total_amount": f"{i % 90}.50",
+            "notes": "extra saus, zonder ui " * (i % 4),
+        }
+
+
+def stream_peak(rows):
+    """Peak traced memory (bytes) of a streaming export of `rows` rows."""
+    from .stream import TABLES, stream_table
+
+    with open(os.devnull, "wb") as sink:
+        stream_table(synthetic_orders(10), TABLES["orders"][1], sink)  # warm imports
+        tracemalloc.start()
+        try:
+            stream_table(synthetic_orders(rows), TABLES["orders"][1], sink)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def bench_stream_memory(sizes=(1_000, 20_000)):
+    """Peak memory must not grow with the number of streamed rows."""
+    peaks = {n: stream_peak(n) for n in sizes}
+    for n, peak in peaks.items():
+        print(f"  {n:>9,} rows  peak {peak / 1024:8.0f} KiB")
+    smallest = peaks[min(sizes)]
+    assert max(peaks.values()) < 2 * smallest, "streaming export memory grows with rows"
+    return peaks
+
+
+PARAGRAPH = (
+    "VoxApp beantwoordt elke oproep met een AI receptionist die afspraken "
+    "inplant, bestellingen opneemt en vragen over openingsuren beantwoordt. "
+    "Gesprekken worden samengevat en per tenant bewaard in de database. "
+) * 2
+CODE = "\n".join(
+    f"const r{i} = await supabase.from('appointments').select('*').eq('business_id', id);"
+    for i in range(8)
+)
+
+# Higher is better for rates, lower for everything else.
+RATES = ("ops_per_sec", "pages_per_sec")
+
+
+def _rate(fn, number, repeat=5):
+    return number / min(timeit.repeat(fn, number=number, repeat=repeat))
+
+
+def bench_primitives():
+    """Calls per second of clean() and the VoxPDF drawing primitives."""
+    from .document import new_pdf
+
+    pdf = new_pdf()
+    pdf.add_page()
+    lines = sample_lines(200)
+    widths = [35, 35, 110]
+    row = ["appointments", "Per tenant", "id, business_id, start_time, end_time, status " * 2]
+
+    def clean_lines():
+        _translate.cache_clear()
+        for line in lines:
+            clean(line)
+
+    return {
+        "clean": {"ops_per_sec": _rate(clean_lines, 20) * len(lines)},
+        "body_text": {"ops_per_sec": _rate(lambda: pdf.body_text(PARAGRAPH), 200)},
+        "bullet": {"ops_per_sec": _rate(lambda: pdf.bullet(PARAGRAPH), 200)},
+        "code_block": {"ops_per_sec": _rate(lambda: pdf.code_block(CODE), 200)},
+        "table_row": {"ops_per_sec": _rate(lambda: pdf.table_row(row, widths), 1000)},
+    }
+
+
+def synthetic_spec(pages):
+    """Spec data for a document of about `pages` pages, one section each."""
+    sections = []
+    for n in range(pages):
+        sections.append({"name": f"sectie-{n}", "blocks": [
+            {"page": True},
+            {"section_header": f"{n + 1}. SECTIE {n + 1}"},
+            {"body_text": PARAGRAPH},
+            {"bullets": ["Afspraken inplannen", "Bestellingen opnemen", "Vragen beantwoorden"]},
+            {"code_block": CODE},
+            {"table": {"widths": [35, 35, 110], "header": ["Tabel", "Scope", "Kolommen"],
+                       "rows": [[f"tabel_{n}_{i}", "Per tenant", "id, business_id, status"]
+                                for i in range(10)]}},
+        ]})
+    return {"name": f"benchmark {pages}", "sections": sections}
+
+
+def bench_build(pages, repeat=3):
+    """Full render + serialisation of a `pages` page synthetic document."""
+    from .document import render_bytes
+    from .spec import compile_spec
+
+    spec = compile_spec(synthetic_spec(pages))
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = render_bytes(spec)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        render_bytes(spec)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    count = data.count(b"/Type /Page\n")
+    return {
+        "pages": count,
+        "pages_per_sec": count / elapsed,
+        "peak_bytes": peak,
+        "output_bytes": len(data),
+    }
+
+
+SNACKS_MENU = "public/snacks-menu.csv"
+
+
+def menu_items(path=None):
+    """(name, price) rows of the snacks menu CSV."""
+    import csv
+
+    from .sources import REPO_ROOT
+
+    with open(path or REPO_ROOT / SNACKS_MENU, encoding="utf-8", newline="") as f:
+        return [(row["naam"], float(row["prijs"])) for row in csv.DictReader(f)]
+
+
+def synthetic_tickets(n, menu):
+    """Orders of 1-6 snacks from `menu`, with sauces and notes here and there."""
+    for i in range(n):
+        yield {
+            "id": f"{i:08x}-0000-4000-8000-000000000000",
+            "business_name": "Frituur Nolim",
+            "customer_name": f"Klant {i}",
+            "customer_phone": f"+32 470 {i % 100:02d} {i % 97:02d} {i % 89:02d}",
+            "delivery_type": "delivery" if i % 3 == 0 else "pickup",
+            "delivery_time": f"{18 + i % 4}:{i % 4 * 15:02d}",
+            "customer_address": "Kerkstraat 12, 2000 Antwerpen",
+            "items": [{
+                "product_name": menu[(i * 7 + j * 3) % len(menu)][0],
+                "quantity": 1 + (i + j) % 3,
+                "price": menu[(i * 7 + j * 3) % len(menu)][1],
+                "options": ["Mayonaise", {"name": "Stoofvlees saus", "price": 2.5}][:(i + j) % 3],
+                "notes": "goed gebakken" if (i + j) % 5 == 0 else None,
+            } for j in range(1 + i % 6)],
+            "notes": "Bel aan bij de achterdeur" if i % 7 == 0 else None,
+            "created_at": f"2026-02-27T18:{i % 60:02d}:00Z",
+        }
+
+
+def bench_tickets(count=2000):
+    """Kitchen tickets and receipts from one warm TicketPrinter, for orders
+    built from the snacks menu: tickets per second and latency per ticket."""
+    from .tickets import KINDS, TicketPrinter
+
+    printer = TicketPrinter()
+    orders = list(synthetic_tickets(count, menu_items()))
+    printer.render(orders[0])  # warm imports and tables
+    times = []
+    for i, order in enumerate(orders):
+        start = time.perf_counter()
+        printer.render(order, KINDS[i % len(KINDS)])
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "ops_per_sec": len(times) / sum(times),
+        "p50_ms": times[len(times) // 2] * 1e3,
+        "p99_ms": times[len(times) * 99 // 100] * 1e3,
+    }
+
+
+def synthetic_calls(n, turns=12, words=30):
+    """Lazily generated `conversations` rows with ElevenLabs transcripts."""
+    vocabulary = PARAGRAPH.split()
+    for i in range(n):
+        yield {
+            "business_id": "b1",
+            "customer_phone": f"+32 470 {i % 100:02d} {i % 97:02d} {i % 89:02d}",
+            "duration_seconds": 60 + i % 300,
+            "status": "completed",
+            "created_at": f"2026-02-{i % 28 + 1:02d}T18:{i % 60:02d}:00Z",
+            "summary": " ".join(vocabulary[i % 20:i % 20 + 15]),
+            "transcript": [{
+                "role": ("agent", "user")[t % 2],
+                "time_in_call_secs": 7 * t,
+                "message": " ".join(vocabulary[(i + t + k) % len(vocabulary)] for k in range(words)),
+            } for t in range(turns)],
+        }
+
+
+def bench_transcripts(calls=300):
+    """A transcript archive of `calls` calls, streamed to /dev/null: pages
+    per second, and the time per call at a tenth of the calls, which should
+    stay the same (the export is linear in its input)."""
+    from .transcripts import stream_transcripts
+
+    with open(os.devnull, "wb") as sink:
+        stream_transcripts(synthetic_calls(5), sink)  # warm imports
+        per_call = []
+        for n in (calls // 10, calls):
+            start = time.perf_counter()
+            _, pages = stream_transcripts(synthetic_calls(n), sink)
+            seconds = time.perf_counter() - start
+            per_call.append(seconds / n)
+    return {"pages_per_sec": pages / seconds, "pages": pages,
+            "ms_per_call": per_call[1] * 1e3, "ms_per_call_small": per_call[0] * 1e3}
+
+
+def synthetic_knowledge(n):
+    """knowledge_base rows like the garage import: brand, part, action."""
+    vocabulary = PARAGRAPH.split()
+    brands = ("BMW", "Audi", "Opel", "Peugeot", "Toyota", "Volvo")
+    parts = ("remblokken", "distributieriem", "koppeling", "uitlaat", "airco", "accu")
+    for i in range(n):
+        brand, part = brands[i % 6], parts[i // 6 % 6]
+        yield {
+            "id": f"kb{i}",
+            "category": ("onderhoud", "prijzen", "faq", "diensten")[i % 4],
+            "title": f"{brand} {part} vervangen",
+            "content": f"Wat kost het om de {part} van een {brand} te vervangen? "
+                       + " ".join(vocabulary[(i + k) % len(vocabulary)] for k in range(i % 60)),
+            "updated_at": "2026-03-01T10:00:00Z",
+        }
+
+
+def bench_knowledge(entries=5000):
+    """A knowledge booklet of `entries` entries, first without stored
+    layouts and then from them: entries per second re-exported, and both
+    times."""
+    from .knowledge import LayoutStore, knowledge_booklet
+
+    rows = list(synthetic_knowledge(entries))
+    store = LayoutStore("bench")
+    store.stored = {}  # kept in memory only
+    knowledge_booklet(rows[:20])  # warm imports
+    times = []
+    for _ in range(2):
+        start = time.perf_counter()
+        pdf, _ = knowledge_booklet(rows, store=store)
+        bytes(pdf.output())
+        times.append(time.perf_counter() - start)
+        store.stored, store.entries = store.entries, {}
+    return {"ops_per_sec": entries / times[1], "cold_ms": times[0] * 1e3,
+            "warm_ms": times[1] * 1e3}
+
+
+def bench_menu(items=5000):
+    """A menu booklet of `items` items in 25 categories, from the snacks menu
+    with descriptions and options: items laid out per second."""
+    from .menu import menu_booklet
+
+    menu = menu_items()
+    booklet = {"title": "Frituur Nolim", "items": [{
+        "category": f"Categorie {i % 25}",
+        "name": f"{menu[i % len(menu)][0]} {i}",
+        "price": menu[i % len(menu)][1],
+        "description": "Met saus naar keuze en een portie friet" if i % 4 == 0 else None,
+        "options": [{"name": "Extra saus", "price": 0.8}] if i % 6 == 0 else [],
+    } for i in range(items)]}
+    menu_booklet(booklet)  # warm imports and tables
+    start = time.perf_counter()
+    pdf = menu_booklet(booklet)
+    data = bytes(pdf.output())
+    seconds = time.perf_counter() - start
+    return {"ops_per_sec": items / seconds, "pages": pdf.pages_count, "output_bytes": len(data)}
+
+
+def run_suite(pages=(10, 100, 1000)):
+    from .cache import generator_version
+
+    results = bench_primitives()
+    results["ticket"] = bench_tickets()
+    results["menu"] = bench_menu()
+    results["transcripts"] = bench_transcripts()
+    results["knowledge"] = bench_knowledge()
+    for n in pages:
+        results[f"build_{n}"] = bench_build(n)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "fpdf2": metadata.version("fpdf2"),
+            "generator": generator_version(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Regressions beyond `threshold` (a fraction) as readable lines."""
+    regressions = []
+    for name, metrics_ in current["results"].items():
+        base = baseline["results"].get(name, {})
+        for metric, value in metrics_.items():
+            old = base.get(metric)
+            if not old or metric == "pages":
+                continue
+            change = (old - value) / old if metric in RATES else (value - old) / old
+            if change > threshold:
+                regressions.append(f"{name}.{metric}: {old:,.1f} -> {value:,.1f} ({change:+.0%} worse)")
+    return regressions
+
+
+def print_suite(suite):
+    for name, metrics_ in suite["results"].items():
+        print(f"  {name:<12} " + "  ".join(
+            f"{k} {v:,.1f}" if isinstance(v, float) else f"{k} {v:,}" for k, v in metrics_.items()
+        ))
+
+
+def report(title, results):
+    print(title)
+    base = next(iter(results.values()))
+    for name, secs in results.items():
+        print(f"  {name:<20} {secs * 1e3:8.3f} ms/pass  {base / secs:5.1f}x")
+
+
+def micro():
+    report("clean()", bench_clean())
+    report("wrap", bench_wrap())
+    report("table (per row)", bench_table())
+    print("streaming export")
+    bench_stream_memory()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the VoxPDF generator.")
+    parser.add_argument("--micro", action="store_true",
+                        help="run the implementation comparisons instead of the suite")
+    parser.add_argument("--pages", default="10,100,1000",
+                        help="page counts for the full builds (default: %(default)s)")
+    parser.add_argument("--tickets", type=int, metavar="N",
+                        help="run only the ticket benchmark, over N orders")
+    parser.add_argument("--save", metavar="JSON", help="store the results as a baseline")
+    parser.add_argument("--compare", metavar="JSON", help="compare against a stored baseline")
+    parser.add_argument("--threshold", type=float, default=15,
+                        help="regression threshold in percent for --compare (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.micro:
+        micro()
+        return 0
+    if args.tickets:
+        print_suite({"results": {"ticket": bench_tickets(args.tickets)}})
+        return 0
+    suite = run_suite(tuple(int(n) for n in args.pages.split(",")))
+    print_suite(suite)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(suite, f, indent=2, sort_keys=True)
+        print(f"Baseline saved: {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, suite, args.threshold / 100)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions over {args.threshold:g}% against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
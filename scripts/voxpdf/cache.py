@@ -0,0 +1,130 @@
+"""Content-addressed build cache for rendered documents.
+
+The key covers everything that can change the output bytes: the spec
+source, the selected sections, the generator code, the fpdf version, the
+font and image files and the document date. Rendering is deterministic (see
+document.creation_date), so a key that was built before maps to exactly
+the bytes that a new render would produce.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+from .document import creation_date, render_bytes, write_output
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.environ.get("VOXPDF_CACHE_DIR") or os.path.join(base, "voxpdf")
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def generator_version():
+    """Hash of the voxpdf sources and the fpdf version, computed once per process."""
+    from importlib import metadata
+
+    h = hashlib.sha256(f"fpdf2 {metadata.version('fpdf2')}".encode())
+    for name in sorted(os.listdir(PACKAGE_DIR)):
+        if name.endswith(".py"):
+            h.update(name.encode())
+            h.update(file_digest(os.path.join(PACKAGE_DIR, name)).encode())
+    return h.hexdigest()
+
+
+def atomic_write(path, data):
+    """Write the bytes `data` to `path` through a temporary file, so that
+    readers see the old file or the new one, never a partial write."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class BuildCache:
+    """Stores rendered PDFs under their build key and remembers which key
+    every output path was last written from."""
+
+    def __init__(self, root=None):
+        self.root = root or default_cache_dir()
+
+    def key(self, spec, sections=None, jobs=None):
+        """Build key for `spec`, or None when the spec has no source digest."""
+        if spec.digest is None:
+            return None
+        parts = {
+            "spec": spec.digest,
+            "sections": sorted(sections) if sections is not None else None,
+            "generator": generator_version(),
+            "fonts": [file_digest(p) for p in spec.fonts],
+            "images": [file_digest(p) for p in sorted({r[0] for r in spec.images})],
+            "date": creation_date().isoformat(),
+            # A parallel render merges pages and differs in bytes, not looks.
+            "parallel": jobs is not None and jobs > 1,
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def artifact_path(self, key):
+        return os.path.join(self.root, "artifacts", key[:2], key + ".pdf")
+
+    def _stamp_path(self, out):
+        name = hashlib.sha1(os.path.abspath(out).encode()).hexdigest()
+        return os.path.join(self.root, "outputs", name + ".json")
+
+    def _is_current(self, out, key):
+        try:
+            with open(self._stamp_path(out)) as f:
+                stamp = json.load(f)
+            st = os.stat(out)
+        except (OSError, ValueError):
+            return False
+        return stamp == {"key": key, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def _stamp(self, out, key):
+        st = os.stat(out)
+        stamp = {"key": key, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        atomic_write(self._stamp_path(out), json.dumps(stamp).encode())
+
+    def build(self, spec, out=None, sections=None, jobs=None):
+        """Like build_document(); returns (result, status) where status is
+        'unchanged' (nothing rendered or written), 'cached' or 'rendered'."""
+        key = self.key(spec, sections, jobs)
+        if key is None:
+            selected = spec.select(sections) if sections is not None else spec
+            return write_output(render_bytes(selected, jobs), out), "rendered"
+        is_path = out is not None and not hasattr(out, "write")
+        if is_path and self._is_current(out, key):
+            return os.fspath(out), "unchanged"
+        artifact = self.artifact_path(key)
+        if os.path.exists(artifact):
+            status = "cached"
+            if is_path:
+                os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+                shutil.copyfile(artifact, out)
+                result = os.fspath(out)
+            else:
+                with open(artifact, "rb") as f:
+                    result = write_output(f.read(), out)
+        else:
+            status = "rendered"
+            selected = spec.select(sections) if sections is not None else spec
+            data = render_bytes(selected, jobs)
+            atomic_write(artifact, data)
+            result = write_output(data, out)
+        if is_path:
+            self._stamp(out, key)
+        return result, status
@@ -0,0 +1,263 @@
+"""Command line interface for the VoxApp PDF documents."""
+
+import argparse
+import sys
+from functools import partial
+from pathlib import Path
+
+from .fonts import FAMILIES
+from .i18n import LANGUAGES
+from .project import SPEC_PATH
+from .sources import REPO_ROOT
+from .spec import SpecError, load_spec
+from .stream import TABLES
+
+DEFAULT_OUTPUT = REPO_ROOT / "docs" / "VOXAPP_PROJECTDOCUMENT.pdf"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the VoxApp project document PDF.")
+    parser.add_argument("-o", "--output",
+                        help=f"output path, '-' for stdout (default: {DEFAULT_OUTPUT},"
+                             " or the input name with .pdf for --export, --transcripts,"
+                             " --knowledge and --menu)")
+    parser.add_argument("--spec", default=SPEC_PATH,
+                        help="document spec (JSON/TOML/YAML) to render (default: %(default)s)")
+    parser.add_argument("--sections",
+                        help="comma separated section names to render (default: all)")
+    parser.add_argument("--list-sections", action="store_true",
+                        help="print the available sections and exit")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always render, bypassing the build cache")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PREFIX",
+                        help="render without the cache and write a per-section profile to"
+                             " PREFIX.json and PREFIX.folded (default: next to the output)")
+    parser.add_argument("--lang", metavar="LANGS",
+                        help="comma separated languages (%s) or 'all': render one document"
+                             " per language, as OUTPUT.<lang>.pdf" % ", ".join(LANGUAGES))
+    parser.add_argument("--font", choices=sorted(FAMILIES),
+                        help="draw with a Unicode TrueType font family instead of the"
+                             " latin-1 core fonts (default: the spec's \"font\", if any)")
+    parser.add_argument("--export", choices=sorted(TABLES),
+                        help="stream a table dump (--input) to a PDF instead")
+    parser.add_argument("--input", help="CSV or JSONL dump for --export")
+    parser.add_argument("--transcripts", metavar="DUMP",
+                        help="conversations dump (JSONL or CSV): stream the call transcripts to"
+                             " a PDF with a term index")
+    parser.add_argument("--knowledge", metavar="DUMP",
+                        help="knowledge_base dump (JSONL, CSV or a JSON item list): a booklet by"
+                             " category without near-duplicates, with a keyword index")
+    parser.add_argument("--business", metavar="ID",
+                        help="only the rows of this business id, for --transcripts and --knowledge")
+    parser.add_argument("--month", metavar="YYYY-MM",
+                        help="only the calls of this month, for --transcripts")
+    parser.add_argument("--batch", metavar="DUMP",
+                        help="businesses dump (JSON/JSONL with services and staff):"
+                             " render one onboarding document per tenant")
+    parser.add_argument("--tickets", metavar="ORDERS",
+                        help="orders (JSON, or JSON lines; '-' reads lines from stdin as they"
+                             " arrive): write kitchen tickets and receipts to --out-dir")
+    parser.add_argument("--ticket-kind", choices=("kitchen", "receipt", "both"), default="both",
+                        help="tickets to write per order for --tickets (default: %(default)s)")
+    parser.add_argument("--menu", nargs="+", metavar="PATH",
+                        help="menu files (CSV, SQL with menu_items inserts, or JSON) to lay out"
+                             " as one menu booklet, by category")
+    parser.add_argument("--columns", type=int, default=2,
+                        help="columns per page for --menu (default: %(default)s)")
+    parser.add_argument("--markdown", nargs="+", metavar="PATH",
+                        help="render Markdown files (directories: every .md below them)"
+                             " to PDFs next to the source, or in --out-dir under their path"
+                             " relative to the current directory")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and rebuild the document (or the --markdown files)"
+                             " whenever its spec or source files change; stop with Ctrl-C")
+    parser.add_argument("--out-dir",
+                        help="output directory for --batch, --tickets and --markdown")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="worker processes: for --batch and --lang (default: CPU count), or"
+                             " to render the sections of one document in parallel (default: 1)")
+    parser.add_argument("--chunk-size", type=int,
+                        help="tenants per worker task for --batch (default: automatic)")
+    args = parser.parse_args(argv)
+    if args.export and not args.input:
+        parser.error("--export needs --input")
+    if args.batch and not args.out_dir:
+        parser.error("--batch needs --out-dir")
+    if args.tickets and not args.out_dir:
+        parser.error("--tickets needs --out-dir")
+    if args.columns < 1:
+        parser.error("--columns must be at least 1")
+    if args.business and not (args.transcripts or args.knowledge):
+        parser.error("--business selects rows for --transcripts or --knowledge")
+    if args.month and not args.transcripts:
+        parser.error("--month selects calls for --transcripts")
+    if args.watch and (args.batch or args.export or args.transcripts or args.knowledge
+                       or args.tickets or args.menu or args.profile is not None or args.output == "-"):
+        parser.error("--watch builds a document file or --markdown files")
+    if args.lang:
+        args.lang = list(LANGUAGES) if args.lang == "all" else [
+            lang.strip() for lang in args.lang.split(",") if lang.strip()]
+        unknown = [lang for lang in args.lang if lang not in LANGUAGES]
+        if unknown:
+            parser.error(f"unknown language(s): {', '.join(unknown)}")
+        if args.watch and len(args.lang) > 1:
+            parser.error("--watch takes one language")
+    try:
+        args.document = load_spec(args.spec, font=args.font)
+        if args.sections is not None:
+            args.sections = [s.strip() for s in args.sections.split(",") if s.strip()]
+            args.document.select(args.sections)
+    except (OSError, SpecError, ValueError) as e:
+        parser.error(str(e))
+    return args
+
+
+def _until_interrupted(fn, *args):
+    try:
+        fn(*args)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        return run(args)
+    except SpecError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+
+def run(args):
+    """Carry out the parsed command line `args`; returns the exit status."""
+    if args.list_sections:
+        for name in args.document.names():
+            print(name)
+        return 0
+    if args.batch:
+        from .batch import read_businesses, run_batch
+
+        run_batch(read_businesses(args.batch), args.out_dir, args.jobs, args.chunk_size)
+        return 0
+    if args.tickets:
+        from .tickets import KINDS, print_tickets, read_orders
+
+        kinds = KINDS if args.ticket_kind == "both" else (args.ticket_kind,)
+        source = sys.stdin if args.tickets == "-" else args.tickets
+        log = partial(print, flush=True)
+        return _until_interrupted(print_tickets, read_orders(source), args.out_dir, kinds, None, log)
+    if args.menu:
+        from .menu import build_menu
+
+        output = args.output or str(Path(args.menu[0]).with_suffix(".pdf"))
+        out = sys.stdout.buffer if output == "-" else output
+        try:
+            items, pages = build_menu(args.menu, out, args.columns,
+                                      args.lang[0] if args.lang else None)
+        except (OSError, ValueError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        if output != "-":
+            print(f"PDF generated: {output} ({items} items, {pages} pages)")
+        return 0
+    if args.markdown:
+        from .markdown import render_markdown
+
+        if args.watch:
+            from .watch import watch_markdown
+
+            return _until_interrupted(watch_markdown, args.markdown, args.out_dir, args.font)
+        render_markdown(args.markdown, args.out_dir, font=args.font)
+        return 0
+    if args.export:
+        from .stream import export_table
+
+        output = args.output or str(Path(args.input).with_suffix(".pdf"))
+        out = sys.stdout.buffer if output == "-" else output
+        try:
+            pages = export_table(args.export, args.input, out)
+        except (OSError, ValueError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        if output != "-":
+            print(f"PDF generated: {output} ({pages} pages)")
+        return 0
+    if args.transcripts:
+        from .transcripts import export_transcripts
+
+        output = args.output or str(Path(args.transcripts).with_suffix(".pdf"))
+        out = sys.stdout.buffer if output == "-" else output
+        try:
+            calls, pages = export_transcripts(args.transcripts, out, args.business, args.month)
+        except (OSError, ValueError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        if output != "-":
+            print(f"PDF generated: {output} ({calls} calls, {pages} pages)")
+        return 0
+    if args.knowledge:
+        from .knowledge import build_knowledge
+
+        output = args.output or str(Path(args.knowledge).with_suffix(".pdf"))
+        out = sys.stdout.buffer if output == "-" else output
+        try:
+            stats, _ = build_knowledge(args.knowledge, out, args.business,
+                                       args.lang[0] if args.lang else None, args.font,
+                                       cache=not args.no_cache)
+        except (OSError, ValueError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        if output != "-":
+            print(f"PDF generated: {output} ({stats['entries']} entries,"
+                  f" {stats['duplicates']} near-duplicates left out,"
+                  f" {stats['laid_out']} laid out, {stats['pages']} pages)")
+        return 0
+    if args.output is None:
+        args.output = str(DEFAULT_OUTPUT)
+    if args.watch:
+        from .watch import watch
+
+        return _until_interrupted(watch, args.spec, args.output, args.sections,
+                                  args.lang[0] if args.lang else None, args.font)
+    if args.lang:
+        if args.output == "-":
+            print("--lang writes one file per language; pass -o with a file name", file=sys.stderr)
+            return 2
+        from .i18n import build_languages
+
+        for lang, output, status in build_languages(
+                args.spec, args.lang, args.output, args.sections, args.jobs, not args.no_cache,
+                args.font):
+            print(f"PDF {'up to date' if status == 'unchanged' else 'generated'} ({lang}): {output}")
+        return 0
+    out = sys.stdout.buffer if args.output == "-" else args.output
+    if args.profile is not None:
+        from .profiling import profile_document
+
+        spec = args.document.select(args.sections) if args.sections else args.document
+        prefix = args.profile or str(Path(args.output).with_suffix("")) + ".profile"
+        if args.output == "-" and not args.profile:
+            prefix = "profile"
+        profiler = profile_document(spec, out, prefix)
+        print(profiler.summary(), file=sys.stderr)
+        print(f"Profile written: {prefix}.json, {prefix}.folded", file=sys.stderr)
+        return 0
+    if args.jobs and args.jobs > 1 and not args.document.splittable:
+        print("warning: --jobs ignored, a document with embedded fonts or images"
+              " is rendered in one process", file=sys.stderr)
+    if args.no_cache:
+        from .document import build_document
+
+        build_document(args.document, out=out, sections=args.sections, jobs=args.jobs)
+        status = "rendered"
+    else:
+        from .cache import BuildCache
+
+        _, status = BuildCache().build(args.document, out, args.sections, args.jobs)
+    if args.output != "-":
+        if status == "unchanged":
+            print(f"PDF up to date: {args.output}")
+        else:
+            print(f"PDF generated: {args.output}" + (" (from cache)" if status == "cached" else ""))
+    return 0
@@ -0,0 +1,140 @@
+"""Document specs and the build_document() entry point."""
+
+import os
+from datetime import datetime, timezone
+
+
+class DocumentSpec:
+    """An ordered set of named sections; each section draws onto a VoxPDF."""
+
+    def __init__(self, name, sections, digest=None, fonts=(), page_breaks=(), language=None,
+                 font=None, images=(), logo=None, section_digests=None, inputs=(),
+                 toc=None):
+        self.name = name
+        self.sections = dict(sections)
+        # Content hash of the spec source; None for specs built from code,
+        # which the build cache cannot key.
+        self.digest = digest
+        self.fonts = tuple(fonts)
+        # Sections that open with a new page; see parallel.py.
+        self.page_breaks = frozenset(page_breaks)
+        # Language of the page header and footer; None for the default.
+        self.language = language
+        # Unicode font family drawn with instead of the core fonts; see fonts.py.
+        self.font = font
+        # (path, width, height) of every image drawn, see images.py, and the
+        # (path, height) of the page header logo.
+        self.images = tuple(images)
+        self.logo = logo
+        # Content hash per section, and the source files (glob patterns
+        # below the repository root) generated sections were built from;
+        # see watch.py.
+        self.section_digests = dict(section_digests or {})
+        self.inputs = tuple(inputs)
+        # (section, depth, entries) of the table of contents, or None.
+        self.toc = toc
+
+    @property
+    def splittable(self):
+        """Whether sections can be drawn apart and their pages stitched
+        together (see parallel.py): not with embedded fonts or images, which
+        the stitch does not carry over."""
+        return not (self.fonts or self.images)
+
+    def names(self):
+        return list(self.sections)
+
+    def select(self, names):
+        """Spec limited to `names`, kept in document order."""
+        unknown = [n for n in names if n not in self.sections]
+        if unknown:
+            raise ValueError(f"Unknown section(s): {', '.join(unknown)}")
+        wanted = set(names)
+        return DocumentSpec(
+            self.name, [(n, fn) for n, fn in self.sections.items() if n in wanted],
+            self.digest, self.fonts, self.page_breaks, self.language,
+            self.font, self.images, self.logo,
+            {n: d for n, d in self.section_digests.items() if n in wanted}, self.inputs,
+            self.toc if self.toc and self.toc[0] in wanted else None,
+        )
+
+
+def creation_date():
+    """Fixed document date, so identical inputs give identical bytes.
+
+    Follows the reproducible-builds SOURCE_DATE_EPOCH convention.
+    """
+    epoch = int(os.environ.get("SOURCE_DATE_EPOCH", "0"))
+    return datetime.fromtimestamp(epoch, timezone.utc)
+
+
+def new_pdf(language=None, font=None, cls=None):
+    """A VoxPDF (or a `cls` subclass) with the page setup shared by all
+    documents."""
+    if cls is None:
+        from .pdf import VoxPDF
+
+        cls = VoxPDF
+    pdf = cls()
+    if language is not None:
+        pdf.language = language
+    if font is not None:
+        pdf.use_fonts(font)
+    pdf.set_creation_date(creation_date())
+    pdf.alias_nb_pages()
+    pdf.set_auto_page_break(auto=True, margin=20)
+    return pdf
+
+
+def spec_pdf(spec):
+    """new_pdf() set up for `spec`, with its images prepared up front."""
+    if spec.images:
+        from .images import preload
+
+        preload(spec.images)
+    pdf = new_pdf(spec.language, spec.font)
+    pdf.logo = spec.logo
+    return pdf
+
+
+def render(spec, pdf=None):
+    """Draw every section of `spec`; returns the VoxPDF."""
+    if pdf is None:
+        pdf = spec_pdf(spec)
+    for draw in spec.sections.values():
+        draw(pdf)
+    return pdf
+
+
+def render_bytes(spec, jobs=None):
+    """PDF bytes for `spec`; with jobs > 1 sections render in parallel."""
+    if jobs is not None and jobs > 1:
+        from .parallel import render_parallel
+
+        return bytes(render_parallel(spec, jobs).output())
+    return bytes(render(spec).output())
+
+
+def write_output(data, out):
+    """Write PDF bytes to a path or file object; with out=None return them."""
+    if out is None:
+        return data
+    if hasattr(out, "write"):
+        out.write(data)
+        return out
+    with open(out, "wb") as f:
+        f.write(data)
+    return os.fspath(out)
+
+
+def build_document(spec, out=None, sections=None, cache=None, jobs=None):
+    """Render `spec` (optionally only `sections`) to bytes, a path or a file.
+
+    With a BuildCache, unchanged documents are served from the cache. With
+    jobs > 1 the sections are rendered by that many worker processes.
+    """
+    if cache is not None:
+        return cache.build(spec, out, sections, jobs)[0]
+    if sections is not None:
+        spec = spec.select(sections)
+    return write_output(render_bytes(spec, jobs), out)
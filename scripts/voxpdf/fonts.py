@@ -0,0 +1,161 @@
+"""Unicode TrueType fonts for VoxPDF.
+
+A spec with "font": "dejavu" (or generate-pdf.py --font dejavu) draws with
+DejaVu Sans, and DejaVu Sans Mono for code, instead of the latin-1 core
+fonts, so accents, the euro sign and other symbols are kept as they are.
+fpdf2 embeds only the glyphs a document uses.
+
+The fonts are not shipped with the package: the files are looked up in
+VOXPDF_FONT_DIR, voxpdf/fonts and the usual system font directories
+(Debian and Ubuntu install them with the fonts-dejavu-core package).
+
+Reading the character map and glyph widths of a TTF costs about 60-100 ms
+per face. Documents register their faces with fpdf2's add_font(), which
+parses the face for every document that draws with it: the fonts are not
+parsed once per process. What text normalization and line breaking need
+(the character set and the glyph widths) is stored on disk under the
+SHA-256 of the font file and the fpdf2 version, so those never parse the
+font after the first time, and a build that the build cache already has
+does not touch the font files at all.
+"""
+
+import json
+import os
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+from .cache import atomic_write, default_cache_dir, file_digest
+from .text import cleaner
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+METRICS_VERSION = 2
+
+# Searched in order; VOXPDF_FONT_DIR goes first when set.
+FONT_DIRS = (
+    PACKAGE_DIR / "fonts",
+    Path("/usr/share/fonts/truetype/dejavu"),
+    Path("/usr/share/fonts/dejavu"),
+    Path("/usr/local/share/fonts"),
+    Path.home() / ".fonts",
+    Path("/Library/Fonts"),
+)
+
+# Font files per core family and style the VoxPDF house style uses.
+FAMILIES = {
+    "dejavu": {
+        "helvetica": {
+            "": "DejaVuSans.ttf",
+            "B": "DejaVuSans-Bold.ttf",
+            "I": "DejaVuSans-Oblique.ttf",
+            "BI": "DejaVuSans-BoldOblique.ttf",
+        },
+        "courier": {
+            "": "DejaVuSansMono.ttf",
+            "B": "DejaVuSansMono-Bold.ttf",
+            "I": "DejaVuSansMono-Oblique.ttf",
+            "BI": "DejaVuSansMono-BoldOblique.ttf",
+        },
+    },
+}
+
+# Style to use when a face is not installed, in order of preference.
+STYLE_FALLBACKS = {"": ("",), "B": ("B", ""), "I": ("I", ""), "BI": ("BI", "B", "I", "")}
+
+
+def font_dirs():
+    extra = os.environ.get("VOXPDF_FONT_DIR")
+    return ((Path(extra),) if extra else ()) + FONT_DIRS
+
+
+def find_font(name):
+    """Path of the font file `name` in the font directories, or None."""
+    for directory in font_dirs():
+        path = directory / name
+        if path.is_file():
+            return path
+    return None
+
+
+@lru_cache(maxsize=None)
+def resolve(family):
+    """{(core family, style): (font path, style of that file)} for `family`;
+    styles without a file of their own use the closest installed face."""
+    if family not in FAMILIES:
+        raise ValueError(f"unknown font {family!r} (expected {', '.join(FAMILIES)})")
+    faces = {}
+    for core, files in FAMILIES[family].items():
+        found = {style: find_font(name) for style, name in files.items()}
+        if found[""] is None:
+            dirs = ", ".join(str(d) for d in font_dirs())
+            raise ValueError(f"font {family!r}: {files['']} not found in {dirs};"
+                             " install the fonts (fonts-dejavu-core on Debian/Ubuntu)"
+                             " or set VOXPDF_FONT_DIR to the directory that has them")
+        for style, options in STYLE_FALLBACKS.items():
+            real = next(s for s in options if found[s] is not None)
+            faces[core, style] = (found[real], real)
+    return faces
+
+
+def font_paths(family):
+    """The font files `family` draws with, for cache keys."""
+    return tuple(sorted({str(path) for path, _ in resolve(family).values()}))
+
+
+_metrics = {}
+
+
+def font_metrics(path):
+    """{"codes", "widths", "missing_width"} of the font file at `path`, from
+    the disk cache when this font file was parsed before."""
+    path = Path(path)
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _metrics.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    from importlib import metadata
+
+    version = metadata.version("fpdf2")
+    stored = os.path.join(default_cache_dir(), "fonts", f"{file_digest(path)}-fpdf{version}-v{METRICS_VERSION}.json")
+    try:
+        with open(stored, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        from fpdf import FPDF
+
+        pdf = FPDF()
+        pdf.add_font("parsed", "", path)
+        font = pdf.fonts["parsed"]
+        codes = sorted(font.cmap)
+        data = {"codes": codes, "widths": [font.cw[c] for c in codes],
+                "missing_width": font.desc.missing_width}
+        atomic_write(stored, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+    _metrics[path] = (stamp, data)
+    return data
+
+
+@lru_cache(maxsize=None)
+def face_map(family):
+    """{(core family, style): (family, style, font path)} to draw `family`
+    with wherever the house style selects a core font."""
+    return {(core, style): (f"{family}-{core}", real, path)
+            for (core, style), (path, real) in resolve(family).items()}
+
+
+@lru_cache(maxsize=None)
+def face_widths(family, core, style):
+    """Glyph widths by code point of the face `family` draws for the core
+    font `core` in `style`, for the metrics functions."""
+    path, _ = resolve(family)[core, style]
+    data = font_metrics(path)
+    missing = data["missing_width"]
+    return defaultdict(lambda: missing, zip(data["codes"], data["widths"]))
+
+
+@lru_cache(maxsize=None)
+def family_cleaner(family):
+    """clean() for text drawn in `family`: characters the regular face has
+    are kept, others get the latin-1 fallbacks."""
+    path, _ = resolve(family)["helvetica", ""]
+    return cleaner(frozenset(font_metrics(path)["codes"]))
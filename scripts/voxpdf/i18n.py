@@ -0,0 +1,167 @@
+"""Translated spec strings from the web app's src/lib/translations.ts.
+
+Spec strings may contain {t:dotted.key} markers, replaced with the entry
+for the document language when the spec is compiled. translations.ts is a
+nested object literal whose leaves are {nl: '...', en: '...', fr: '...',
+de: '...'}; it is read with a small tokenizer into a flat table of
+{dotted key: [text per language]}, stored on disk under the file's hash so
+other processes (and later runs) load the table instead of parsing it.
+
+build_languages() renders one document per language in worker processes.
+"""
+
+import json
+import os
+import re
+
+from .cache import atomic_write, default_cache_dir, file_digest
+from .sources import REPO_ROOT
+
+TRANSLATIONS = REPO_ROOT / "src" / "lib" / "translations.ts"
+LANGUAGES = ("nl", "en", "fr", "de")
+DEFAULT_LANGUAGE = "nl"
+TABLE_VERSION = 1
+
+MARKER = re.compile(r"\{t:([\w.]+)\}")
+TOKEN = re.compile(
+    r"""\s+|//[^\n]*|/\*.*?\*/
+    |(?P<str>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*"|`(?:\\.|[^`\\])*`)
+    |(?P<name>[A-Za-z_$][\w$]*)
+    |(?P<punct>[{}:,])
+    |(?P<other>.)""",
+    re.S | re.X,
+)
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0"}
+
+
+def _unquote(literal):
+    def escape(m):
+        code = m.group(1)
+        if code[0] == "u":
+            return chr(int(code[1:].strip("{}"), 16))
+        return ESCAPES.get(code, code)
+
+    return re.sub(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|.)", escape, literal[1:-1], flags=re.S)
+
+
+def parse_translations(text, languages=LANGUAGES):
+    """{dotted key: [text or None per language]} of the `translations`
+    object literal in `text`, read in one pass over its tokens."""
+    start = re.search(r"\btranslations\b[^=]*=\s*", text)
+    if start is None:
+        raise ValueError("no 'translations' object found")
+    index = {lang: i for i, lang in enumerate(languages)}
+    table, path, key, depth = {}, [], None, 0
+    for m in TOKEN.finditer(text, start.end()):
+        kind = m.lastgroup
+        if kind is None:
+            continue
+        token = m.group(kind)
+        if token == "{":
+            depth += 1
+            if depth > 1:
+                path.append(key)
+            key = None
+        elif token == "}":
+            depth -= 1
+            if depth == 0:
+                break
+            path.pop()
+        elif token == ":" or token == ",":
+            continue
+        elif key is None and kind in ("name", "str"):
+            key = token if kind == "name" else _unquote(token)
+        elif kind == "str":
+            if key in index and path:
+                entry = table.setdefault(".".join(path), [None] * len(languages))
+                entry[index[key]] = _unquote(token)
+            key = None
+        else:
+            key = None  # a non-string value (number, identifier) is ignored
+    return table
+
+
+_tables = {}
+
+
+def load_translations(path=TRANSLATIONS):
+    """The translation table for `path`, parsed once per file content."""
+    path = os.fspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _tables.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    digest = file_digest(path)
+    stored = os.path.join(default_cache_dir(), "i18n", f"{digest}-v{TABLE_VERSION}.json")
+    try:
+        with open(stored, encoding="utf-8") as f:
+            table = json.load(f)
+    except (OSError, ValueError):
+        with open(path, encoding="utf-8") as f:
+            table = parse_translations(f.read())
+        atomic_write(stored, json.dumps(table, ensure_ascii=False).encode("utf-8"))
+    _tables[path] = (stamp, table)
+    return table
+
+
+def translate(value, language, table=None):
+    """`value` with {t:key} markers replaced, recursing into lists and
+    dicts. The table is only loaded when a marker is found."""
+    if isinstance(value, str):
+        if "{t:" not in value:
+            return value
+        if language not in LANGUAGES:
+            raise ValueError(f"unknown language {language!r} (expected {', '.join(LANGUAGES)})")
+        table = table or load_translations()
+        column = LANGUAGES.index(language)
+
+        def lookup(m):
+            entry = table.get(m.group(1))
+            if entry is None:
+                raise ValueError(f"unknown translation key {m.group(1)!r}")
+            return entry[column] or entry[LANGUAGES.index(DEFAULT_LANGUAGE)] or ""
+
+        return MARKER.sub(lookup, value)
+    if isinstance(value, list):
+        return [translate(v, language, table) for v in value]
+    if isinstance(value, dict):
+        return {k: translate(v, language, table) for k, v in value.items()}
+    return value
+
+
+def language_output(output, language):
+    """docs/X.pdf -> docs/X.<language>.pdf"""
+    root, ext = os.path.splitext(os.fspath(output))
+    return f"{root}.{language}{ext or '.pdf'}"
+
+
+def _build_language(spec_path, language, out, sections, use_cache, font=None):
+    from .cache import BuildCache
+    from .document import build_document
+    from .spec import load_spec
+
+    spec = load_spec(spec_path, language, font)
+    if not use_cache:
+        build_document(spec, out, sections)
+        return "rendered"
+    return BuildCache().build(spec, out, sections)[1]
+
+
+def build_languages(spec_path, languages, output, sections=None, jobs=None, use_cache=True,
+                    font=None):
+    """Render the spec once per language, in parallel; returns
+    [(language, output path, status)] in the order of `languages`."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Parse translations.ts here, so the workers load the stored table.
+    load_translations()
+    outs = [language_output(output, lang) for lang in languages]
+    workers = min(len(languages), jobs or os.cpu_count() or 1)
+    if workers < 2:
+        return [(lang, out, _build_language(spec_path, lang, out, sections, use_cache, font))
+                for lang, out in zip(languages, outs)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_build_language, spec_path, lang, out, sections, use_cache, font)
+                   for lang, out in zip(languages, outs)]
+        return [(lang, out, f.result()) for lang, out, f in zip(languages, outs, futures)]
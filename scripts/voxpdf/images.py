@@ -0,0 +1,114 @@
+"""Images from public/ (logos, photos), pre-scaled and embedded once.
+
+An image is drawn at a size in mm. prepare() scales the source down to
+IMAGE_DPI at that size, once: the result is stored under the SHA-256 of the
+source plus the pixel size, so later runs (and other processes) reuse it.
+JPEG sources stay JPEG, and fpdf2 embeds those bytes as they are; anything
+else becomes a PNG.
+
+The decoded image (fpdf2's image info, with the compressed pixel data) is
+kept per process. VoxPDF.image_block() hands it to fpdf2's image cache, so
+every PDF embeds each image once as a shared XObject however often it is
+drawn, and no document decodes an image another one already did.
+preload() prepares the images of a spec in a thread pool before drawing.
+"""
+
+import io
+import os
+from pathlib import Path
+
+from .cache import atomic_write, default_cache_dir, file_digest
+from .sources import REPO_ROOT
+
+IMAGE_DIR = REPO_ROOT / "public"
+IMAGE_DPI = 150
+IMAGE_VERSION = 1
+IMAGE_WORKERS = 4
+JPEG_QUALITY = 85
+
+
+def image_path(name):
+    """Path of the image `name`: absolute, or relative to public/."""
+    path = Path(name)
+    if not path.is_absolute():
+        path = IMAGE_DIR / path
+    if not path.is_file():
+        raise ValueError(f"image {name!r} not found")
+    return path
+
+
+def _target_size(size, w, h, dpi):
+    """Pixel size for drawing an image of `size` pixels at w x h mm (one of
+    them may be None: it follows the aspect ratio); never larger than the
+    source."""
+    px_w, px_h = size
+    if w is None:
+        w = h * px_w / px_h
+    scale = min(1.0, w / 25.4 * dpi / px_w)
+    return max(1, round(px_w * scale)), max(1, round(px_h * scale))
+
+
+def _scaled(path, target, fmt, stored):
+    from PIL import Image
+
+    with Image.open(path) as im:
+        if fmt == "JPEG":
+            im.draft("RGB", target)  # decode at a reduced scale where possible
+        if im.size != target:
+            im = im.resize(target, Image.LANCZOS)
+        out = io.BytesIO()
+        if fmt == "JPEG":
+            im.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY)
+        else:
+            im.save(out, "PNG")
+    atomic_write(stored, out.getvalue())
+
+
+# (path, w, h, dpi) -> (cache file name, size in mm, fpdf2 image info)
+_prepared = {}
+
+
+def prepare(path, w=None, h=None, dpi=IMAGE_DPI):
+    """(name, (w, h) in mm, image info) for drawing `path` at w x h mm."""
+    key = (os.fspath(path), w, h, dpi)
+    prepared = _prepared.get(key)
+    if prepared is not None:
+        return prepared
+    from fpdf.image_parsing import get_img_info
+    from PIL import Image
+
+    with Image.open(path) as im:
+        size, fmt = im.size, im.format
+    target = _target_size(size, w, h, dpi)
+    if w is None:
+        w = h * size[0] / size[1]
+    elif h is None:
+        h = w * size[1] / size[0]
+    fmt = "JPEG" if fmt == "JPEG" else "PNG"
+    stored = os.path.join(
+        default_cache_dir(), "images",
+        f"{file_digest(path)}-{target[0]}x{target[1]}-v{IMAGE_VERSION}."
+        + ("jpg" if fmt == "JPEG" else "png"))
+    if not os.path.exists(stored):
+        _scaled(path, target, fmt, stored)
+    prepared = _prepared[key] = (stored, (w, h), get_img_info(stored))
+    return prepared
+
+
+def preload(requests, workers=IMAGE_WORKERS):
+    """prepare() every (path, w, h) in `requests`, in a thread pool; Pillow
+    and zlib release the GIL while decoding and compressing."""
+    todo = {r for r in requests if (os.fspath(r[0]), r[1], r[2], IMAGE_DPI) not in _prepared}
+    if len(todo) < 2:
+        for request in todo:
+            prepare(*request)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+        list(pool.map(lambda r: prepare(*r), todo))
+
+
+def image_files(requests):
+    """The source files of `requests`, for cache keys."""
+    return tuple(sorted({os.fspath(path) for path, _, _ in requests}))
@@ -0,0 +1,266 @@
+"""Knowledge-base booklets: a tenant's knowledge_base rows, by category.
+
+Rows come from a table dump (JSONL or CSV, as for --export) or from the
+JSON item lists posted to /api/knowledge/bulk and written by
+scripts/import-garage-knowledge.ts: {category, title, content}, plus id,
+business_id, is_active and updated_at when they come from the table.
+
+Each category is a section_header() and each entry a sub_header() with its
+content as body_text(). Entries are laid out on a scratch page and
+recorded (templates.record()); the recordings are kept on disk per
+business under the entry id and its updated_at, so a later export stamps
+the entries that did not change instead of wrapping and measuring them
+again. An entry is kept on one page; one longer than a page is drawn live.
+
+Near-duplicate entries are found before rendering: the content's word
+shingles are hashed and reduced to a MinHash signature, signatures are
+bucketed by bands, and entries sharing a bucket are compared. Only the
+first of a group is printed; the others are listed after the entries,
+followed by an alphabetical index of the words in the titles.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import zlib
+
+from .cache import atomic_write, default_cache_dir, generator_version
+from .document import new_pdf, write_output
+from .pdf import HEADING_HEIGHTS
+from .stream import read_rows
+from .templates import dump, load, record
+from .transcripts import TermIndex, draw_index
+
+KNOWLEDGE_VERSION = 1
+DEFAULT_CATEGORY = "algemeen"  # as /api/knowledge/bulk stores it
+SHINGLE_WORDS = 3
+BANDS, ROWS = 8, 4  # a signature is BANDS * ROWS minimum hashes
+# Share of equal signature values (the estimated Jaccard similarity of the
+# shingle sets) from which two entries count as near-duplicates.
+DUPLICATE_THRESHOLD = 0.8
+_MASKS = [random.Random(KNOWLEDGE_VERSION + n).getrandbits(32) for n in range(BANDS * ROWS)]
+WORD = re.compile(r"\w+")
+
+
+def signature(text):
+    """MinHash signature of the word shingles of `text`, or None without
+    words. Each shingle is hashed once (crc32); the hash functions are that
+    hash xor-ed with a fixed mask."""
+    words = WORD.findall(text.lower())
+    if not words:
+        return None
+    n = min(SHINGLE_WORDS, len(words))
+    hashes = {zlib.crc32(" ".join(words[i:i + n]).encode()) for i in range(len(words) - n + 1)}
+    return [min(map(mask.__xor__, hashes)) for mask in _MASKS]
+
+
+def near_duplicates(signatures):
+    """{index: index of the earlier entry it duplicates} for a list of
+    signatures (None never matches)."""
+    buckets, out = {}, {}
+    for i, sig in enumerate(signatures):
+        if sig is None:
+            continue
+        keys = [(band, *sig[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+        seen = set()
+        for key in keys:
+            for j in buckets.get(key, ()):
+                if j not in seen:
+                    seen.add(j)
+                    same = sum(a == b for a, b in zip(sig, signatures[j]))
+                    if same >= DUPLICATE_THRESHOLD * len(sig):
+                        out[i] = j
+                        break
+            if i in out:
+                break
+        else:
+            # Only entries that are printed are compared against.
+            for key in keys:
+                buckets.setdefault(key, []).append(i)
+    return out
+
+
+def read_entries(path, business=None):
+    """Active knowledge_base rows in `path` (of `business` only, if given)."""
+    if str(path).endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            try:
+                rows = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{e.lineno}: {e.msg}") from None
+        if isinstance(rows, dict):
+            rows = rows.get("items") or []
+    else:
+        rows = read_rows(path)
+    for row in rows:
+        if not isinstance(row, dict) or not row.get("content"):
+            continue
+        if row.get("is_active") in (False, "false", "f"):
+            continue
+        if business and str(row.get("business_id")) != business:
+            continue
+        yield row
+
+
+class Entry:
+    """One knowledge_base row. `layout` is its Recording, False when it is
+    drawn live, or None until it is laid out."""
+
+    __slots__ = ("key", "stamp", "category", "title", "content", "signature", "layout")
+
+    def __init__(self, row):
+        content = str(row["content"])
+        self.category = str(row.get("category") or DEFAULT_CATEGORY)
+        # The bulk import titles an entry with its first 100 characters.
+        self.title = str(row.get("title") or content[:100])
+        self.content = content
+        digest = hashlib.sha1(
+            "\0".join((self.category, self.title, content)).encode()).hexdigest()
+        self.key = str(row.get("id") or digest)
+        # Without updated_at, the content itself tells whether it changed.
+        self.stamp = str(row.get("updated_at") or digest)
+        self.signature = self.layout = None
+
+    def draw(self, pdf):
+        pdf.sub_header(self.title)
+        pdf.body_text(self.content)
+
+
+class LayoutStore:
+    """Signatures and recorded layouts of entries, kept on disk under the
+    entry key and valid while its stamp (updated_at) stays the same."""
+
+    def __init__(self, name):
+        name = re.sub(r"[^\w.-]", "_", name)
+        self.path = os.path.join(default_cache_dir(), "knowledge",
+                                 f"{name}-v{KNOWLEDGE_VERSION}.json")
+        self.version = generator_version()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.stored = data.get("entries", {}) if data.get("version") == self.version else {}
+        self.entries = {}
+
+    def get(self, entry):
+        """Fill in the stored signature and layout of `entry`; False when
+        it is new or changed."""
+        stored = self.stored.get(entry.key)
+        if stored is None or stored["stamp"] != entry.stamp:
+            return False
+        entry.signature = stored["signature"]
+        entry.layout = load(stored["layout"]) if stored["layout"] else stored["layout"]
+        self.entries[entry.key] = stored
+        return True
+
+    def put(self, entry):
+        layout = dump(entry.layout) if entry.layout else entry.layout
+        self.entries[entry.key] = {"stamp": entry.stamp, "signature": entry.signature,
+                                   "layout": layout}
+
+    def save(self):
+        """Keep the entries of this export, if anything changed."""
+        if self.entries != self.stored:
+            data = {"version": self.version, "entries": self.entries}
+            atomic_write(self.path, json.dumps(data).encode("utf-8"))
+
+
+class _Scratch:
+    """An off-document page that entries are laid out and recorded on."""
+
+    def __init__(self, language):
+        self.language = language
+        self.pdf = None
+
+    def record(self, entry):
+        """Recording of `entry` drawn at the top of a page, or None when it
+        does not fit on one."""
+        if self.pdf is None:
+            self.pdf = new_pdf(self.language)
+            self.pdf.add_page()
+            self.top, self.size = self.pdf.y, len(self.pdf.pages[1].contents)
+        rec = record(self.pdf, entry.draw)
+        if rec is None:
+            self.pdf = None  # broke onto a second page: start over
+            return None
+        del self.pdf.pages[1].contents[self.size:]
+        self.pdf.x, self.pdf.y = self.pdf.l_margin, self.top
+        return rec
+
+
+def _sort_key(entry):
+    return entry.category.casefold(), entry.title.casefold()
+
+
+def knowledge_booklet(rows, title=None, store=None, language=None, font=None):
+    """(VoxPDF, stats) for the booklet of the knowledge_base `rows`.
+
+    With a LayoutStore, unchanged entries are taken from it and the store
+    is updated (not saved). stats: {"entries", "duplicates", "laid_out"}.
+    """
+    entries = sorted(map(Entry, rows), key=_sort_key)
+    for entry in entries:
+        if store is None or not store.get(entry):
+            entry.signature = signature(entry.content)
+            if store is not None:
+                store.put(entry)
+    duplicates = near_duplicates([entry.signature for entry in entries])
+
+    pdf = new_pdf(language, font)
+    pdf.toc_depth = 1  # bookmarks for the categories
+    pdf.add_page()
+    pdf.section_header(title or "Kennisbank")
+    scratch, index, category, laid_out = _Scratch(language), TermIndex(), None, 0
+    for i, entry in enumerate(entries):
+        if i in duplicates:
+            continue
+        if pdf.font_map:
+            entry.layout = False  # embedded fonts are never recorded
+        elif entry.layout is None:
+            entry.layout = scratch.record(entry) or False
+            laid_out += 1
+            if store is not None:
+                store.put(entry)
+        layout = entry.layout
+        if entry.category != category:
+            category = entry.category
+            if pdf.will_page_break(HEADING_HEIGHTS["section_header"]
+                                   + (layout.reach if layout else HEADING_HEIGHTS["sub_header"])):
+                pdf.add_page()
+            pdf.section_header(category)
+        if layout:
+            # Kept whole: an entry that does not fit starts the next page.
+            if pdf.y + layout.reach > pdf.page_break_trigger:
+                pdf.add_page()
+            layout.stamp(pdf)
+            page = pdf.page_no()
+        else:
+            pdf.sub_header(entry.title)
+            page = pdf.page_no()
+            pdf.body_text(entry.content)
+        index.add([pdf.clean(entry.title)], page)
+    if duplicates:
+        pdf.add_page()
+        pdf.section_header("Bijna-dubbele items")
+        for i, j in sorted(duplicates.items()):
+            pdf.bullet(f"{entries[i].title} ({entries[i].category}): zie {entries[j].title}"
+                       f" ({entries[j].category})")
+    if index:
+        draw_index(pdf, index)
+    return pdf, {"entries": len(entries), "duplicates": len(duplicates), "laid_out": laid_out}
+
+
+def build_knowledge(path, out=None, business=None, language=None, font=None, cache=True):
+    """Write the knowledge booklet of the dump at `path` to `out`; returns
+    its stats (see knowledge_booklet()) with the page count."""
+    store = LayoutStore(business or "all") if cache else None
+    name = os.path.basename(str(path))
+    title = f"Kennisbank ({name}{', ' + business if business else ''})"
+    pdf, stats = knowledge_booklet(read_entries(path, business), title, store, language, font)
+    result = write_output(bytes(pdf.output()), out)
+    if store is not None:
+        store.save()
+    return dict(stats, pages=pdf.pages_count), result
@@ -0,0 +1,241 @@
+"""Markdown documents rendered with the VoxPDF house style.
+
+blocks() is a single-pass tokenizer over the lines of a file: it keeps one
+pending construct (paragraph, list item, fence, table) and yields a spec
+block as soon as that construct ends, so it never looks back or holds more
+than one block. Headings map to section_header/sub_header, list items to
+bullet (nested items with their nesting level), fences to code_block and
+pipe tables to table rows; levels 1 and 2 also start a new spec section.
+
+The resulting spec data goes through compile_spec like any other spec, so
+Markdown documents share the build cache, the header template and the
+section-parallel renderer. render_markdown() renders a whole tree of files
+in one process.
+"""
+
+import os
+import re
+import time
+from pathlib import Path
+
+from .cache import BuildCache
+from .spec import compile_spec
+
+HEADING = re.compile(r"(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE = re.compile(r"(```+|~~~+)\s*([\w+-]*)")
+ITEM = re.compile(r"(\s*)([-*+]|\d+[.)])\s+(.*)")
+TABLE_RULE = re.compile(r"\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+SETEXT = re.compile(r"\s*(=+|-+)\s*$")
+THEMATIC = re.compile(r"\s*([-*_])(?:\s*\1){2,}\s*$")
+
+INLINE = [
+    (re.compile(r"!\[([^\]]*)\]\([^)]*\)"), r"\1"),        # images: alt text
+    (re.compile(r"\[([^\]]+)\]\(([^)\s]+)[^)]*\)"), r"\1"),  # links: link text
+    (re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1"), r"\2"),  # bold
+    (re.compile(r"(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?!\w)"), r"\1"),  # italic
+    (re.compile(r"`([^`]*)`"), r"\1"),                     # code spans
+    (re.compile(r"<br\s*/?>", re.I), "\n"),
+    (re.compile(r"\\([\\`*_{}\[\]()#+\-.!|])"), r"\1"),   # escapes
+]
+
+TABLE_WIDTH = 190
+
+
+def inline(text):
+    """Plain text of inline Markdown."""
+    for pattern, repl in INLINE:
+        text = pattern.sub(repl, text)
+    return text
+
+
+def _cells(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [inline(c.strip()) for c in re.split(r"(?<!\\)\|", line)]
+
+
+def table_block(header, rows):
+    """Table block with column widths in proportion to their longest cell."""
+    count = len(header)
+    rows = [(row + [""] * count)[:count] for row in rows]
+    longest = [min(max(len(r[i]) for r in [header] + rows), 60) + 4 for i in range(count)]
+    scale = TABLE_WIDTH / sum(longest)
+    widths = [round(n * scale, 1) for n in longest]
+    widths[-1] = round(TABLE_WIDTH - sum(widths[:-1]), 1)
+    return {"table": {"widths": widths, "header": header, "rows": rows}}
+
+
+def blocks(lines):
+    """Yield (heading level or 0, spec block) for Markdown `lines` in one pass."""
+    para = []         # text of the open paragraph
+    item = None       # [marker, text, nesting level] of the open list item
+    levels = []       # indents of the items the next item may nest in
+    fence = None      # [closing fence, code lines]
+    table = None      # [header cells, rows]
+    candidate = None  # a pipe line that is a table header if a rule follows
+
+    def flush():
+        nonlocal para, item, table, candidate
+        if candidate is not None:
+            para.append(candidate.strip())
+            candidate = None
+        if para:
+            yield 0, {"body_text": inline("".join(para))}
+            para = []
+        if item is not None:
+            marker, text, level = item
+            block = {"bullet": inline(text)}
+            if marker not in "-*+":
+                block["marker"] = marker
+            if level:
+                block["indent"] = level
+            yield 0, block
+            item = None
+        if table is not None:
+            yield 0, table_block(*table)
+            yield 0, {"space": 3}
+            table = None
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+        if fence is not None:
+            if stripped.startswith(fence[0]):
+                yield 0, {"code_block": "\n".join(fence[1])}
+                fence = None
+            else:
+                fence[1].append(line)
+            continue
+        if table is not None and "|" in stripped:
+            table[1].append(_cells(line))
+            continue
+        if candidate is not None and TABLE_RULE.match(line) and "-" in line:
+            table, candidate = [_cells(candidate), []], None
+            continue
+        if not stripped:
+            yield from flush()
+            continue
+        m = FENCE.match(stripped)
+        if m:
+            yield from flush()
+            fence, levels = [m.group(1), []], []
+            continue
+        m = HEADING.match(stripped)
+        if m:
+            yield from flush()
+            levels = []
+            level = len(m.group(1))
+            yield level, {"section_header" if level == 1 else "sub_header": inline(m.group(2))}
+            continue
+        m = SETEXT.match(line)
+        if m and para:
+            # The paragraph so far is a heading: "=" underlines level 1, "-" level 2.
+            level = 1 if m.group(1)[0] == "=" else 2
+            text, para, levels = inline("".join(para).strip()), [], []
+            yield level, {"section_header" if level == 1 else "sub_header": text}
+            continue
+        if m and m.group(1)[0] == "=":
+            continue  # a row of = without text above it is decoration
+        if THEMATIC.match(line):
+            yield from flush()
+            levels = []
+            yield 0, {"rule": True, "color": [200, 200, 200]}
+            yield 0, {"space": 4}
+            continue
+        m = ITEM.match(line)
+        if m:
+            yield from flush()
+            # An item indented past the one before it nests in it; one
+            # indented less closes the levels it is outside of.
+            indent = len(m.group(1).expandtabs(4))
+            while levels and levels[-1] > indent:
+                levels.pop()
+            if not levels or levels[-1] < indent:
+                levels.append(indent)
+            item = [m.group(2), m.group(3).strip(), len(levels) - 1]
+            continue
+        if item is not None and line[:1].isspace():
+            item[1] += " " + stripped
+            continue
+        if table is not None or item is not None or candidate is not None:
+            yield from flush()
+        levels = []
+        if "|" in stripped and not para:
+            candidate = line
+            continue
+        if stripped.startswith(">"):
+            stripped = stripped.lstrip("> ")
+        # Two trailing spaces or a backslash end the line with a hard break.
+        hard = line.endswith("  ") or stripped.endswith("\\")
+        para.append(stripped.rstrip("\\") + ("\n" if hard else " "))
+    if fence is not None:
+        yield 0, {"code_block": "\n".join(fence[1])}
+    yield from flush()
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "sectie"
+
+
+def markdown_data(path):
+    """Spec data for the Markdown file at `path`: one section per level 1
+    or 2 heading, with the first section opening the first page."""
+    path = Path(path)
+    sections, names = [{"name": _slug(path.stem), "blocks": [{"page": True}]}], set()
+    title = None
+    with open(path, encoding="utf-8") as f:
+        for level, block in blocks(f):
+            if level == 1 and title is None:
+                title = block["section_header"]
+            if level in (1, 2) and len(sections[-1]["blocks"]) > 1:
+                name = base = _slug(next(iter(block.values())))
+                n = 1
+                while name in names or name == sections[0]["name"]:
+                    n += 1
+                    name = f"{base}-{n}"
+                names.add(name)
+                sections.append({"name": name, "blocks": []})
+            sections[-1]["blocks"].append(block)
+    return {"name": title or path.stem, "sections": sections}
+
+
+def load_markdown(path, font=None):
+    return compile_spec(markdown_data(path), where=str(path), font=font, translate=False)
+
+
+def markdown_files(paths):
+    """The .md files among `paths`, with directories expanded (sorted)."""
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(path.rglob("*.md"))
+        else:
+            yield path
+
+
+def output_path(source, out_dir=None):
+    """The PDF for `source`: next to it, or in `out_dir` under the source's
+    path relative to the current directory, so that files with the same
+    name in different directories do not overwrite each other."""
+    if out_dir is None:
+        return source.with_suffix(".pdf")
+    rel = [part for part in Path(os.path.relpath(source)).parts if part != ".."]
+    return Path(out_dir, *rel).with_suffix(".pdf")
+
+
+def render_markdown(paths, out_dir=None, cache=None, log=print, font=None):
+    """Render every Markdown file in `paths` in this process, next to its
+    source or into `out_dir` (see output_path()); returns [(source, output,
+    status)]."""
+    cache = cache or BuildCache()
+    results = []
+    for source in markdown_files(paths):
+        out = output_path(source, out_dir)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        _, status = cache.build(load_markdown(source, font), out)
+        results.append((source, out, status))
+        log(f"{status:>9} {out} ({(time.perf_counter() - start) * 1e3:.1f} ms)")
+    return results
@@ -0,0 +1,340 @@
+"""Menu booklets: a tenant's menu by category, in columns with dot leaders.
+
+Menus are read from CSV (naam,prijs as in public/snacks-menu.csv, with
+optional categorie and beschrijving columns), from SQL that inserts
+menu_items rows (data/frituur-nolim-menu.sql, DO $$ blocks included) or
+from JSON: a list of items, or {"name": ..., "items": [...]}. An item is
+{category, name, price, description?, options?: [{name, price}]}. Parsed
+menus are stored under the SHA-256 of the source file, like the schema
+operations of schema.py.
+
+Layout works a category at a time: the names, prices and option lines of
+the whole category are measured in one metrics.text_widths() batch, which
+also sizes every dot leader; only names too long for their column are
+wrapped one by one. The items then flow down COLUMNS columns per page and
+each page is written as one text object (VoxPDF.emit_texts).
+"""
+
+import csv
+import json
+import os
+import re
+from pathlib import Path
+
+from . import metrics
+from .cache import atomic_write, default_cache_dir, file_digest
+from .schema import split_top
+from .tenant import amount
+from .text import clean
+
+MENU_VERSION = 1
+COLUMNS = 2
+COLUMN_GAP = 8
+K = 72 / 25.4  # points per mm
+# (style, size, line height in mm) of each kind of line.
+STYLES = {
+    "category": ("B", 12, 8),
+    "item": ("", 9, 4.6),
+    "description": ("I", 7.5, 3.6),
+    "option": ("", 8, 4),
+}
+CATEGORY_SPACE = 3
+ITEM_SPACE = 0.8
+OPTION_INDENT = 3
+# Columns of the CSV, by the names they may have.
+CSV_COLUMNS = {
+    "name": ("naam", "name"),
+    "price": ("prijs", "price"),
+    "category": ("categorie", "category"),
+    "description": ("beschrijving", "description"),
+}
+
+COMMENT = re.compile(r"('(?:[^']|'')*')|--[^\n]*")
+INSERT = re.compile(r"insert\s+into\s+(?:public\.)?(\w+)\s*\(([^)]*)\)\s*values\s*"
+                    r"((?:'(?:[^']|'')*'|[^';])*?)\s*(?:\breturning\b|\bon\s+conflict\b|;)", re.I)
+
+
+def _literal(value):
+    if value.startswith("'") and value.endswith("'"):
+        return value[1:-1].replace("''", "'")
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    try:
+        return float(value)
+    except ValueError:
+        return None  # NULL, variables, function calls
+
+
+def sql_rows(sql):
+    """(table, {column: value}) for every row of every INSERT ... VALUES in
+    `sql`, also inside function bodies."""
+    sql = COMMENT.sub(lambda m: m.group(1) or "", sql)
+    for m in INSERT.finditer(sql):
+        columns = [c.strip().strip('"').lower() for c in m.group(2).split(",")]
+        for row in split_top(m.group(3)):
+            if row.startswith("(") and row.endswith(")"):
+                yield m.group(1).lower(), dict(zip(columns, map(_literal, split_top(row[1:-1]))))
+
+
+def _from_sql(path):
+    title = subtitle = None
+    items = []
+    with open(path, encoding="utf-8") as f:
+        rows = sql_rows(f.read())
+        for table, row in rows:
+            if table == "businesses" and title is None:
+                title = row.get("name")
+                place = " ".join(str(row[c]) for c in ("postal_code", "city") if row.get(c))
+                subtitle = " - ".join(str(v) for v in (row.get("street"), place, row.get("phone"))
+                                      if v) or None
+            elif table == "menu_items" and row.get("is_available") is not False:
+                items.append({k: row.get(k) for k in ("category", "name", "price", "description")})
+    return {"title": title, "subtitle": subtitle, "items": items}
+
+
+def _from_csv(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        fields = {key: next((c for c in names if c in (reader.fieldnames or ())), None)
+                  for key, names in CSV_COLUMNS.items()}
+        if fields["name"] is None:
+            raise ValueError(f"{path}: expected a naam or name column")
+        items = []
+        for row in reader:
+            item = {key: row.get(column) or None for key, column in fields.items() if column}
+            if item.get("price") is not None:
+                try:
+                    item["price"] = float(item["price"].replace(",", "."))
+                except ValueError:
+                    raise ValueError(f"{path}:{reader.line_num}: bad price {item['price']!r}"
+                                     " (expected a number such as 3,50)") from None
+            items.append(item)
+    return {"title": None, "subtitle": None, "items": items}
+
+
+def _from_json(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"items": data}
+    if not isinstance(data, dict) or not isinstance(data.get("items"), list):
+        raise ValueError(f"{path}: expected a list of items or an object with 'items'")
+    return {"title": data.get("name"), "subtitle": data.get("subtitle"), "items": data["items"]}
+
+
+READERS = {".sql": _from_sql, ".csv": _from_csv, ".json": _from_json}
+
+_menus = {}
+
+
+def load_menu(path):
+    """{"title", "subtitle", "items"} of the menu file at `path`, from the
+    disk cache when this file was read before. CSV items without a category
+    get the file name: snacks-menu.csv lists "Snacks"."""
+    path = Path(path)
+    reader = READERS.get(path.suffix.lower())
+    if reader is None:
+        raise ValueError(f"{path}: expected a .csv, .sql or .json menu")
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _menus.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    stored = os.path.join(default_cache_dir(), "menus",
+                          f"{file_digest(path)}{path.suffix.lower()}-v{MENU_VERSION}.json")
+    try:
+        with open(stored, encoding="utf-8") as f:
+            menu = json.load(f)
+    except (OSError, ValueError):
+        menu = reader(path)
+        atomic_write(stored, json.dumps(menu, ensure_ascii=False).encode("utf-8"))
+    default = path.stem.split("-")[0].capitalize()
+    menu = dict(menu, items=[item if item.get("category") else dict(item, category=default)
+                             for item in menu["items"]])
+    _menus[path] = (stamp, menu)
+    return menu
+
+
+def merge_menus(menus):
+    """One menu from several: their items in order, the first title."""
+    return {
+        "title": next((m["title"] for m in menus if m.get("title")), None),
+        "subtitle": next((m["subtitle"] for m in menus if m.get("subtitle")), None),
+        "items": [item for m in menus for item in m["items"]],
+    }
+
+
+def categories(items):
+    """{category: [items]} in order of first appearance."""
+    out = {}
+    for item in items:
+        out.setdefault(str(item.get("category") or "Menu"), []).append(item)
+    return out
+
+
+def _price(item):
+    return "" if item.get("price") is None else amount(item["price"])
+
+
+def _leader_rows(labels, prices, style, size, width, indent=0):
+    """Pieces of rows `label ..... price` across `width` mm, measured in two
+    batches. Returns one (height, pieces) per row, pieces relative to the
+    row's top left: (style, size, dx, baseline, text)."""
+    widths = metrics.glyph_widths("helvetica" + style)
+    scale = size / 1000 / K  # mm per font unit
+    label_w = metrics.text_widths(labels, widths)
+    price_w = metrics.text_widths(prices, widths)
+    dot, h = widths[ord(".")], size / 2 + 0.1
+    baseline = 0.5 * h + 0.3 * size / K
+    room = (width - indent) / scale
+    rows = []
+    for label, lw, price, pw in zip(labels, label_w, prices, price_w):
+        # Room for the label, kept clear of the price by two dots.
+        avail = room - pw - 2 * dot
+        lines = [label] if lw <= avail else metrics.wrap(label, avail, widths) or [""]
+        if len(lines) > 1:
+            lw = metrics.text_width(lines[-1], widths)
+        pieces = [(style, size, indent, baseline + i * h, line) for i, line in enumerate(lines)]
+        y = baseline + (len(lines) - 1) * h
+        dots = int((avail - lw) / dot) - 1
+        if price and dots > 0:
+            pieces.append((style, size, indent + (avail + dot - dots * dot) * scale, y, "." * dots))
+        if price:
+            pieces.append((style, size, width - pw * scale, y, price))
+        rows.append((len(lines) * h, pieces))
+    return rows
+
+
+def category_blocks(category, items, width):
+    """(heading, [item blocks]) for one category in a column `width` mm
+    wide; a block is (height, pieces) as from _leader_rows()."""
+    style, size, h = STYLES["category"]
+    heading = (h, [(style, size, 0, 0.5 * h + 0.3 * size / K, clean(category))])
+    style, size, _ = STYLES["item"]
+    rows = _leader_rows([clean(str(i.get("name") or "")) for i in items],
+                        [_price(i) for i in items], style, size, width)
+    options = [(n, o) for n, i in enumerate(items) for o in i.get("options") or ()
+               if isinstance(o, dict)]
+    option_rows = iter(_leader_rows(
+        ["+ " + clean(str(o.get("name") or "")) for _, o in options],
+        [_price(o) and "+" + _price(o) for _, o in options],
+        *STYLES["option"][:2], width, OPTION_INDENT))
+    option_count = [0] * len(items)
+    for n, _ in options:
+        option_count[n] += 1
+    d_style, d_size, d_h = STYLES["description"]
+    d_widths = metrics.glyph_widths("helvetica" + d_style)
+    blocks = []
+    for item, (height, pieces), count in zip(items, rows, option_count):
+        pieces = list(pieces)
+        if item.get("description"):
+            for line in metrics.wrap(clean(str(item["description"])),
+                                     (width - OPTION_INDENT) * K * 1000 / d_size, d_widths):
+                pieces.append((d_style, d_size, OPTION_INDENT, height + 0.5 * d_h + 0.3 * d_size / K,
+                               line))
+                height += d_h
+        for _ in range(count):
+            h_option, option_pieces = next(option_rows)
+            pieces.extend((s, z, dx, height + dy, t) for s, z, dx, dy, t in option_pieces)
+            height += h_option
+        blocks.append((height + ITEM_SPACE, pieces))
+    return heading, blocks
+
+
+class _Flow:
+    """Places blocks down the columns of successive pages."""
+
+    def __init__(self, pdf, columns, top):
+        self.pdf, self.columns = pdf, columns
+        self.width = (pdf.epw - COLUMN_GAP * (columns - 1)) / columns
+        self.top = self.y = top
+        self.column = 0
+        self.texts = []
+
+    def place(self, block, keep=0):
+        """Put `block` in the current column, or at the top of the next one
+        when it (and `keep` mm after it) does not fit."""
+        height, pieces = block
+        if self.y + height + keep > self.pdf.page_break_trigger and self.y > self.top:
+            self.next_column()
+        x = self.pdf.l_margin + self.column * (self.width + COLUMN_GAP)
+        self.texts.extend((s, z, x + dx, self.y + dy, t) for s, z, dx, dy, t in pieces)
+        self.y += height
+
+    def space(self, h):
+        if self.y > self.top:
+            self.y += h
+
+    def next_column(self):
+        self.column += 1
+        if self.column == self.columns:
+            self.flush()
+            self.pdf.add_page()
+            self.column, self.top = 0, self.pdf.y
+        self.y = self.top
+
+    def flush(self):
+        if self.texts:
+            self.pdf.emit_texts(self.texts)
+            self.texts = []
+
+
+def menu_pdf_class():
+    from .pdf import VoxPDF
+
+    class MenuPDF(VoxPDF):
+        """A VoxPDF for guests: the business name instead of the internal
+        page header."""
+
+        menu_title = ""
+
+        def header(self):
+            self.set_font("Helvetica", "B", 8)
+            self.set_text_color(150, 150, 150)
+            self.cell(0, 5, self.menu_title, align="R")
+            self.ln(8)
+
+    return MenuPDF
+
+
+def menu_booklet(menu, columns=COLUMNS, language=None):
+    """A VoxPDF with the booklet for `menu` (see load_menu())."""
+    from .document import new_pdf
+
+    pdf = new_pdf(language, cls=menu_pdf_class())
+    title = menu.get("title") or "Menukaart"
+    pdf.menu_title = clean(title)
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 22)
+    pdf.set_text_color(26, 26, 46)
+    pdf.cell(0, 12, title, align="C")
+    pdf.ln(12)
+    if menu.get("subtitle"):
+        pdf.set_font("Helvetica", "", 10)
+        pdf.set_text_color(80, 80, 100)
+        pdf.cell(0, 7, menu["subtitle"], align="C")
+        pdf.ln(7)
+    pdf.set_draw_color(26, 26, 46)
+    pdf.rule(pdf.l_margin, pdf.w - pdf.r_margin)
+    pdf.ln(4)
+    pdf.set_text_color(30, 30, 30)
+    flow = _Flow(pdf, columns, pdf.y)
+    for category, items in categories(menu["items"]).items():
+        heading, blocks = category_blocks(category, items, flow.width)
+        flow.space(CATEGORY_SPACE)
+        flow.place(heading, keep=blocks[0][0])
+        for block in blocks:
+            flow.place(block)
+    flow.flush()
+    return pdf
+
+
+def build_menu(paths, out, columns=COLUMNS, language=None):
+    """Write the booklet for the menu files in `paths` to `out`; returns
+    (items, pages)."""
+    from .document import write_output
+
+    menu = merge_menus([load_menu(path) for path in paths])
+    pdf = menu_booklet(menu, columns, language)
+    write_output(bytes(pdf.output()), out)
+    return len(menu["items"]), pdf.pages_count
@@ -0,0 +1,122 @@
+"""Glyph-width tables and width-based line breaking.
+
+`widths` is either a core font table from glyph_widths(), indexed by
+latin-1 byte, or the width map of a TTF font (TTFFont.cw), indexed by code
+point.
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+
+from fpdf.fonts import CORE_FONTS_CHARWIDTHS
+
+
+@lru_cache(maxsize=None)
+def glyph_widths(fontkey):
+    """Widths (1/1000 em) of latin-1 code points 0-255 for a core font."""
+    cw = CORE_FONTS_CHARWIDTHS[fontkey]
+    missing = cw.get("?", 500)
+    return tuple(cw.get(chr(cp), missing) for cp in range(256))
+
+
+def codes(text, widths):
+    """`text` as indexes into `widths`; for a core font the text must be
+    latin-1 (see clean())."""
+    return text.encode("latin-1") if type(widths) is tuple else [*map(ord, text)]
+
+
+def text_width(text, widths):
+    """Width of `text` in font units."""
+    return sum(map(widths.__getitem__, codes(text, widths)))
+
+
+def text_widths(texts, widths):
+    """Widths of many strings in font units, measured in one batch: a single
+    prefix-sum array over their concatenation, read off at the boundaries."""
+    sums = [0]
+    sums.extend(accumulate(map(widths.__getitem__, codes("".join(texts), widths))))
+    out, start = [], 0
+    for text in texts:
+        end = start + len(text)
+        out.append(sums[end] - sums[start])
+        start = end
+    return out
+
+
+def _break_word(word, max_units, widths):
+    """Split a word wider than a line at the last character that still fits."""
+    ends = list(accumulate(map(widths.__getitem__, codes(word, widths))))
+    pieces, start, base = [], 0, 0
+    while start < len(word):
+        stop = max(bisect_right(ends, base + max_units), start + 1)
+        pieces.append(word[start:stop])
+        base = ends[stop - 1]
+        start = stop
+    return pieces
+
+
+def wrap(text, max_units, widths):
+    """Greedy line breaking of `text` on whitespace, measured in font units.
+
+    Word widths are turned into one prefix-sum array; the end of every line is
+    then found with a bisect instead of re-measuring candidate lines.
+    """
+    words = text.split()
+    if not words:
+        return []
+    space = widths[32]
+    # offsets[j] = width of words[:j], each followed by one space
+    offsets = [0]
+    offsets.extend(accumulate(text_width(w, widths) + space for w in words))
+    lines, i, n = [], 0, len(words)
+    while i < n:
+        j = min(bisect_right(offsets, offsets[i] + max_units + space, i + 1) - 1, n)
+        if j > i:
+            lines.append(" ".join(words[i:j]))
+            i = j
+            continue
+        # A single word that does not fit: hard-break it like textwrap does.
+        pieces = _break_word(words[i], max_units, widths)
+        lines.extend(pieces[:-1])
+        words[i] = pieces[-1]
+        offsets[i] = offsets[i + 1] - text_width(pieces[-1], widths) - space
+    return lines
+
+
+def iter_wrap(words, max_units, widths):
+    """wrap() for an iterable of words, yielding every line once it is full.
+
+    Only the current line is held, so the text can be arbitrarily long; the
+    lines are the ones wrap() returns for " ".join(words).
+    """
+    space = widths[32]
+    line, width = [], 0
+    for word in words:
+        w = text_width(word, widths)
+        if line and width + space + w <= max_units:
+            line.append(word)
+            width += space + w
+            continue
+        if line:
+            yield " ".join(line)
+        if w > max_units:
+            *pieces, word = _break_word(word, max_units, widths)
+            yield from pieces
+            w = text_width(word, widths)
+        line, width = [word], w
+    if line:
+        yield " ".join(line)
+
+
+def truncate(text, max_units, widths, suffix=".."):
+    """Longest prefix of `text` that fits with `suffix` appended, or text
+    itself; as much of the suffix as fits when the suffix alone does not."""
+    encoded = codes(text, widths)
+    if sum(map(widths.__getitem__, encoded)) <= max_units:
+        return text
+    room = max_units - text_width(suffix, widths)
+    if room < 0 and suffix:
+        return truncate(suffix, max_units, widths, "")
+    ends = list(accumulate(map(widths.__getitem__, encoded)))
+    return text[:bisect_right(ends, room)] + suffix
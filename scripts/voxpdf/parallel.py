@@ -0,0 +1,136 @@
+"""Render the sections of one document in worker processes and merge them.
+
+Only sections that open with a page break (DocumentSpec.page_breaks) can
+start a worker task; any other section stays with the one before it. Each
+worker draws its sections with the page header but without footers and
+returns the raw page content streams. The main process then adds one page
+per returned stream in document order, copies the stream in and draws the
+footer itself, so page_no() and the {nb} alias count over the whole
+document.
+
+Grafted streams are wrapped in q/Q so the graphics state the main FPDF
+tracks stays valid, and their font numbers are remapped to the main
+document's. Sections in a worker start from the default style, so a
+section must set its own font and colors, as section_header does.
+
+Workers also return the headings they listed in the outline and where
+their table of contents placeholder is, if they drew it. The main process
+starts the outline sections on the stitched pages and reserves the table
+of contents pages there, so the table is filled in with the page numbers
+of the whole document when the PDF is written.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .document import new_pdf, render
+from .templates import core_fonts
+
+
+def group_names(spec):
+    """Section names, grouped so that every group starts a new page."""
+    out = []
+    for name in spec.sections:
+        if out and name not in spec.page_breaks:
+            out[-1].append(name)
+        else:
+            out.append([name])
+    return out
+
+
+def toc_depths(spec, names):
+    """The outline depth each group of section `names` starts drawing with:
+    none up to the table of contents, whose section sets it."""
+    depth, out = 0, []
+    for group in names:
+        out.append(depth)
+        if spec.toc and spec.toc[0] in group:
+            depth = spec.toc[1]
+    return out
+
+
+def groups(spec):
+    """(section callables, outline depth) per group, grouped so that every
+    group starts a new page."""
+    names = group_names(spec)
+    return [([spec.sections[name] for name in group], depth)
+            for group, depth in zip(names, toc_depths(spec, names))]
+
+
+def tasks(parts, count):
+    """Join consecutive groups into `count` runs of about equal length."""
+    size, extra = divmod(len(parts), count)
+    out, start = [], 0
+    for n in range(count):
+        stop = start + size + (n < extra)
+        out.append(([draw for group, _ in parts[start:stop] for draw in group], parts[start][1]))
+        start = stop
+    return out
+
+
+def _render_group(draws, language=None, toc_depth=0):
+    """Worker: (page content streams, {font index: (fontkey, style)},
+    outline, table of contents). The outline lists (name, level, page, y)
+    and the table of contents is (page, y, pages) or None, with pages
+    counted from 0."""
+    pdf = new_pdf(language)
+    pdf.footer = lambda: None
+    pdf.toc_depth = toc_depth
+    for draw in draws:
+        draw(pdf)
+    outline = [(s.name, s.level, s.page_number - 1, (pdf.h_pt - s.dest.top) / pdf.k)
+               for s in pdf._outline]
+    pages = sorted(pdf.pages)
+    if pdf._toc_end and pdf._toc_end == (pdf.page, len(pdf.pages[pdf.page].contents)):
+        # Nothing was drawn after the table of contents: the next group
+        # starts on the page it left.
+        pages.pop()
+    toc = pdf.toc_placeholder
+    if toc is not None:
+        toc = (toc.start_page - 1, toc.y, toc.pages)
+    return [bytes(pdf.pages[n].contents) for n in pages], core_fonts(pdf), outline, toc
+
+
+def render_parallel(spec, jobs=None):
+    """Like render(), with section groups drawn by up to `jobs` processes.
+
+    Falls back to a serial render when there is nothing to split or the
+    spec is not DocumentSpec.splittable.
+    """
+    parts = groups(spec)
+    if len(parts) < 2 or not spec.splittable or jobs == 1:
+        return render(spec)
+    # A few tasks per worker balance uneven sections without paying the
+    # per-task overhead for every section.
+    work = tasks(parts, min(len(parts), 2 * (jobs or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(_render_group, [draws for draws, _ in work],
+                                [spec.language] * len(work), [depth for _, depth in work]))
+    return stitch(spec, results)
+
+
+def stitch(spec, results):
+    """A VoxPDF with the pages of `results` (from _render_group) in order;
+    the footers, the outline and the table of contents are added here."""
+    pdf = new_pdf(spec.language)
+    pdf.header = lambda: None
+    for contents, fonts, outline, toc in results:
+        first = pdf.page + 1
+        if pdf._toc_end and pdf._toc_end == (pdf.page, len(pdf.pages[pdf.page].contents)):
+            first = pdf.page  # as new_page() does after the table of contents
+        for n, stream in enumerate(contents):
+            last = pdf.page
+            if first + n > last:
+                pdf.add_page()
+            else:
+                pdf.page = first + n  # reserved for the table of contents
+            pdf._graft(stream, fonts)
+            for name, level, page, y in outline:
+                if page == n:
+                    pdf.y = y
+                    pdf.start_section(name, level)
+            if toc is not None and toc[0] == n:
+                pdf.y = toc[1]
+                pdf.toc(spec.toc[1], pages=toc[2])
+            pdf.page = max(pdf.page, last)
+    return pdf
@@ -0,0 +1,484 @@
+"""VoxPDF: FPDF subclass with the VoxApp house style."""
+
+import re
+from functools import lru_cache
+
+from fpdf import FPDF
+from fpdf.enums import PDFResourceType, TextEmphasis
+from fpdf.fonts import CoreFont
+
+from . import metrics
+from .templates import Template
+from .text import Normalized, clean
+
+FONT_OP = re.compile(rb"/F(\d+)( [-+]?\d+(?:\.\d+)? Tf)")
+
+# Page header text and footer label per document language.
+CHROME = {
+    "nl": ("VOXAPP - VERTROUWELIJK", "Pagina"),
+    "en": ("VOXAPP - CONFIDENTIAL", "Page"),
+    "fr": ("VOXAPP - CONFIDENTIEL", "Page"),
+    "de": ("VOXAPP - VERTRAULICH", "Seite"),
+}
+
+# Height from the top of a heading to its content, as drawn below.
+HEADING_HEIGHTS = {"section_header": 20, "sub_header": 11}
+# Table of contents: line height, indent per level and page number column (mm).
+TOC_LINE = 7
+TOC_INDENT = 8
+TOC_PAGE_WIDTH = 12
+# Leading spaces per nesting level of a bullet.
+BULLET_INDENT = "    "
+
+
+def _face_widths(font, core, style):
+    if font is None:
+        return metrics.glyph_widths(core + style)
+    from .fonts import face_widths
+
+    return face_widths(font, core, style)
+
+
+def _line_count(text, max_units, widths):
+    return max(1, len(metrics.wrap(text, max_units, widths)))
+
+
+@lru_cache(maxsize=4096)
+def lead_height(kind, value, geometry, font=None):
+    """Height in mm of the part of a block a heading is kept on the page
+    with: a heading itself, a space, the first two lines of text or the
+    first table rows. `geometry` is (text width, cell padding, scale) of the
+    page and `font` the Unicode family drawn with, if any.
+
+    Measured from the compiled block alone, once per process, so keeping a
+    heading with its content never draws anything twice.
+    """
+    width, c_margin, k = geometry
+    if kind in HEADING_HEIGHTS:
+        return HEADING_HEIGHTS[kind]
+    if kind == "space":
+        return value
+    if kind == "code_block":
+        return 4.5 * min(2, value.count("\n") + 1)
+    if kind in ("body_text", "bullet"):
+        widths = _face_widths(font, "helvetica", "")
+        max_units = width * k * 1000 / 9
+        if kind == "bullet":
+            max_units -= max(metrics.text_width("  -  ", widths), metrics.text_width("     ", widths))
+        else:
+            value = next((line.strip() for line in value.split("\n") if line.strip()), "")
+        return 5 * min(2, _line_count(value, max_units, widths))
+    # table: (header cells or None, first row cells or None, column widths)
+    header, row, columns = value
+    height = 0
+    for cells, style in ((header, "B"), (row, "")):
+        if cells is not None:
+            widths = _face_widths(font, "helvetica", style)
+            lines = max(_line_count(cell, (w - 2 * c_margin) * k * 1000 / 8, widths)
+                        for cell, w in zip(cells, columns))
+            height += 6 if lines == 1 else min(lines, 10) * 4 + 2
+    return height
+
+
+class VoxPDF(FPDF):
+    _table_header = None
+    language = "nl"
+    # Text normalization and the core families drawn with TTF faces
+    # instead; see use_fonts().
+    clean = staticmethod(clean)
+    font_map = {}
+    # Unicode font family drawn with, see use_fonts().
+    unicode_font = None
+    # Image drawn at the left of every page header: (path, height in mm).
+    logo = None
+    # Heading levels listed in the table of contents (0: none), and the
+    # (page, content length) right after its placeholder; see toc().
+    toc_depth = 0
+    _toc_end = None
+
+    def use_fonts(self, family):
+        """Draw with the Unicode TTF `family` (see fonts.py) wherever the
+        house style asks for Helvetica or Courier."""
+        from . import fonts
+
+        self.font_map = fonts.face_map(family)
+        self.unicode_font = family
+        self.clean = fonts.family_cleaner(family)
+
+    def set_font(self, family=None, style="", size=0):
+        if family and self.font_map:
+            face = self.font_map.get((family.lower(), TextEmphasis.coerce(style).style))
+            if face is not None:
+                family, style, path = face
+                # Faces are embedded (and subset) only once they are used.
+                if family + style not in self.fonts:
+                    self.add_font(family, style, path)
+        super().set_font(family, style, size)
+
+    def clean_lines(self, text):
+        """clean() text and split it into already-normalized lines."""
+        return [Normalized(line) for line in self.clean(text).split("\n")]
+
+    def normalize_text(self, text):
+        return super().normalize_text(self.clean(text))
+
+    def cell(self, w=0, h=0, text="", *a, **kw):
+        if not isinstance(text, str):
+            text = str(text)
+        return super().cell(w, h, self.clean(text), *a, **kw)
+
+    def header(self):
+        HEADERS[self.language](self)
+        if self.logo is not None:
+            path, h = self.logo
+            y = self.y
+            self.place_image(path, self.l_margin, self.t_margin - 2, h=h)
+            self.y = y
+
+    def place_image(self, path, x, y, w=None, h=None):
+        """Draw the image `path` (see images.py) at x, y with width `w` and/or
+        height `h` in mm; returns the drawn (w, h)."""
+        from .images import prepare
+
+        name, size, info = prepare(path, w, h)
+        images = self.image_cache.images
+        if name not in images:
+            # Decoded once per process; fpdf2 embeds it once per document.
+            images[name] = type(info)(info, i=len(images) + 1, usages=0)
+        self.image(name, x, y, *size)
+        return size
+
+    def image_block(self, path, w=None, h=None, align="C"):
+        """An image on its own line, w x h mm (one may be None), aligned L, C or R."""
+        from .images import prepare
+
+        w, h = prepare(path, w, h)[1]
+        if self.will_page_break(h):
+            self.add_page()
+        x = {"L": self.l_margin, "C": (self.w - w) / 2, "R": self.w - self.r_margin - w}[align]
+        self.place_image(path, x, self.y, w, h)
+        self.set_xy(self.l_margin, self.y + h)
+
+    def image_row(self, paths, h, gap=8):
+        """Images of height `h` side by side, centered, in as many rows as
+        the page width needs (a row of partner logos)."""
+        from .images import prepare
+
+        sizes = [prepare(path, None, h)[1][0] for path in paths]
+        i = 0
+        while i < len(paths):
+            j, width = i + 1, sizes[i]
+            while j < len(paths) and width + gap + sizes[j] <= self.epw:
+                width += gap + sizes[j]
+                j += 1
+            if self.will_page_break(h):
+                self.add_page()
+            x = (self.w - width) / 2
+            for path, w in zip(paths[i:j], sizes[i:j]):
+                self.place_image(path, x, self.y, w, h)
+                x += w + gap
+            self.set_xy(self.l_margin, self.y + h + gap / 2)
+            i = j
+
+    def _draw_header(self):
+        self.set_font("Helvetica", "B", 8)
+        self.set_text_color(150, 150, 150)
+        super().cell(0, 5, CHROME[self.language][0], align="R")
+        self.ln(8)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font("Helvetica", "I", 8)
+        self.set_text_color(150, 150, 150)
+        super().cell(0, 10, f"{CHROME[self.language][1]} {self.page_no()}/{{nb}}", align="C")
+
+    def new_page(self):
+        """add_page(), unless the table of contents placeholder just
+        started this page."""
+        if self._toc_end is None or self._toc_end != (
+                self.page, len(self.pages[self.page].contents)):
+            self.add_page()
+
+    def toc(self, depth=1, entries=0, pages=None):
+        """Reserve room here for a table of contents of the headings drawn
+        after it, down to `depth` levels: section headers, and with depth 2
+        sub headers too. `entries` of them are expected, or it takes `pages`
+        pages; the list is drawn with their page numbers when the PDF is
+        written, and the document continues on a new page."""
+        if pages is None:
+            room = self.page_break_trigger - self.y
+            per_page = (self.page_break_trigger - self.t_margin - 8) // TOC_LINE
+            pages = 1 + max(0, -(-(entries - room // TOC_LINE) // per_page))
+        self.toc_depth = depth
+        self.insert_toc_placeholder(type(self)._render_toc, int(pages))
+        self._toc_top = self.y
+        self._toc_end = (self.page, len(self.pages[self.page].contents))
+
+    def _render_toc(self, outline):
+        self.set_font("Helvetica", "", 10)
+        self.set_text_color(30, 30, 30)
+        dot = self.get_string_width(".")
+        for section in outline:
+            if section.level >= self.toc_depth:
+                continue
+            if self.will_page_break(TOC_LINE):
+                # The page and its header exist already.
+                self.add_page()
+                self.y = self._toc_top
+            indent = TOC_INDENT * section.level
+            w = self.epw - indent - TOC_PAGE_WIDTH
+            room = w - 2 * self.c_margin - self.get_string_width(section.name + " ")
+            link = self.add_link(page=section.page_number)
+            self.set_x(self.l_margin + indent)
+            self.cell(w, TOC_LINE, section.name + " " + "." * max(0, int(room // dot)), link=link)
+            self.cell(TOC_PAGE_WIDTH, TOC_LINE, str(section.page_number), align="R", link=link)
+            self.ln(TOC_LINE)
+
+    def _outline_entry(self, text, level, h):
+        """List the heading `text` at `level` in the table of contents, once
+        its line of height `h` is known to start on this page."""
+        if level < self.toc_depth:
+            self._perform_page_break_if_need_be(h)
+            self.start_section(text, level)
+
+    def keep_with_next(self, chain):
+        """New page unless the (kind, value) parts in `chain`, a heading and
+        the start of its content, fit on this one; see lead_height()."""
+        geometry = (self.text_width(), self.c_margin, self.k)
+        h = sum(lead_height(kind, value, geometry, self.unicode_font) for kind, value in chain)
+        if self.will_page_break(h):
+            self.add_page()
+
+    def section_header(self, text):
+        self._table_header = None
+        self.set_font("Helvetica", "B", 14)
+        self.set_text_color(26, 26, 46)
+        self.ln(6)
+        text = self.clean(text)
+        self._outline_entry(text, 0, 10)
+        self.cell(0, 10, text)
+        self.ln(10)
+        self.set_draw_color(26, 26, 46)
+        self.line(10, self.get_y(), 200, self.get_y())
+        self.ln(4)
+
+    def sub_header(self, text):
+        self._table_header = None
+        self.set_font("Helvetica", "B", 11)
+        self.set_text_color(50, 50, 80)
+        self.ln(3)
+        text = self.clean(text)
+        self._outline_entry(text, 1, 8)
+        self.cell(0, 8, text)
+        self.ln(8)
+
+    def body_text(self, text):
+        self.set_font("Helvetica", "", 9)
+        self.set_text_color(30, 30, 30)
+        for line in self.clean_lines(text):
+            stripped = line.strip()
+            if not stripped:
+                self.ln(3)
+                continue
+            self._text_run(self.wrap_text(stripped), 5)
+
+    def bullet(self, text, marker="-", indent=0):
+        """List item; `indent` is its nesting level below the top level."""
+        self.set_font("Helvetica", "", 9)
+        self.set_text_color(30, 30, 30)
+        pad = BULLET_INDENT * indent
+        first, rest = f"{pad}  {marker}  ", pad + "     "
+        indent = max(self.get_string_width(first), self.get_string_width(rest))
+        lines = self.wrap_text(self.clean(text), self.text_width() - indent)
+        self._text_run([(first if i == 0 else rest) + w for i, w in enumerate(lines)], 5)
+
+    def code_block(self, text):
+        self.set_font("Courier", "", 8)
+        self.set_text_color(40, 40, 40)
+        self.set_fill_color(245, 245, 245)
+        lines = []
+        for line in self.clean_lines(text):
+            if len(line) > 100:
+                line = line[:97] + "..."
+            lines.append("  " + line)
+        self._text_run(lines, 4.5, fill=True)
+        self.ln(2)
+
+    def _text_run(self, lines, h, fill=False):
+        """Draw normalized lines as full-width cells of height `h`, each
+        followed by ln(h), with one text object per page: later lines move
+        down by the text leading instead of starting a new cell. With fill,
+        the background is one rectangle per page instead of one per line."""
+        i = 0
+        while i < len(lines):
+            self._perform_page_break_if_need_be(h)
+            # Lines until the next page break, stepping y as ln() would.
+            j, y = i + 1, self.y + h
+            if not self.accept_page_break or self.in_footer:
+                j, y = len(lines), self.y + h * (len(lines) - i)
+            while j < len(lines) and y + h <= self.page_break_trigger:
+                j += 1
+                y += h
+            self._emit_run(lines[i:j], h, fill)
+            self.x, self.y = self.l_margin, y
+            i = j
+
+    def _emit_run(self, lines, h, fill):
+        if not self.current_font_is_set_on_page:
+            self._out(self._set_font_for_page(self.current_font, self.font_size_pt))
+        k, top = self.k, self.h - self.y
+        ops = ["q"]
+        if fill:
+            w = self.w - self.r_margin - self.x
+            ops.append(f"{self.x * k:.2f} {top * k:.2f} {w * k:.2f} {-h * len(lines) * k:.2f} re f")
+        if self.text_color != self.fill_color:
+            ops.append(self.text_color.serialize().lower())
+        baseline = (top - 0.5 * h - 0.3 * self.font_size) * k
+        encode = self.current_font.encode_text
+        ops.append(f"BT {(self.x + self.c_margin) * k:.2f} {baseline:.2f} Td {h * k:.3f} TL "
+                   + encode(lines[0]))
+        ops.extend("T* " + encode(line) for line in lines[1:])
+        ops.append("ET Q")
+        self._out(" ".join(ops))
+
+    def emit_texts(self, texts):
+        """Write positioned Helvetica text straight to the content stream, as
+        one text object: (style, size, x, baseline, text) with x and the
+        baseline in mm from the top left of the page, text already
+        normalized for the core fonts."""
+        k, ops, current = self.k, ["BT"], None
+        for style, size, x, baseline, text in texts:
+            key = "helvetica" + style
+            if (key, size) != current:
+                if key not in self.fonts:
+                    self.fonts[key] = CoreFont(len(self.fonts) + 1, key, style)
+                font = self.fonts[key]
+                ops.append(self._set_font_for_page(font, size, wrap_in_text_object=False))
+                current = (key, size)
+            ops.append(f"1 0 0 1 {x * k:.2f} {(self.h - baseline) * k:.2f} Tm "
+                       + font.encode_text(text))
+        ops.append("ET")
+        self._out(" ".join(ops))
+        # The stream's font is now the last one used here, not current_font.
+        self.current_font_is_set_on_page = False
+
+    def table_row(self, cols, widths, bold=False, wrap=True):
+        """One table row. Cells wrap onto extra lines (or, with wrap=False, are
+        cut to the widest fitting prefix); a bold row is the table header and
+        is repeated when later rows of the same table start a new page."""
+        style = "B" if bold else ""
+        self.set_font("Helvetica", style, 8)
+        cells = [self._cell_lines(self.clean(col if isinstance(col, str) else str(col)), w, wrap)
+                 for col, w in zip(cols, widths)]
+        lines = max(len(c) for c in cells)
+        max_lines = int((self.page_break_trigger - self.t_margin - 16) / 4)
+        if lines > max_lines:
+            # Never taller than a page: cut the cell text at the last line that fits.
+            cells = [c if len(c) <= max_lines else c[:max_lines - 1] + [Normalized("...")]
+                     for c in cells]
+            lines = max_lines
+        row_h = 6 if lines == 1 else lines * 4 + 2
+        if bold:
+            self._table_header = (list(cols), list(widths))
+        if self.will_page_break(row_h):
+            self.add_page()
+            header = self._table_header
+            if not bold and header is not None and header[1] == list(widths):
+                self.table_row(*header, bold=True, wrap=wrap)
+                self.set_font("Helvetica", style, 8)
+        self.set_text_color(30, 30, 30)
+        if bold:
+            self.set_fill_color(230, 230, 240)
+        self._emit_row(cells, widths, row_h, bold)
+        self.ln(row_h)
+
+    def _emit_row(self, cells, widths, row_h, fill):
+        """Write a measured row straight to the content stream: one bordered
+        rectangle per cell and a single text object for all of its lines."""
+        if not self.current_font_is_set_on_page:
+            self._out(self._set_font_for_page(self.current_font, self.font_size_pt))
+        k, top = self.k, self.h - self.get_y()
+        line_h, pad = (6, 0) if row_h == 6 else (4, 1)
+        baseline = (top - pad - 0.5 * line_h - 0.3 * self.font_size) * k
+        encode = self.current_font.encode_text
+        shapes, text = [], []
+        x = self.get_x()
+        for lines, w in zip(cells, widths):
+            shapes.append(f"{x * k:.2f} {top * k:.2f} {w * k:.2f} {-row_h * k:.2f} re "
+                          + ("B" if fill else "S"))
+            for i, line in enumerate(lines):
+                if line:
+                    text.append(f"1 0 0 1 {(x + self.c_margin) * k:.2f} "
+                                f"{baseline - i * line_h * k:.2f} Tm {encode(line)}")
+            x += w
+        ops = shapes
+        if text:
+            recolor = self.text_color != self.fill_color
+            if recolor:
+                ops.append(self.text_color.serialize().lower())
+            ops.append("BT " + " ".join(text) + " ET")
+            if recolor:
+                ops.append(self.fill_color.serialize().lower())
+        self._out("\n".join(ops))
+
+    def _cell_lines(self, text, width, wrap):
+        """Lines of a table cell of `width`; measured once per cell."""
+        widths = self.glyph_widths()
+        max_units = (width - 2 * self.c_margin) * self.k * 1000 / self.font_size_pt
+        if metrics.text_width(text, widths) <= max_units:
+            return [text]
+        if wrap:
+            return [Normalized(l) for l in metrics.wrap(text, max_units, widths)]
+        return [Normalized(metrics.truncate(text, max_units, widths))]
+
+    def glyph_widths(self):
+        """Glyph widths of the current font, for the metrics functions."""
+        font = self.current_font
+        return metrics.glyph_widths(font.fontkey) if font.type == "core" else font.cw
+
+    def text_width(self):
+        """Room for text in a full-width cell, inside the cell padding."""
+        return self.epw - 2 * self.c_margin
+
+    def wrap_text(self, text, width=None):
+        """Break normalized text into lines that fit `width` in the current font."""
+        if width is None:
+            width = self.text_width()
+        max_units = width * self.k * 1000 / self.font_size_pt
+        return [Normalized(line) for line in metrics.wrap(text, max_units, self.glyph_widths())]
+
+    def _graft(self, stream, fonts, dy=0):
+        """Append content recorded on another VoxPDF to the current page,
+        inside q/Q and moved down by `dy`. `fonts` maps the core font
+        numbers used in `stream` to their (fontkey, style)."""
+        index = {}
+        for i, (key, style) in fonts.items():
+            if key not in self.fonts:
+                self.fonts[key] = CoreFont(len(self.fonts) + 1, key, style)
+            index[i] = self.fonts[key].i
+        used = set()
+
+        def renumber(m):
+            i = index[int(m.group(1))]
+            used.add(i)
+            return b"/F%d%s" % (i, m.group(2))
+
+        move = b"1 0 0 1 0 %.2f cm\n" % (-dy * self.k) if dy else b""
+        self._out(b"q\n" + move + FONT_OP.sub(renumber, stream) + b"\nQ")
+        for i in used:
+            self._resource_catalog.add(PDFResourceType.FONT, i, self.page)
+
+    def rule(self, x1=None, x2=None):
+        """Horizontal line at the current position, by default from margin
+        to margin."""
+        x1 = self.l_margin if x1 is None else x1
+        x2 = self.w - self.r_margin if x2 is None else x2
+        self.line(x1, self.get_y(), x2, self.get_y())
+
+    def check_page_break(self, h=30):
+        """New page unless `h` mm are left above the bottom margin."""
+        if self.will_page_break(h):
+            self.add_page()
+
+
+HEADERS = {lang: Template(VoxPDF._draw_header, f"header-{lang}") for lang in CHROME}
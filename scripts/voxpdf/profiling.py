@@ -0,0 +1,123 @@
+"""Per-section profile of a document render (generate-pdf.py --profile).
+
+Profiler.attach() shadows the drawing methods of one VoxPDF instance with
+timing wrappers; the class itself is never touched, so documents rendered
+without a profiler run exactly the same code as before. Body text, bullets
+and code are drawn as batched text runs rather than cells, so the runs are
+counted too, with the number of text lines they wrote ("lines").
+"""
+
+import json
+import time
+from collections import Counter, defaultdict
+
+HOOKED = (
+    "add_page", "header", "footer", "cell", "line", "ln",
+    "section_header", "sub_header", "body_text", "bullet", "code_block",
+    "table_row", "_emit_row", "wrap_text", "_text_run", "_emit_run", "emit_texts",
+)
+# Hooked methods that write many text lines in one call: their first
+# argument is the list of lines.
+LINE_RUNS = ("_emit_run", "emit_texts")
+# Call counts shown by Profiler.summary(), under shorter labels.
+SUMMARY_CALLS = {"add_page": "add_page", "cell": "cell", "_emit_run": "runs",
+                 "emit_texts": "texts", "lines": "lines", "line": "line", "ln": "ln"}
+
+
+def _content_bytes(pdf):
+    return sum(len(page.contents) for page in pdf.pages.values())
+
+
+class Profiler:
+    """Wall time, pages, call counts and bytes per section, plus the
+    self time of every call stack for flame graphs."""
+
+    def __init__(self, name="document"):
+        self.name = name
+        self.sections = []
+        self.stacks = defaultdict(float)
+        self._stack = []
+        self._calls = None
+
+    def attach(self, pdf):
+        for name in HOOKED:
+            setattr(pdf, name, self._wrap(name, getattr(pdf, name)))
+        return pdf
+
+    def _wrap(self, name, method):
+        stack, stacks = self._stack, self.stacks
+
+        def hooked(*args, **kwargs):
+            self._calls[name] += 1
+            if name in LINE_RUNS:
+                self._calls["lines"] += len(args[0])
+            frame = [name, 0.0]
+            stack.append(frame)
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                stacks[";".join(f[0] for f in stack) + ";" + name] += elapsed - frame[1]
+                stack[-1][1] += elapsed
+
+        return hooked
+
+    def _measure(self, section, pdf, fn):
+        self._calls = Counter()
+        frame = [f"{self.name};{section}", 0.0]
+        self._stack.append(frame)
+        pages, size = pdf.page, _content_bytes(pdf)
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        self._stack.pop()
+        self.stacks[frame[0]] += elapsed - frame[1]
+        self.sections.append({
+            "section": section,
+            "seconds": elapsed,
+            "pages": pdf.page - pages,
+            "bytes": (len(result) if section == "output" else _content_bytes(pdf) - size),
+            "calls": dict(sorted(self._calls.items())),
+        })
+        return result
+
+    def render(self, spec, pdf):
+        """Render `spec` on an attached `pdf`; returns the PDF bytes."""
+        for section, draw in spec.sections.items():
+            self._measure(section, pdf, lambda: draw(pdf))
+        return self._measure("output", pdf, lambda: bytes(pdf.output()))
+
+    def to_json(self):
+        return json.dumps({"document": self.name, "sections": self.sections}, indent=2)
+
+    def collapsed(self):
+        """Stacks in the collapsed format of flamegraph.pl (microseconds)."""
+        return "".join(
+            f"{stack} {round(seconds * 1e6)}\n"
+            for stack, seconds in self.stacks.items() if seconds >= 5e-7
+        )
+
+    def summary(self):
+        lines = [f"{'section':<20} {'ms':>9} {'pages':>5} {'bytes':>9}  calls"]
+        for s in self.sections:
+            calls = " ".join(f"{label}={s['calls'][k]}" for k, label in SUMMARY_CALLS.items()
+                             if k in s["calls"])
+            lines.append(f"{s['section']:<20} {s['seconds'] * 1e3:9.1f} {s['pages']:5d}"
+                         f" {s['bytes']:9,d}  {calls}")
+        return "\n".join(lines)
+
+
+def profile_document(spec, out, prefix):
+    """Render `spec` to `out` with a Profiler; writes <prefix>.json and
+    <prefix>.folded and returns the profiler."""
+    from .document import spec_pdf, write_output
+
+    profiler = Profiler(spec.name.replace(";", ",").replace(" ", "_"))
+    write_output(profiler.render(spec, profiler.attach(spec_pdf(spec))), out)
+    with open(prefix + ".json", "w") as f:
+        f.write(profiler.to_json())
+    with open(prefix + ".folded", "w") as f:
+        f.write(profiler.collapsed())
+    return profiler
@@ -0,0 +1,21 @@
+"""The VoxApp project document, described in specs/projectdocument.json."""
+
+import os
+from functools import lru_cache
+
+from .spec import load_spec
+
+SPEC_PATH = os.path.join(os.path.dirname(__file__), "specs", "projectdocument.json")
+
+
+@lru_cache(maxsize=None)
+def project_document():
+    """The project document spec, loaded on first use: loading scans src/
+    and the SQL migrations."""
+    return load_spec(SPEC_PATH)
+
+
+def __getattr__(name):
+    if name == "PROJECT_DOCUMENT":
+        return project_document()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
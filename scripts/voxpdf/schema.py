@@ -0,0 +1,300 @@
+"""Database schema model built from the Supabase SQL files.
+
+The base schema and the migrations are applied in order. Each file is
+reduced to a list of schema operations (create/alter/drop table, columns,
+foreign keys), cached under the SHA-256 of the file, so a build only parses
+new or changed migrations; replaying the cached operations is cheap.
+Everything that does not change the table structure (data, policies,
+functions, triggers) is skipped.
+"""
+
+import json
+import os
+import re
+
+from .cache import atomic_write, default_cache_dir, file_digest
+from .sources import REPO_ROOT
+
+SCHEMA_FILES = ("supabase-schema.sql", "supabase/migrations/*.sql")
+# Bumped when parse_statement changes, which invalidates the cached ops.
+PARSER_VERSION = 1
+
+IDENT = r'(?:"[^"]+"|[\w$]+)(?:\.(?:"[^"]+"|[\w$]+))?'
+CONSTRAINT_WORDS = {"constraint", "primary", "foreign", "unique", "check", "exclude"}
+COLUMN_STOP = {"not", "null", "default", "primary", "references", "unique", "check",
+               "constraint", "generated", "collate"}
+
+
+def statements(sql):
+    """Split SQL into statements in one pass, dropping comments and keeping
+    quoted strings, quoted identifiers and $tag$ bodies intact."""
+    out, i, n = [], 0, len(sql)
+    start = 0
+    buf = []
+    while i < n:
+        c = sql[i]
+        if c == "-" and sql.startswith("--", i):
+            buf.append(sql[start:i])
+            i = sql.find("\n", i)
+            i = n if i < 0 else i
+            start = i
+        elif c == "/" and sql.startswith("/*", i):
+            buf.append(sql[start:i])
+            i = sql.find("*/", i + 2)
+            i = n if i < 0 else i + 2
+            start = i
+        elif c in "'\"":
+            i += 1
+            while i < n:
+                if sql[i] == c:
+                    if sql.startswith(c, i + 1):  # doubled quote
+                        i += 2
+                        continue
+                    break
+                i += 1
+            i += 1
+        elif c == "$":
+            m = re.match(r"\$\w*\$", sql[i:])
+            if m:
+                end = sql.find(m.group(0), i + len(m.group(0)))
+                i = n if end < 0 else end + len(m.group(0))
+            else:
+                i += 1
+        elif c == ";":
+            buf.append(sql[start:i])
+            out.append(" ".join("".join(buf).split()))
+            buf, i = [], i + 1
+            start = i
+        else:
+            i += 1
+    buf.append(sql[start:])
+    tail = " ".join("".join(buf).split())
+    return [s for s in out + [tail] if s]
+
+
+def split_top(text):
+    """Split on commas outside parentheses and quotes."""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, c in enumerate(text):
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in "'\"":
+            quote = c
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "," and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return [p for p in parts if p]
+
+
+def ident(name):
+    """Unquoted, lower-cased name without a public. schema prefix."""
+    parts = [p.strip('"') if p.startswith('"') else p.lower() for p in name.split(".")]
+    return parts[-1] if parts[0] == "public" or len(parts) == 1 else ".".join(parts)
+
+
+def _cols(text):
+    return [ident(c.strip()) for c in text.split(",") if c.strip()]
+
+
+def parse_column(text):
+    words = text.split()
+    name, type_words = ident(words[0]), []
+    for word in words[1:]:
+        if word.lower() in COLUMN_STOP:
+            break
+        type_words.append(word)
+    column = {"name": name, "type": " ".join(type_words).lower(),
+              "not_null": bool(re.search(r"\bnot\s+null\b|\bprimary\s+key\b", text, re.I))}
+    ref = re.search(rf"\breferences\s+({IDENT})\s*(?:\(([^)]*)\))?", text, re.I)
+    fk = None
+    if ref:
+        fk = [[name], ident(ref.group(1)), _cols(ref.group(2) or "id")]
+    return column, fk
+
+
+def parse_constraint(text):
+    """(name, foreign key or None) of a table constraint."""
+    m = re.match(rf"constraint\s+({IDENT})\s+(.*)", text, re.I)
+    name, body = (ident(m.group(1)), m.group(2)) if m else (None, text)
+    fk = re.match(rf"foreign\s+key\s*\(([^)]*)\)\s*references\s+({IDENT})\s*(?:\(([^)]*)\))?",
+                  body, re.I)
+    if not fk:
+        return name, None
+    return name, [_cols(fk.group(1)), ident(fk.group(2)), _cols(fk.group(3) or "id")]
+
+
+def _keyword(text):
+    return re.match(r"\w*", text).group(0).lower()
+
+
+def _fk_name(table, fk):
+    return f"{table}_{'_'.join(fk[0])}_fkey"
+
+
+def parse_create(table, body):
+    columns, fks = [], {}
+    for part in split_top(body):
+        if _keyword(part) in CONSTRAINT_WORDS:
+            name, fk = parse_constraint(part)
+            if fk:
+                fks[name or _fk_name(table, fk)] = fk
+            continue
+        column, fk = parse_column(part)
+        columns.append(column)
+        if fk:
+            fks[_fk_name(table, fk)] = fk
+    return ["create", table, columns, fks]
+
+
+def parse_alter(table, actions):
+    ops = []
+    for action in split_top(actions):
+        words = action.split()
+        verb = words[0].lower()
+        rest = action[len(words[0]):].strip()
+        if not rest:
+            continue
+        if verb == "add":
+            if _keyword(rest) in CONSTRAINT_WORDS:
+                name, fk = parse_constraint(rest)
+                if fk:
+                    ops.append(["add_fk", table, name or _fk_name(table, fk), fk])
+                continue
+            rest = re.sub(r"^column\s+(?:if\s+not\s+exists\s+)?", "", rest, flags=re.I)
+            column, fk = parse_column(rest)
+            ops.append(["add_column", table, column])
+            if fk:
+                ops.append(["add_fk", table, _fk_name(table, fk), fk])
+        elif verb == "drop":
+            m = re.match(rf"(column|constraint)?\s*(?:if\s+exists\s+)?({IDENT})", rest, re.I)
+            if m:
+                kind = (m.group(1) or "column").lower()
+                ops.append([f"drop_{kind}", table, ident(m.group(2))])
+        elif verb == "rename":
+            m = re.match(rf"(?:column\s+)?({IDENT})\s+to\s+({IDENT})", rest, re.I)
+            if re.match(r"to\s", rest, re.I):
+                ops.append(["rename_table", table, ident(rest.split()[1])])
+            elif m:
+                ops.append(["rename_column", table, ident(m.group(1)), ident(m.group(2))])
+        elif verb == "alter":
+            m = re.match(rf"(?:column\s+)?({IDENT})\s+(.*)", rest, re.I)
+            if not m:
+                continue
+            change = m.group(2).lower()
+            if change in ("drop not null", "set not null"):
+                ops.append(["set_not_null", table, ident(m.group(1)), change.startswith("set")])
+            elif re.match(r"(?:set\s+data\s+)?type\s", change):
+                ops.append(["set_type", table, ident(m.group(1)),
+                            re.sub(r"^(?:set\s+data\s+)?type\s+|\s+using\s.*$", "", change)])
+    return ops
+
+
+def parse_statement(sql):
+    """Schema operations (JSON-able lists) of one statement."""
+    m = re.match(rf"create\s+(?:unlogged\s+)?table\s+(if\s+not\s+exists\s+)?({IDENT})\s*\((.*)\)",
+                 sql, re.I | re.S)
+    if m:
+        return [parse_create(ident(m.group(2)), m.group(3)) + [bool(m.group(1))]]
+    m = re.match(rf"alter\s+table\s+(?:if\s+exists\s+)?(?:only\s+)?({IDENT})\s+(.*)", sql, re.I | re.S)
+    if m:
+        return parse_alter(ident(m.group(1)), m.group(2))
+    m = re.match(r"drop\s+table\s+(?:if\s+exists\s+)?(.*?)(?:\s+cascade|\s+restrict)?$", sql, re.I)
+    if m:
+        return [["drop_table", ident(t.strip())] for t in m.group(1).split(",")]
+    return []
+
+
+def parse_file(path):
+    with open(path, encoding="utf-8") as f:
+        return [op for stmt in statements(f.read()) for op in parse_statement(stmt)]
+
+
+class Schema:
+    """Tables with ordered columns and named foreign keys."""
+
+    def __init__(self):
+        self.tables = {}
+
+    def apply(self, op):
+        kind, table = op[0], op[1]
+        if kind == "create":
+            _, _, columns, fks, if_not_exists = op
+            if not (if_not_exists and table in self.tables):
+                self.tables[table] = {"columns": {c["name"]: c for c in columns}, "fks": dict(fks)}
+            return
+        if kind == "drop_table":
+            self.tables.pop(table, None)
+            return
+        t = self.tables.get(table)
+        if t is None:
+            return  # altering a table created outside these files (e.g. auth.*)
+        if kind == "add_column":
+            t["columns"].setdefault(op[2]["name"], op[2])
+        elif kind == "drop_column":
+            t["columns"].pop(op[2], None)
+            t["fks"] = {k: fk for k, fk in t["fks"].items() if op[2] not in fk[0]}
+        elif kind == "rename_column" and op[2] in t["columns"]:
+            t["columns"] = {(op[3] if k == op[2] else k): dict(c, name=op[3]) if k == op[2] else c
+                            for k, c in t["columns"].items()}
+            for fk in t["fks"].values():
+                fk[0] = [op[3] if c == op[2] else c for c in fk[0]]
+        elif kind == "rename_table":
+            self.tables[op[2]] = self.tables.pop(table)
+        elif kind == "set_not_null" and op[2] in t["columns"]:
+            t["columns"][op[2]]["not_null"] = op[3]
+        elif kind == "set_type" and op[2] in t["columns"]:
+            t["columns"][op[2]]["type"] = op[3]
+        elif kind == "add_fk":
+            t["fks"][op[2]] = op[3]
+        elif kind == "drop_constraint":
+            t["fks"].pop(op[2], None)
+
+
+def schema_files(patterns=SCHEMA_FILES, root=REPO_ROOT):
+    """The SQL files in apply order: each pattern in turn, sorted by name."""
+    files = []
+    for pattern in patterns:
+        files.extend(sorted(root.glob(pattern)))
+    return files
+
+
+def file_ops(path, cache_dir=None):
+    """Parsed operations of one SQL file, cached by its content hash."""
+    cache_dir = cache_dir or os.path.join(default_cache_dir(), "schema")
+    cached = os.path.join(cache_dir, f"{file_digest(path)}-v{PARSER_VERSION}.json")
+    try:
+        with open(cached) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        ops = parse_file(path)
+        atomic_write(cached, json.dumps(ops).encode())
+        return ops
+
+
+def load_schema(patterns=SCHEMA_FILES, root=REPO_ROOT):
+    schema = Schema()
+    for path in schema_files(patterns, root):
+        for op in file_ops(path):
+            schema.apply(op)
+    return schema
+
+
+def schema_blocks(options):
+    """Spec blocks for {"db_schema": {"files": [...], "notes": {table: text}}}."""
+    if not isinstance(options, dict) or set(options) - {"files", "notes"}:
+        raise ValueError("expected an object with 'files' and 'notes'")
+    schema = load_schema(tuple(options.get("files", SCHEMA_FILES)))
+    notes = options.get("notes", {})
+    rows = []
+    for name, table in schema.tables.items():
+        refs = "; ".join(f"{', '.join(cols)} -> {ref}" for cols, ref, _ in table["fks"].values())
+        rows.append([name, notes.get(name, "-"), ", ".join(table["columns"]), refs or "-"])
+    return [{"table": {"widths": [32, 30, 80, 38],
+                       "header": ["Tabel", "Scope", "Kolommen", "Verwijst naar"],
+                       "rows": rows}}]
@@ -0,0 +1,147 @@
+"""Inventories of the VoxApp source tree for generated document sections.
+
+Source files are parsed with a few regular expressions (exported names,
+exported HTTP handlers, the first top-level comment). The results are kept
+in a persistent index keyed by path, mtime and size, so a rebuild only
+reads the files that changed; those are read in a thread pool.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path, PurePosixPath
+
+from .cache import atomic_write, default_cache_dir
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+INDEX_VERSION = 1
+
+HTTP_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS")
+EXPORT = re.compile(
+    r"^export\s+(?:default\s+)?(?:async\s+)?"
+    r"(?:function\*?|const|let|var|class|interface|type|enum)\s+(\w+)", re.M)
+# The first comment that starts a line: a /* */ block or a run of // lines.
+COMMENT = re.compile(r"^(?:/\*\*?(.*?)\*/|((?://[^\n]*(?:\n|$))+))", re.M | re.S)
+# "GET: ...", "POST - ..." and "POST /api/..." lines in handler comments.
+METHOD_PREFIX = re.compile(r"^(?:%s)\b\s*(?:[:\-—]\s*|/\S*\s*)" % "|".join(HTTP_METHODS))
+
+
+def first_comment(text):
+    """First line with words of the first top-level comment, or ""."""
+    m = COMMENT.search(text)
+    if not m:
+        return ""
+    body = m.group(1) if m.group(1) is not None else m.group(2)
+    for line in body.splitlines():
+        line = METHOD_PREFIX.sub("", line.strip().lstrip("/*").strip())
+        if re.search(r"[A-Za-z]", line) and not re.fullmatch(r"[=\-─\s]*", line):
+            return line
+    return ""
+
+
+def parse_source(text):
+    exports = EXPORT.findall(text)
+    return {
+        "exports": exports,
+        "methods": [name for name in exports if name in HTTP_METHODS],
+        "doc": first_comment(text),
+    }
+
+
+def _read(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return parse_source(f.read())
+
+
+class SourceIndex:
+    """Parsed source files under `root`, persisted between runs."""
+
+    def __init__(self, root=REPO_ROOT, path=None):
+        self.root = Path(root)
+        if path is None:
+            name = hashlib.sha1(str(self.root.resolve()).encode()).hexdigest()[:16]
+            path = os.path.join(default_cache_dir(), "sources", name + ".json")
+        self.path = path
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            self.files = data["files"] if data.get("version") == INDEX_VERSION else {}
+        except (OSError, ValueError, KeyError):
+            self.files = {}
+
+    def scan(self, pattern):
+        """{relative path: parsed} for files matching the glob `pattern`,
+        re-reading only new and changed files; entries of deleted files
+        below the pattern's directory are dropped."""
+        found, stale = {}, []
+        for path in sorted(self.root.glob(pattern)):
+            rel = path.relative_to(self.root).as_posix()
+            st = path.stat()
+            entry = self.files.get(rel)
+            if entry is None or entry["stamp"] != [st.st_mtime_ns, st.st_size]:
+                stale.append((rel, path, [st.st_mtime_ns, st.st_size]))
+            found[rel] = entry
+        base = pattern.split("*", 1)[0]
+        gone = [rel for rel in self.files if rel.startswith(base) and rel not in found
+                and not (self.root / rel).exists()]
+        for rel in gone:
+            del self.files[rel]
+        if stale:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(8, len(stale))) as pool:
+                parsed = pool.map(_read, [path for _, path, _ in stale])
+                for (rel, _, stamp), result in zip(stale, parsed):
+                    found[rel] = self.files[rel] = {"stamp": stamp, **result}
+        if stale or gone:
+            atomic_write(self.path, json.dumps(
+                {"version": INDEX_VERSION, "files": self.files}, sort_keys=True).encode())
+        return found
+
+
+def api_routes(directory="src/app/api", index=None):
+    """[(route, methods, doc)] for every route.ts below `directory`."""
+    index = index or SourceIndex()
+    app = PurePosixPath(directory).parent  # Next.js routes are relative to app/
+    return sorted(
+        ("/" + PurePosixPath(rel).parent.relative_to(app).as_posix(), info["methods"], info["doc"])
+        for rel, info in index.scan(f"{directory}/**/route.ts").items()
+    )
+
+
+def lib_files(directory="src/lib", index=None):
+    """[(file name, exports, doc)] for the TypeScript files in `directory`."""
+    index = index or SourceIndex()
+    files = {**index.scan(f"{directory}/*.ts"), **index.scan(f"{directory}/*.tsx")}
+    return sorted((rel.rsplit("/", 1)[1], info["exports"], info["doc"])
+                  for rel, info in files.items())
+
+
+def route_blocks(directory):
+    """Spec blocks listing the API routes, one table per top-level path."""
+    routes = api_routes(directory)
+    groups = {}
+    for route, methods, doc in routes:
+        group = "/".join(route.split("/")[:3])
+        groups.setdefault(group, []).append([route, " ".join(methods) or "-", doc or "-"])
+    blocks = [{"sub_header": f"API Routes ({len(routes)} endpoints)"}]
+    for group, rows in groups.items():
+        blocks += [
+            {"text": group, "size": 9, "style": "B", "color": [50, 50, 80], "height": 6, "ln": 7},
+            {"table": {"widths": [60, 34, 86], "header": ["Route", "Methodes", "Beschrijving"],
+                       "rows": rows}},
+            {"space": 4},
+        ]
+    return blocks
+
+
+def lib_blocks(directory):
+    """Spec blocks listing the library files with their exports."""
+    rows = [[name, doc or "-", ", ".join(exports) or "-"]
+            for name, exports, doc in lib_files(directory)]
+    return [
+        {"sub_header": f"Library Bestanden ({directory}/)"},
+        {"table": {"widths": [40, 70, 70], "header": ["Bestand", "Functie", "Exports"],
+                   "rows": rows}},
+    ]
@@ -0,0 +1,603 @@
+"""Declarative document specs: parse and validate once, render many times.
+
+A spec is a JSON, TOML or YAML file (YAML needs PyYAML) of the form::
+
+    {"name": "...", "sections": [{"name": "...", "blocks": [...]}]}
+
+Every block is an object with one type key, optionally followed by the
+parameters that block type accepts:
+
+    {"page": true}                       new page
+    {"toc": 1}                           table of contents with page numbers:
+                                         section headers, with 2 also sub
+                                         headers; one per document
+    {"space": 4}                         vertical space (mm)
+    {"keep": 50}                         new page unless 50 mm are left
+    {"section_header": "..."}            VoxPDF.section_header
+    {"sub_header": "..."}                VoxPDF.sub_header
+    {"body_text": "..."}                 VoxPDF.body_text
+    {"bullet": "...", "marker": "1.", "indent": 1}
+                                         VoxPDF.bullet; the marker ("-")
+                                         and nesting level (0) are optional
+    {"bullets": ["...", "..."]}          one bullet per item
+    {"code_block": "..."}                VoxPDF.code_block
+    {"table": {"widths": [..], "header": [..], "rows": [[..], ..]}}
+    {"text": "...", "size": 16, "style": "B", "color": [r, g, b],
+     "height": 10, "align": "C", "ln": 12}
+    {"rule": [x1, x2], "color": [r, g, b]}
+                                         true for x1, x2 instead: from
+                                         margin to margin
+    {"image": "partners/x.png", "width": 40, "height": 20, "align": "C"}
+                                         an image from public/ (one of width
+                                         and height may be left out)
+    {"logos": ["a.png", "b.png"], "height": 14}
+                                         images side by side, centered
+    {"template": "name", "fields": {"key": "value"}}
+    {"api_routes": "src/app/api"}        generated from the source tree,
+    {"lib_files": "src/lib"}             see sources.py
+    {"db_schema": {"notes": {..}}}       generated from the SQL, see schema.py
+    {"counts": {"bullet": "{api_routes} routes, {db_tables} tabellen"}}
+                                         the block with {api_routes} and
+                                         {db_tables} filled in from the
+                                         source tree and the SQL
+
+Strings may contain {t:dotted.key} markers for the web app's translations;
+see i18n.py. A top-level "logo": "partners/x.png" draws that image at the
+left of every page header (see images.py). A top-level "font": "dejavu"
+draws the document with a Unicode TrueType family instead of the core
+fonts; see fonts.py.
+
+A heading, and a caption line right above a table, is kept on the page
+with the first lines of its content: compile_spec() puts a
+VoxPDF.keep_with_next() call before it, which measures those lines once
+per process (pdf.lead_height) instead of reserving a guessed height.
+
+A spec may define reusable block lists under "templates": {"name": [...]}.
+A template block draws those blocks with every {key} in their strings
+replaced by its field. Runs of blocks without fields (other than page and
+keep) become templates.Template objects: they are laid out once per process
+and stamped after that, so only the fields are laid out per document.
+
+Compiled specs are DocumentSpec objects whose sections replay a flat list
+of pre-cleaned VoxPDF calls; load_spec() caches them per file, until the
+file or one of the files its generated blocks read changes.
+"""
+
+import hashlib
+import json
+import os
+import re
+from functools import partial
+from operator import methodcaller
+
+from . import i18n, images, schema, sources
+from .document import DocumentSpec
+from .templates import Template
+from .text import clean
+
+TEXT_BLOCKS = ("section_header", "sub_header", "body_text", "bullet", "code_block")
+
+# Table of contents level of each heading block.
+HEADING_LEVELS = {"section_header": 0, "sub_header": 1}
+TOC_DEPTHS = (1, 2)
+
+# Allowed parameters besides the type key itself.
+PARAMS = {
+    "page": (),
+    "toc": (),
+    "space": (),
+    "keep": (),
+    "bullets": (),
+    "table": (),
+    "text": ("font", "size", "style", "color", "height", "align", "ln"),
+    "rule": ("color",),
+    "image": ("width", "height", "align"),
+    "logos": ("height",),
+    "template": ("fields",),
+    **{name: () for name in TEXT_BLOCKS},
+    "bullet": ("marker", "indent"),
+}
+
+
+class SpecError(ValueError):
+    """A document spec that does not validate."""
+
+
+def _fail(where, message):
+    raise SpecError(f"{where}: {message}")
+
+
+def _number(value, where):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        _fail(where, f"expected a number, got {value!r}")
+    return value
+
+
+def _string(value, where, norm=clean):
+    if not isinstance(value, str):
+        _fail(where, f"expected a string, got {value!r}")
+    return norm(value)
+
+
+def _color(value, where):
+    if (not isinstance(value, list) or len(value) != 3
+            or not all(isinstance(c, int) and 0 <= c <= 255 for c in value)):
+        _fail(where, f"expected [r, g, b] with 0-255 values, got {value!r}")
+    return tuple(value)
+
+
+def _cells(value, count, where, norm=clean):
+    if not isinstance(value, list) or len(value) != count:
+        _fail(where, f"expected a list of {count} cells, got {value!r}")
+    return [norm(str(v)) for v in value]
+
+
+def _compile_table(table, where, norm=clean):
+    if not isinstance(table, dict) or set(table) - {"widths", "header", "rows"}:
+        _fail(where, "expected an object with widths, header and rows")
+    widths = table.get("widths")
+    if not isinstance(widths, list) or not widths:
+        _fail(where + ".widths", "expected a list of column widths")
+    widths = [_number(w, f"{where}.widths") for w in widths]
+    calls = []
+    if "header" in table:
+        header = _cells(table["header"], len(widths), where + ".header", norm)
+        calls.append(methodcaller("table_row", header, widths, bold=True))
+    rows = table.get("rows", [])
+    if not isinstance(rows, list):
+        _fail(where + ".rows", "expected a list of rows")
+    for i, row in enumerate(rows):
+        calls.append(methodcaller("table_row", _cells(row, len(widths), f"{where}.rows[{i}]", norm), widths))
+    return calls
+
+
+def _compile_text(block, where, norm=clean):
+    calls = []
+    if any(k in block for k in ("font", "size", "style")):
+        calls.append(methodcaller(
+            "set_font",
+            _string(block.get("font", "Helvetica"), where + ".font"),
+            _string(block.get("style", ""), where + ".style"),
+            _number(block.get("size", 10), where + ".size"),
+        ))
+    if "color" in block:
+        calls.append(methodcaller("set_text_color", *_color(block["color"], where + ".color")))
+    align = block.get("align", "L")
+    if align not in ("L", "C", "R"):
+        _fail(where + ".align", f"expected L, C or R, got {align!r}")
+    height = _number(block.get("height", 6), where + ".height")
+    calls.append(methodcaller("cell", 0, height, _string(block["text"], where, norm), align=align))
+    if "ln" in block:
+        calls.append(methodcaller("ln", _number(block["ln"], where + ".ln")))
+    return calls
+
+
+COUNTS = {
+    "api_routes": lambda: len(sources.api_routes()),
+    "db_tables": lambda: len(schema.load_schema().tables),
+}
+
+
+def count_blocks(block):
+    """[block] with its {api_routes} and {db_tables} fields filled in."""
+    if not isinstance(block, dict) or len(block) != 1:
+        raise ValueError("expected one block")
+    names = set(FIELD.findall(json.dumps(block, ensure_ascii=False))) & set(COUNTS)
+    return [_fill(block, {name: COUNTS[name]() for name in names})]
+
+
+# Blocks expanded into plain blocks before compiling, so the spec digest
+# covers what they generate.
+GENERATED = {
+    "api_routes": sources.route_blocks,
+    "lib_files": sources.lib_blocks,
+    "db_schema": schema.schema_blocks,
+    "counts": count_blocks,
+}
+
+# Files each generated block reads, as glob patterns below the repository
+# root; generate-pdf.py --watch polls them.
+INPUTS = {
+    "api_routes": lambda directory: [f"{directory}/**/route.ts"],
+    "lib_files": lambda directory: [f"{directory}/*.ts", f"{directory}/*.tsx"],
+    "db_schema": lambda options: list(options.get("files", schema.SCHEMA_FILES)),
+    "counts": lambda block: ["src/app/api/**/route.ts", *schema.SCHEMA_FILES],
+}
+
+
+def _expand(blocks, where, inputs):
+    out = []
+    for j, block in enumerate(blocks):
+        kind = next(iter(block), None) if isinstance(block, dict) else None
+        if kind not in GENERATED:
+            out.append(block)
+            continue
+        if len(block) != 1:
+            _fail(f"{where}[{j}]", f"{kind!r} takes no other keys")
+        try:
+            out.extend(GENERATED[kind](block[kind]))
+            inputs.extend(INPUTS[kind](block[kind]))
+        except (TypeError, ValueError) as e:
+            _fail(f"{where}[{j}].{kind}", str(e))
+    return out
+
+
+FIELD = re.compile(r"\{(\w+)\}")
+
+# Compiled static runs by content hash, shared by all specs in the process.
+_static = {}
+
+
+def _fill(value, fields):
+    """`value` with {key} fields substituted; the same object if none apply."""
+    if isinstance(value, str):
+        filled = FIELD.sub(lambda m: str(fields.get(m.group(1), m.group(0))), value)
+        return value if filled == value else filled
+    if isinstance(value, (list, dict)):
+        items = list(value.items() if isinstance(value, dict) else enumerate(value))
+        filled = {k: _fill(v, fields) for k, v in items}
+        if all(filled[k] is v for k, v in items):
+            return value
+        return filled if isinstance(value, dict) else list(filled.values())
+    return value
+
+
+def _static_run(run, where, font=None):
+    """Template for consecutive static blocks, given as (index, block)."""
+    blocks = [block for _, block in run]
+    key = hashlib.sha256(json.dumps([font, blocks], sort_keys=True).encode()).hexdigest()
+    template = _static.get(key)
+    if template is None:
+        calls = []
+        for j, block in run:
+            calls.extend(compile_block(block, f"{where}[{j}]", font=font))
+        template = _static[key] = Template(partial(_replay, tuple(calls)), key)
+    return template
+
+
+def _compile_template(value, block, templates, where, font=None):
+    if not isinstance(value, str) or value not in templates:
+        _fail(where, f"unknown template {value!r}")
+    fields = block.get("fields", {})
+    if not isinstance(fields, dict) or not all(
+            isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in fields.values()):
+        _fail(where + ".fields", "expected an object of string or number fields")
+    at = f"templates.{value}"
+    calls, run = [], []
+    for j, item in enumerate(templates[value]):
+        filled = _fill(item, fields)
+        if filled is item and isinstance(item, dict) and not {"page", "keep"} & set(item):
+            run.append((j, item))
+            continue
+        if run:
+            calls.append(_static_run(run, at, font))
+            run = []
+        calls.extend(compile_block(filled, f"{where} ({at}[{j}])", font=font))
+    if run:
+        calls.append(_static_run(run, at, font))
+    return calls
+
+
+def _normalizer(font):
+    if font is None:
+        return clean
+    from .fonts import family_cleaner
+
+    return family_cleaner(font)
+
+
+def compile_block(block, where, templates=None, font=None):
+    """Validate one block and turn it into a list of VoxPDF calls; text is
+    normalized for `font` (see fonts.py), or for the core fonts."""
+    if not isinstance(block, dict) or not block:
+        _fail(where, f"expected a block object, got {block!r}")
+    kind = next(iter(block))
+    if kind not in PARAMS:
+        _fail(where, f"unknown block type {kind!r}")
+    extra = set(block) - {kind} - set(PARAMS[kind])
+    if extra:
+        _fail(where, f"unexpected parameter(s) for {kind}: {', '.join(sorted(extra))}")
+    value = block[kind]
+    norm = _normalizer(font)
+    if kind == "page":
+        return [methodcaller("new_page")]
+    if kind == "toc":
+        _fail(where, "a table of contents belongs directly in a section")
+    if kind == "space":
+        return [methodcaller("ln", _number(value, where))]
+    if kind == "keep":
+        return [methodcaller("check_page_break", _number(value, where))]
+    if kind == "bullet" and ("marker" in block or "indent" in block):
+        marker = _string(block.get("marker", "-"), where + ".marker", norm)
+        indent = block.get("indent", 0)
+        if isinstance(indent, bool) or not isinstance(indent, int) or indent < 0:
+            _fail(where + ".indent", f"expected a nesting level of 0 or more, got {indent!r}")
+        return [methodcaller(kind, _string(value, where, norm), marker, indent)]
+    if kind in TEXT_BLOCKS:
+        return [methodcaller(kind, _string(value, where, norm))]
+    if kind == "bullets":
+        if not isinstance(value, list):
+            _fail(where, "expected a list of bullet texts")
+        return [methodcaller("bullet", _string(v, f"{where}[{i}]", norm)) for i, v in enumerate(value)]
+    if kind == "table":
+        return _compile_table(value, where + ".table", norm)
+    if kind == "text":
+        return _compile_text(block, where, norm)
+    if kind == "template":
+        return _compile_template(value, block, templates or {}, where, font)
+    if kind == "image":
+        align = block.get("align", "C")
+        if align not in ("L", "C", "R"):
+            _fail(where + ".align", f"expected L, C or R, got {align!r}")
+        return [methodcaller("image_block", *_image_request(block, where), align=align)]
+    if kind == "logos":
+        requests = _logo_requests(block, where)
+        return [methodcaller("image_row", [path for path, _, _ in requests], requests[0][2])]
+    # rule
+    if value is not True and (not isinstance(value, list) or len(value) != 2):
+        _fail(where, f"expected [x1, x2] or true, got {value!r}")
+    calls = []
+    if "color" in block:
+        calls.append(methodcaller("set_draw_color", *_color(block["color"], where + ".color")))
+    xs = () if value is True else value
+    calls.append(methodcaller("rule", *(_number(x, where) for x in xs)))
+    return calls
+
+
+DEFAULT_IMAGE_WIDTH = 60
+LOGO_HEIGHT = 6
+DEFAULT_LOGO_ROW_HEIGHT = 14
+
+
+def _image_request(block, where):
+    """(path, width, height) of an image block."""
+    if not isinstance(block["image"], str):
+        _fail(where, f"expected an image name, got {block['image']!r}")
+    try:
+        path = str(images.image_path(block["image"]))
+    except ValueError as e:
+        _fail(where, str(e))
+    w, h = block.get("width"), block.get("height")
+    if w is None and h is None:
+        w = DEFAULT_IMAGE_WIDTH
+    return (path, None if w is None else _number(w, where + ".width"),
+            None if h is None else _number(h, where + ".height"))
+
+
+def _logo_requests(block, where):
+    if not isinstance(block["logos"], list) or not block["logos"]:
+        _fail(where, "expected a list of image names")
+    h = block.get("height", DEFAULT_LOGO_ROW_HEIGHT)
+    return [_image_request({"image": name, "height": h}, f"{where}[{i}]")
+            for i, name in enumerate(block["logos"])]
+
+
+def _image_requests(blocks, templates, where):
+    """The image requests of compiled `blocks`, including their templates'."""
+    for block in blocks:
+        kind = next(iter(block))
+        if kind == "image":
+            yield _image_request(block, where)
+        elif kind == "logos":
+            yield from _logo_requests(block, where)
+        elif kind == "template":
+            filled = _fill(templates[block["template"]], block.get("fields", {}))
+            yield from _image_requests(filled, templates, where)
+
+
+def _heading_levels(blocks, templates):
+    """Levels of the headings `blocks` draw, including their templates'."""
+    for block in blocks:
+        kind = next(iter(block), None) if isinstance(block, dict) else None
+        if kind in HEADING_LEVELS:
+            yield HEADING_LEVELS[kind]
+        elif kind == "template" and isinstance(block["template"], str):
+            yield from _heading_levels(templates.get(block["template"], ()), templates)
+
+
+def _toc_depth(block, where):
+    if len(block) != 1:
+        _fail(where, "'toc' takes no other keys")
+    if block["toc"] not in TOC_DEPTHS:
+        _fail(where, f"expected a depth of 1 or 2, got {block['toc']!r}")
+    return block["toc"]
+
+
+def _lead(block, norm):
+    """(kind, value) for pdf.lead_height() of the start of a validated
+    content block, or None for blocks a heading is not kept with."""
+    kind = next(iter(block))
+    value = block[kind]
+    if kind in ("body_text", "bullet", "code_block"):
+        return kind, norm(value)
+    if kind == "bullets" and value:
+        return "bullet", norm(value[0])
+    if kind == "table":
+        rows = value.get("rows") or [None]
+        return kind, tuple(
+            None if cells is None else tuple(norm(str(c)) for c in cells)
+            for cells in (value.get("header"), rows[0])) + (tuple(value["widths"]),)
+    return None
+
+
+def _keep_chain(blocks, j, norm):
+    """What VoxPDF.keep_with_next() keeps together from validated blocks[j]
+    on: the headings, spaces and caption lines there and the start of the
+    content after them. None unless blocks[j] is a heading followed by
+    content, or a caption line followed by a table."""
+    kind = next(iter(blocks[j]))
+    if kind not in HEADING_LEVELS and kind != "text":
+        return None
+    chain = []
+    for block in blocks[j:]:
+        kind = next(iter(block))
+        if kind in HEADING_LEVELS:
+            chain.append((kind, None))
+        elif kind == "space":
+            chain.append(("space", block[kind]))
+        elif kind == "text":
+            chain.append(("space", max(block.get("height", 6), block.get("ln", 0))))
+        else:
+            lead = _lead(block, norm)
+            if lead is None or (chain[0][0] == "space" and lead[0] != "table"):
+                return None
+            return tuple(chain) + (lead,)
+    return None
+
+
+def _replay(calls, pdf):
+    for call in calls:
+        call(pdf)
+
+
+def compile_spec(data, where="spec", language=None, font=None, translate=True):
+    """Validate parsed spec data and compile it into a DocumentSpec.
+
+    {t:key} markers are translated to `language`, by default the spec's
+    "language" or Dutch; the language also sets the page header and footer.
+    Pass translate=False for data built from user content (tenant rows,
+    Markdown), whose strings are drawn as they are. `font` (by default the
+    spec's "font") names a Unicode font family from fonts.py to draw with
+    instead of the core fonts.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("sections"), list):
+        _fail(where, "expected an object with a 'sections' list")
+    language = language or data.get("language")
+    if language is not None and language not in i18n.LANGUAGES:
+        _fail(where, f"unknown language {language!r}")
+    inputs = []
+    if translate and "{t:" in json.dumps(data, ensure_ascii=False):
+        inputs.append(i18n.TRANSLATIONS.relative_to(sources.REPO_ROOT).as_posix())
+        try:
+            data = i18n.translate(data, language or i18n.DEFAULT_LANGUAGE)
+        except ValueError as e:
+            _fail(where, str(e))
+    if language is not None:
+        data = dict(data, language=language)  # part of the digest
+    font = font or data.get("font")
+    font_files = ()
+    if font is not None:
+        from .fonts import font_paths
+
+        try:
+            font_files = font_paths(font)
+        except (TypeError, ValueError) as e:
+            _fail(where + ".font", str(e))
+        data = dict(data, font=font)
+    templates = data.get("templates", {})
+    if not isinstance(templates, dict) or not all(isinstance(t, list) for t in templates.values()):
+        _fail(where + ".templates", "expected an object of block lists")
+    data = dict(data, sections=[
+        dict(section, blocks=_expand(section["blocks"], f"{where}.sections[{i}].blocks", inputs))
+        if isinstance(section, dict) and isinstance(section.get("blocks"), list) else section
+        for i, section in enumerate(data["sections"])
+    ])
+    requests = []
+    logo = data.get("logo")
+    if logo is not None:
+        logo = _image_request({"image": logo, "height": LOGO_HEIGHT}, where + ".logo")
+        requests.append(logo)
+        logo = (logo[0], LOGO_HEIGHT)
+    # Everything but the sections can change how any section is drawn.
+    context = json.dumps({k: v for k, v in data.items() if k != "sections"},
+                         sort_keys=True, ensure_ascii=False)
+    sections, seen, page_breaks, section_digests = [], set(), [], {}
+    # Headings in document order, to size the table of contents.
+    levels = [level for section in data["sections"]
+              if isinstance(section, dict) and isinstance(section.get("blocks"), list)
+              for level in _heading_levels(section["blocks"], templates)]
+    heading, toc, norm = 0, None, _normalizer(font)
+    for i, section in enumerate(data["sections"]):
+        at = f"{where}.sections[{i}]"
+        if not isinstance(section, dict) or not isinstance(section.get("name"), str):
+            _fail(at, "expected an object with a 'name'")
+        name = section["name"]
+        if name in seen:
+            _fail(at, f"duplicate section name {name!r}")
+        seen.add(name)
+        blocks = section.get("blocks", [])
+        if not isinstance(blocks, list):
+            _fail(at + ".blocks", "expected a list of blocks")
+        compiled = []
+        for j, block in enumerate(blocks):
+            if isinstance(block, dict) and next(iter(block), None) == "toc":
+                if toc:
+                    _fail(f"{at}.blocks[{j}]", "a document has one table of contents")
+                depth = _toc_depth(block, f"{at}.blocks[{j}]")
+                entries = sum(level < depth for level in levels[heading:])
+                toc = (name, depth, entries)
+                compiled.append([methodcaller("toc", depth, entries)])
+                continue
+            compiled.append(compile_block(block, f"{at}.blocks[{j}]", templates, font))
+            heading += sum(1 for _ in _heading_levels([block], templates))
+        calls = []
+        for j, block_calls in enumerate(compiled):
+            chain = _keep_chain(blocks, j, norm)
+            if chain is not None:
+                calls.append(methodcaller("keep_with_next", chain))
+            calls.extend(block_calls)
+        requests.extend(_image_requests(blocks, templates, at))
+        first = blocks[0] if blocks else {}
+        if "template" in first:
+            first = (templates.get(first["template"]) or [{}])[0]
+        if next(iter(first), None) == "page":
+            page_breaks.append(name)
+        sections.append((name, partial(_replay, tuple(calls))))
+        section_digests[name] = hashlib.sha256((context + json.dumps(
+            section, sort_keys=True, ensure_ascii=False)).encode("utf-8")).hexdigest()
+    digest = hashlib.sha256(
+        json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+    return DocumentSpec(str(data.get("name", "document")), sections, digest, font_files,
+                        page_breaks=page_breaks, language=language, font=font,
+                        images=dict.fromkeys(requests), logo=logo,
+                        section_digests=section_digests, inputs=dict.fromkeys(inputs),
+                        toc=toc)
+
+
+def parse_spec(path):
+    """Read a spec file; the format follows the file extension."""
+    path = os.fspath(path)
+    if path.endswith(".toml"):
+        import tomllib
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise SpecError(f"{path}: YAML specs need PyYAML (pip install pyyaml)") from e
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+_compiled = {}
+
+
+def _input_digest(spec):
+    """Digest of the (mtime, size) of every file the generated blocks and
+    translations of `spec` were built from (DocumentSpec.inputs)."""
+    h = hashlib.sha256()
+    for pattern in spec.inputs:
+        for path in sorted(sources.REPO_ROOT.glob(pattern)):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            h.update(f"{path}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+    return h.hexdigest()
+
+
+def load_spec(path, language=None, font=None):
+    """Parsed, validated and compiled spec, cached until the file or one
+    of the files its generated blocks read changes."""
+    path = os.path.abspath(os.fspath(path))
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _compiled.get((path, language, font))
+    if cached is None or cached[0] != key or cached[2] != _input_digest(cached[1]):
+        spec = compile_spec(parse_spec(path), where=path, language=language, font=font)
+        cached = _compiled[path, language, font] = (key, spec, _input_digest(spec))
+    return cached[1]
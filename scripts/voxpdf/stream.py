@@ -0,0 +1,220 @@
+"""Streaming table reports: rows in from an iterator, pages out to disk.
+
+VoxPDF still does the layout, but every page is written out as soon as it
+is finished and dropped from the FPDF object, so memory use depends on the
+size of one page, not on the number of rows.
+"""
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+import zlib
+
+from .document import creation_date
+from .text import clean
+
+# Columns (key, label, width in mm) per exported table; widths add up to 190.
+TABLES = {
+    "appointments": ("Afspraken", [
+        ("start_time", "Start", 32),
+        ("end_time", "Einde", 32),
+        ("customer_name", "Klant", 40),
+        ("customer_phone", "Telefoon", 26),
+        ("status", "Status", 22),
+        ("notes", "Notities", 38),
+    ]),
+    "conversations": ("Gesprekken", [
+        ("created_at", "Datum", 34),
+        ("customer_phone", "Telefoon", 26),
+        ("duration_seconds", "Duur (s)", 16),
+        ("status", "Status", 20),
+        ("summary", "Samenvatting", 94),
+    ]),
+    "orders": ("Bestellingen", [
+        ("created_at", "Datum", 34),
+        ("customer_name", "Klant", 40),
+        ("order_type", "Type", 20),
+        ("status", "Status", 22),
+        ("total_amount", "Totaal", 22),
+        ("notes", "Notities", 52),
+    ]),
+    "usage_monthly": ("Maandverbruik", [
+        ("month", "Maand", 22),
+        ("business_id", "Business", 68),
+        ("total_calls", "Gesprekken", 25),
+        ("total_minutes", "Minuten", 25),
+        ("included_minutes", "Inbegrepen", 25),
+        ("extra_minutes", "Extra", 25),
+    ]),
+}
+
+
+def read_rows(path):
+    """Lazily yield dict rows from a CSV or JSONL dump; a row that does not
+    parse raises ValueError naming the file and line."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if str(path).endswith(".csv"):
+            reader = csv.DictReader(f)
+            try:
+                yield from reader
+            except csv.Error as e:
+                raise ValueError(f"{path}:{reader.line_num}: {e}") from None
+            return
+        for n, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{n}: {e.msg}") from None
+                if not isinstance(row, dict):
+                    raise ValueError(f"{path}:{n}: expected a JSON object per line")
+                yield row
+
+
+class PageWriter:
+    """Incremental PDF writer for pages that use only core fonts.
+
+    Object 1 is the page tree and object 2 the shared resources; both are
+    written last. Page content and page objects are written as they arrive,
+    and their xref entries go to a spill file instead of a list in memory.
+    """
+
+    def __init__(self, fh, width_pt, height_pt):
+        self.fh = fh
+        self.media_box = f"[0 0 {width_pt:.2f} {height_pt:.2f}]"
+        self.xref = tempfile.TemporaryFile()
+        self.next_id = 3
+        self.pages = 0
+        self._fixed = {}
+        self.fh.write(b"%PDF-1.3\n%\xe2\xe3\xcf\xd3\n")
+
+    def _obj(self, body, obj_id=None):
+        if obj_id is None:
+            obj_id = self.next_id
+            self.next_id += 1
+            self.xref.write(b"%010d 00000 n \n" % self.fh.tell())
+        else:
+            self._fixed[obj_id] = self.fh.tell()
+        self.fh.write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+        return obj_id
+
+    def add_page(self, contents):
+        data = zlib.compress(bytes(contents))
+        content_id = self._obj(
+            b"<</Filter /FlateDecode /Length %d>>\nstream\n" % len(data)
+            + data + b"\nendstream"
+        )
+        self._obj(
+            b"<</Type /Page /Parent 1 0 R /MediaBox %s /Resources 2 0 R /Contents %d 0 R>>"
+            % (self.media_box.encode(), content_id)
+        )
+        self.pages += 1
+
+    def close(self, fonts, creation_date):
+        font_refs = []
+        for font in fonts:
+            encoding = "" if font.name in ("Symbol", "ZapfDingbats") else " /Encoding /WinAnsiEncoding"
+            font_id = self._obj(
+                f"<</Type /Font /Subtype /Type1 /BaseFont /{font.name}{encoding}>>".encode()
+            )
+            font_refs.append(f"/F{font.i} {font_id} 0 R")
+        self._obj(
+            f"<</ProcSet [/PDF /Text] /Font <<{' '.join(font_refs)}>>>>".encode(), obj_id=2
+        )
+        # Page objects are every second object starting at 4.
+        self._fixed[1] = self.fh.tell()
+        self.fh.write(b"1 0 obj\n<</Type /Pages /Count %d /Kids [" % self.pages)
+        for first in range(0, self.pages, 1000):
+            stop = min(first + 1000, self.pages)
+            self.fh.write(b"".join(b"%d 0 R " % (4 + 2 * i) for i in range(first, stop)))
+        self.fh.write(b"]>>\nendobj\n")
+        stamp = creation_date.strftime("D:%Y%m%d%H%M%SZ").encode()
+        info_id = self._obj(b"<</Producer (VoxPDF) /CreationDate (%s)>>" % stamp)
+        root_id = self._obj(b"<</Type /Catalog /Pages 1 0 R>>")
+        start = self.fh.tell()
+        self.fh.write(b"xref\n0 3\n0000000000 65535 f \n")
+        for obj_id in (1, 2):
+            self.fh.write(b"%010d 00000 n \n" % self._fixed[obj_id])
+        self.fh.write(b"3 %d\n" % (self.next_id - 3))
+        self.xref.seek(0)
+        shutil.copyfileobj(self.xref, self.fh)
+        self.xref.close()
+        self.fh.write(
+            b"trailer\n<</Size %d /Root %d 0 R /Info %d 0 R>>\nstartxref\n%d\n%%%%EOF\n"
+            % (self.next_id, root_id, info_id, start)
+        )
+
+
+def _streaming_pdf_class():
+    from .pdf import VoxPDF
+
+    class StreamingPDF(VoxPDF):
+        """VoxPDF that hands each finished page to a PageWriter."""
+
+        writer = None
+
+        def footer(self):
+            # The total page count is unknown while pages are being written.
+            self.set_y(-15)
+            self.set_font("Helvetica", "I", 8)
+            self.set_text_color(150, 150, 150)
+            super(VoxPDF, self).cell(0, 10, f"Pagina {self.page_no()}", align="C")
+
+        def _beginpage(self, *args, **kwargs):
+            if self.page:
+                self._spill()
+            super()._beginpage(*args, **kwargs)
+
+        def _spill(self):
+            self.writer.add_page(self.pages.pop(self.page).contents)
+            self._resource_catalog.resources_per_page.clear()
+
+        def finish(self):
+            self._render_footer()
+            self._spill()
+            self.writer.close(self.fonts.values(), self.creation_date)
+
+    return StreamingPDF
+
+
+def stream_table(rows, columns, out=None, title=None, wrap=False):
+    """Render `rows` (dicts) as a table with `columns` (key, label, width).
+
+    `out` is a path or binary file object; with out=None the PDF is spilled
+    to a temporary file and returned as bytes. Returns the page count when
+    writing to `out`.
+    """
+    if out is None:
+        with tempfile.TemporaryFile() as tmp:
+            stream_table(rows, columns, tmp, title, wrap)
+            tmp.seek(0)
+            return tmp.read()
+    if not hasattr(out, "write"):
+        with open(out, "wb") as fh:
+            return stream_table(rows, columns, fh, title, wrap)
+
+    pdf = _streaming_pdf_class()()
+    pdf.set_creation_date(creation_date())
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.writer = PageWriter(out, pdf.w_pt, pdf.h_pt)
+    pdf.add_page()
+    if title:
+        pdf.section_header(title)
+    keys = [key for key, _, _ in columns]
+    widths = [w for _, _, w in columns]
+    pdf.table_row([label for _, label, _ in columns], widths, bold=True)
+    for row in rows:
+        if isinstance(row, dict):
+            row = [row.get(key) for key in keys]
+        pdf.table_row(["" if v is None else clean(str(v)) for v in row], widths, wrap=wrap)
+    pdf.finish()
+    return pdf.writer.pages
+
+
+def export_table(table, path, out=None):
+    """Stream a CSV/JSONL dump of one of the TABLES to a PDF."""
+    title, columns = TABLES[table]
+    name = os.path.basename(str(path))
+    return stream_table(read_rows(path), columns, out, title=f"{title} ({name})")
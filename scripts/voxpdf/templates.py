@@ -0,0 +1,169 @@
+"""Templates: static drawing recorded once per process, then stamped.
+
+A Template wraps a draw function for a block whose output never changes,
+such as the page header or the fixed text of a tenant document. The first
+call draws live, records the bytes it added to the page and puts the stamp
+of that recording in their place, so that it writes what later calls do.
+Later calls in the same starting state append those bytes, moved to the
+current y, instead of laying the block out again. A block that crosses a
+page break, uses an embedded font or an image, or adds a table of contents
+entry is never recorded and is simply drawn live. dump() and load() turn a
+Recording into JSON data and back, for callers that keep them between runs.
+
+In specs, {"template": "name", "fields": {...}} stamps one of the spec's
+"templates"; see spec.py.
+"""
+
+import re
+
+IMAGE_OP = re.compile(rb"/I\d+ Do")
+
+# (template key, starting state) -> Recording, shared by every document
+# rendered in this process.
+RECORDINGS = {}
+
+
+def core_fonts(pdf):
+    """{font number: (fontkey, style)} of the core fonts `pdf` has used."""
+    # Core font keys are the lowercase family followed by the style letters.
+    return {font.i: (key, key[len(key.rstrip("BI")):])
+            for key, font in pdf.fonts.items() if font.type == "core"}
+
+
+def _state(pdf):
+    # The page geometry too: documents of different page sizes (A4, the
+    # ticket roll) share the recordings of this process.
+    return (
+        pdf.font_family, pdf.font_style, pdf.font_size_pt, pdf.x, pdf.line_width,
+        str(pdf.text_color), str(pdf.fill_color), str(pdf.draw_color), pdf.toc_depth,
+        pdf.w, pdf.l_margin, pdf.r_margin, pdf.t_margin,
+    )
+
+
+class Recording:
+    __slots__ = ("stream", "fonts", "y", "dy", "reach", "x", "font", "text_color",
+                 "fill_color", "draw_color", "table_header")
+
+    def stamp(self, pdf):
+        fill, draw = pdf.fill_color, pdf.draw_color
+        pdf._graft(self.stream, self.fonts, pdf.y - self.y)
+        pdf.x, pdf.y = self.x, pdf.y + self.dy
+        # The graft restored the stream's graphics state; bring it in line
+        # with the state the block leaves behind.
+        if self.font[0]:
+            pdf.set_font(*self.font)
+        pdf.current_font_is_set_on_page = False
+        pdf.text_color = self.text_color
+        if self.fill_color != fill:
+            pdf.fill_color = self.fill_color
+            pdf._out(self.fill_color.serialize().lower())
+        if self.draw_color != draw:
+            pdf.draw_color = self.draw_color
+            pdf._out(self.draw_color.serialize().upper())
+        pdf._table_header = self.table_header
+
+
+def record(pdf, draw):
+    """Draw live and return a Recording of the output, or None when the
+    output cannot be replayed."""
+    page, y, line_width = pdf.page, pdf.y, pdf.line_width
+    outline = len(pdf._outline)
+    # Start with the font unset on the page, so the recorded bytes select it.
+    pdf.current_font_is_set_on_page = False
+    start = len(pdf.pages[page].contents)
+    # Note how far down every page break check reached: a replay is only
+    # valid where none of them would break the page.
+    checks = [y]
+    will_page_break = pdf.will_page_break
+    # Recordings nest (a page header inside a block), so restore the probe
+    # of an outer recording rather than deleting it.
+    outer = vars(pdf).get("will_page_break")
+
+    def probe(h):
+        checks.append(pdf.y + h)
+        return will_page_break(h)
+
+    pdf.will_page_break = probe
+    try:
+        draw(pdf)
+    finally:
+        if outer is None:
+            del pdf.will_page_break
+        else:
+            pdf.will_page_break = outer
+    if (pdf.page != page or pdf.line_width != line_width or len(pdf._outline) != outline
+            or IMAGE_OP.search(pdf.pages[page].contents, start)
+            or any(font.type != "core" for font in pdf.fonts.values())):
+        return None
+    rec = Recording()
+    rec.stream = bytes(pdf.pages[page].contents[start:])
+    rec.fonts = core_fonts(pdf)
+    rec.y, rec.dy, rec.x = y, pdf.y - y, pdf.x
+    rec.reach = max(max(checks), pdf.y) - y
+    rec.font = (pdf.font_family, pdf.font_style, pdf.font_size_pt)
+    rec.text_color, rec.fill_color = pdf.text_color, pdf.fill_color
+    rec.draw_color, rec.table_header = pdf.draw_color, pdf._table_header
+    return rec
+
+
+def _color(color):
+    return [type(color).__name__, *(getattr(color, slot) for slot in type(color).__slots__)]
+
+
+def _load_color(data):
+    from fpdf import drawing_primitives
+
+    return getattr(drawing_primitives, data[0])(*data[1:])
+
+
+def dump(rec):
+    """A Recording as JSON data; the stream is kept as latin-1 text."""
+    if rec.table_header is not None:
+        raise ValueError("a recording that leaves a table header open is not kept")
+    return {
+        "stream": rec.stream.decode("latin-1"),
+        "fonts": [[i, key, style] for i, (key, style) in rec.fonts.items()],
+        "y": rec.y, "dy": rec.dy, "reach": rec.reach, "x": rec.x, "font": list(rec.font),
+        "colors": [_color(c) for c in (rec.text_color, rec.fill_color, rec.draw_color)],
+    }
+
+
+def load(data):
+    """The Recording dumped as `data`."""
+    rec = Recording()
+    rec.stream = data["stream"].encode("latin-1")
+    rec.fonts = {i: (key, style) for i, key, style in data["fonts"]}
+    rec.y, rec.dy, rec.reach, rec.x = data["y"], data["dy"], data["reach"], data["x"]
+    rec.font = tuple(data["font"])
+    rec.text_color, rec.fill_color, rec.draw_color = map(_load_color, data["colors"])
+    rec.table_header = None
+    return rec
+
+
+class Template:
+    """Static drawing `draw(pdf)` under a key naming its content."""
+
+    def __init__(self, draw, key):
+        self.draw = draw
+        self.key = key
+
+    def __call__(self, pdf):
+        if pdf.font_map:
+            self.draw(pdf)  # drawn with embedded fonts: never recorded
+            return
+        state = (self.key, _state(pdf))
+        rec = RECORDINGS.get(state)
+        if rec is not None and pdf.y + rec.reach <= pdf.page_break_trigger:
+            rec.stamp(pdf)
+            return
+        page, y = pdf.page, pdf.y
+        fill, draw = pdf.fill_color, pdf.draw_color
+        start = len(pdf.pages[page].contents)
+        rec = record(pdf, self.draw)
+        if rec is not None:
+            RECORDINGS[state] = rec
+            # Put the stamp in place of the live drawing, so that a block
+            # comes out the same whether or not it was recorded before.
+            del pdf.pages[page].contents[start:]
+            pdf.y, pdf.fill_color, pdf.draw_color = y, fill, draw
+            rec.stamp(pdf)
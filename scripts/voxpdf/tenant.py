@@ -0,0 +1,154 @@
+"""Per-tenant onboarding document, built as a spec from a businesses row."""
+
+from .spec import compile_spec
+
+# Mirrors PLAN_FACTS / PLAN_MINUTES in src/lib/planFacts.ts.
+PLAN_FACTS = {
+    "starter": {"name": "Starter", "price_eur": 99, "minutes": 375,
+                "appointments": 190, "extra_minute_eur": 0.40},
+    "pro": {"name": "Pro", "price_eur": 149, "minutes": 940,
+            "appointments": 470, "extra_minute_eur": 0.35},
+    "business": {"name": "Business", "price_eur": 249, "minutes": 1875,
+                 "appointments": 940, "extra_minute_eur": 0.30},
+}
+PLAN_ALIASES = {"professional": "pro", "enterprise": "business"}
+
+DAYS = [
+    ("monday", "Maandag"), ("tuesday", "Dinsdag"), ("wednesday", "Woensdag"),
+    ("thursday", "Donderdag"), ("friday", "Vrijdag"), ("saturday", "Zaterdag"),
+    ("sunday", "Zondag"),
+]
+
+
+def amount(value):
+    """A price with a decimal comma: 3,50."""
+    return f"{float(value):.2f}".replace(".", ",")
+
+
+def euro(value):
+    return "EUR " + amount(value)
+
+
+def plan_facts(plan):
+    plan = (plan or "starter").lower()
+    return PLAN_FACTS.get(PLAN_ALIASES.get(plan, plan), PLAN_FACTS["starter"])
+
+
+def _value(v):
+    return "-" if v in (None, "") else str(v)
+
+
+def opening_rows(hours):
+    rows = []
+    for key, label in DAYS:
+        day = (hours or {}).get(key) or {}
+        if not day or day.get("closed"):
+            rows.append([label, "Gesloten", ""])
+        else:
+            rows.append([label, _value(day.get("open")), _value(day.get("close"))])
+    return rows
+
+
+# Laid out once per process (see templates.py); only the {fields} and the
+# service and staff tables are laid out per tenant.
+TEMPLATES = {
+    "titel": [
+        {"page": True},
+        {"space": 40},
+        {"text": "{name}", "size": 24, "style": "B", "color": [26, 26, 46],
+         "height": 14, "align": "C", "ln": 16},
+        {"text": "VoxApp Onboarding Pakket", "size": 14, "color": [80, 80, 100],
+         "height": 10, "align": "C", "ln": 30},
+    ],
+    "bedrijf": [
+        {"section_header": "1. BEDRIJFSGEGEVENS"},
+        {"table": {"widths": [55, 125], "header": ["Gegeven", "Waarde"], "rows": [
+            ["Naam", "{name}"],
+            ["Type", "{type}"],
+            ["Telefoon", "{phone}"],
+            ["E-mail", "{email}"],
+            ["Website", "{website}"],
+            ["Adres", "{address}"],
+            ["VoxApp nummer", "{ai_phone_number}"],
+            ["Welkomstboodschap", "{welcome_message}"],
+        ]}},
+        {"sub_header": "Openingsuren"},
+    ],
+    "abonnement": [
+        {"section_header": "4. ABONNEMENT"},
+        {"table": {"widths": [60, 120], "header": ["Plan", "{plan}"], "rows": [
+            ["Prijs", "{price} per maand"],
+            ["Minuten", "{minutes} per maand"],
+            ["Afspraken", "ongeveer {appointments} per maand"],
+            ["Extra minuut", "{extra_minute}"],
+            ["Status", "{subscription_status}"],
+        ]}},
+    ],
+    "volgende-stappen": [
+        {"section_header": "5. VOLGENDE STAPPEN"},
+        {"bullets": [
+            "Controleer uw bedrijfsgegevens en openingsuren hierboven.",
+            "Vul ontbrekende diensten en medewerkers aan via het dashboard.",
+            "Zet doorschakeling naar uw VoxApp nummer aan.",
+            "Bel zelf een testgesprek en beluister het resultaat in Gesprekken.",
+        ]},
+    ],
+}
+
+
+def tenant_spec_data(business):
+    """Spec data (see spec.py) for one business with its services and staff."""
+    name = business.get("name") or "Onbekend bedrijf"
+    address = " ".join(filter(None, [
+        business.get("street"), business.get("postal_code"), business.get("city"),
+    ])) or "-"
+    plan = plan_facts(business.get("subscription_plan"))
+    services = [s for s in business.get("services") or [] if s.get("is_active", True)]
+    staff = [s for s in business.get("staff") or [] if s.get("is_active", True)]
+    fields = {key: _value(business.get(key)) for key in (
+        "type", "phone", "email", "website", "ai_phone_number", "welcome_message",
+        "subscription_status",
+    )}
+    fields.update(name=name, address=address)
+
+    blocks = [
+        {"template": "titel", "fields": {"name": name}},
+        {"template": "bedrijf", "fields": fields},
+        {"table": {"widths": [60, 60, 60], "header": ["Dag", "Open", "Sluit"],
+                   "rows": opening_rows(business.get("opening_hours"))}},
+        {"page": True},
+        {"section_header": "2. DIENSTEN"},
+    ]
+    if services:
+        blocks.append({"table": {"widths": [100, 40, 40], "header": ["Dienst", "Duur", "Prijs"],
+                                 "rows": [[s.get("name") or "-",
+                                           f"{s.get('duration_minutes') or 30} min",
+                                           euro(s["price"]) if s.get("price") is not None else "-"]
+                                          for s in services]}})
+    else:
+        blocks.append({"body_text": "Nog geen diensten ingesteld. Voeg ze toe via het dashboard."})
+    blocks.append({"section_header": "3. MEDEWERKERS"})
+    if staff:
+        blocks.append({"table": {"widths": [60, 70, 50], "header": ["Naam", "E-mail", "Telefoon"],
+                                 "rows": [[s.get("name") or "-", _value(s.get("email")),
+                                           _value(s.get("phone"))] for s in staff]}})
+    else:
+        blocks.append({"body_text": "Nog geen medewerkers ingesteld."})
+    blocks += [
+        {"template": "abonnement", "fields": {
+            "plan": plan["name"],
+            "price": euro(plan["price_eur"]),
+            "minutes": plan["minutes"],
+            "appointments": plan["appointments"],
+            "extra_minute": euro(plan["extra_minute_eur"]),
+            "subscription_status": fields["subscription_status"],
+        }},
+        {"template": "volgende-stappen"},
+    ]
+    return {"name": name, "templates": TEMPLATES,
+            "sections": [{"name": "onboarding", "blocks": blocks}]}
+
+
+def tenant_document(business):
+    return compile_spec(tenant_spec_data(business), where=f"business {business.get('id')}",
+                        translate=False)
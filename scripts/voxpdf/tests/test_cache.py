@@ -0,0 +1,43 @@
+from voxpdf.cache import BuildCache
+from voxpdf.document import DocumentSpec
+from voxpdf.spec import compile_spec
+
+DATA = {
+    "name": "Cache test",
+    "sections": [
+        {"name": "intro", "blocks": [{"page": True}, {"section_header": "Intro"},
+                                    {"body_text": "Eerste versie."}]},
+        {"name": "slot", "blocks": [{"page": True}, {"bullet": "Tot ziens"}]},
+    ],
+}
+
+
+def test_builds_of_the_same_spec_are_identical(tmp_path):
+    # Separate cache roots, so both builds render.
+    first, second = tmp_path / "first.pdf", tmp_path / "second.pdf"
+    assert BuildCache(tmp_path / "a").build(compile_spec(DATA), first)[1] == "rendered"
+    assert BuildCache(tmp_path / "b").build(compile_spec(DATA), second)[1] == "rendered"
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_changed_section_changes_the_key(tmp_path):
+    cache = BuildCache(tmp_path)
+    changed = dict(DATA, sections=[DATA["sections"][0],
+                                   {"name": "slot", "blocks": [{"bullet": "Tot morgen"}]}])
+    assert cache.key(compile_spec(DATA)) == cache.key(compile_spec(DATA))
+    assert cache.key(compile_spec(DATA)) != cache.key(compile_spec(changed))
+
+
+def test_changed_font_or_image_file_changes_the_key(tmp_path):
+    cache = BuildCache(tmp_path)
+    font, image = tmp_path / "face.ttf", tmp_path / "logo.png"
+    font.write_bytes(b"font 1")
+    image.write_bytes(b"image 1")
+    spec = DocumentSpec("doc", {}, "digest", fonts=(str(font),),
+                        images={(str(image), 40, None): None})
+    keys = [cache.key(spec)]
+    font.write_bytes(b"font 2")
+    keys.append(cache.key(spec))
+    image.write_bytes(b"image 2")
+    keys.append(cache.key(spec))
+    assert len(set(keys)) == 3
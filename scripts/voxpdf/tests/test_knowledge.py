@@ -0,0 +1,23 @@
+from voxpdf.knowledge import near_duplicates, signature
+
+OPENING_HOURS = ("De garage is open van maandag tot en met vrijdag van acht tot zes uur,"
+                 " op zaterdag van negen tot twaalf uur en op zondag gesloten. Op feestdagen"
+                 " zijn we gesloten, tenzij anders vermeld op de website.")
+
+
+def test_near_identical_entries_are_paired():
+    entries = [
+        OPENING_HOURS,
+        "Een afspraak voor een onderhoudsbeurt maakt u telefonisch of via de website;"
+        " reken op ongeveer twee uur voor een kleine beurt.",
+        OPENING_HOURS.replace("De garage is open", "Onze garage is open"),
+        "",
+    ]
+    signatures = [signature(text) for text in entries]
+    assert signatures[3] is None
+    assert near_duplicates(signatures) == {2: 0}
+
+
+def test_distinct_entries_are_kept():
+    entries = [OPENING_HOURS, "Winterbanden wisselen kost 40 euro, inclusief balanceren."]
+    assert near_duplicates([signature(text) for text in entries]) == {}
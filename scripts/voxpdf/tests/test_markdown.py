@@ -0,0 +1,61 @@
+from voxpdf.document import render_bytes
+from voxpdf.markdown import blocks
+from voxpdf.spec import compile_spec
+
+SOURCE = """\
+# Handleiding
+
+Welkom bij **VoxApp**.
+
+Instellingen
+------------
+
+```python
+print("hallo")
+
+```
+
+1. Eerste stap
+2. Tweede stap
+   over twee regels
+
+- Boven
+  - Midden
+    * Onder
+  - Weer midden
+- Weer boven
+
+---
+## Einde ##
+"""
+
+
+def test_blocks():
+    assert list(blocks(SOURCE.splitlines(keepends=True))) == [
+        (1, {"section_header": "Handleiding"}),
+        (0, {"body_text": "Welkom bij VoxApp. "}),
+        (2, {"sub_header": "Instellingen"}),
+        (0, {"code_block": 'print("hallo")\n'}),
+        (0, {"bullet": "Eerste stap", "marker": "1."}),
+        (0, {"bullet": "Tweede stap over twee regels", "marker": "2."}),
+        (0, {"bullet": "Boven"}),
+        (0, {"bullet": "Midden", "indent": 1}),
+        (0, {"bullet": "Onder", "indent": 2}),
+        (0, {"bullet": "Weer midden", "indent": 1}),
+        (0, {"bullet": "Weer boven"}),
+        (0, {"rule": True, "color": [200, 200, 200]}),
+        (0, {"space": 4}),
+        (2, {"sub_header": "Einde"}),
+    ]
+
+
+def test_a_new_list_starts_at_the_top_level():
+    lines = ["Tekst\n", "\n", "  - eerste\n", "    - tweede\n", "\n", "Tekst\n", "\n", "  - derde\n"]
+    bullets = [block for _, block in blocks(lines) if "bullet" in block]
+    assert bullets == [{"bullet": "eerste"}, {"bullet": "tweede", "indent": 1}, {"bullet": "derde"}]
+
+
+def test_blocks_render():
+    data = {"name": "md", "sections": [
+        {"name": "md", "blocks": [{"page": True}] + [b for _, b in blocks(SOURCE.splitlines())]}]}
+    assert render_bytes(compile_spec(data, translate=False)).startswith(b"%PDF")
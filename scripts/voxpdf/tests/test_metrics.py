@@ -0,0 +1,65 @@
+import pytest
+from fpdf import FPDF
+
+from voxpdf import metrics
+from voxpdf.bench import PARAGRAPH
+
+TEXTS = [
+    PARAGRAPH,
+    "Donaudampfschiffahrtsgesellschaftskapitaen belt over /api/tenant/appointments/confirm",
+    "x" * 300,
+    "eén café, één crème brûlée en een flûte voor 12 EUR",
+    "trailing spaces at the end of the text   ",
+    "a",
+]
+
+
+def multi_cell_lines(pdf, text, w):
+    """The lines fpdf's multi_cell() breaks `text` into, without the blank
+    line that spaces overflowing the last line leave behind."""
+    lines = [line.rstrip() for line in pdf.multi_cell(w, 4, text, dry_run=True, output="LINES")]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+@pytest.mark.parametrize("font", [("Helvetica", ""), ("Helvetica", "B"), ("Courier", "")])
+@pytest.mark.parametrize("w", [20, 60, 180])
+@pytest.mark.parametrize("text", TEXTS)
+def test_wrap_breaks_like_multi_cell(text, w, font):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font(*font, 9)
+    max_units = (w - 2 * pdf.c_margin) * pdf.k * 1000 / pdf.font_size_pt
+    widths = metrics.glyph_widths(pdf.current_font.fontkey)
+    expected = multi_cell_lines(pdf, text, w)
+    assert metrics.wrap(text, max_units, widths) == expected
+    assert list(metrics.iter_wrap(text.split(), max_units, widths)) == expected
+
+
+def test_wrap_of_blank_text_has_no_lines():
+    widths = metrics.glyph_widths("helvetica")
+    assert metrics.wrap("", 1000, widths) == []
+    assert metrics.wrap("   ", 1000, widths) == []
+
+
+@pytest.mark.parametrize("max_units", [1000, 3000, 12000])
+def test_truncate_fits_and_ends_with_the_suffix(max_units):
+    widths = metrics.glyph_widths("helvetica")
+    out = metrics.truncate(PARAGRAPH, max_units, widths)
+    assert out.endswith("..") and PARAGRAPH.startswith(out[:-2])
+    assert metrics.text_width(out, widths) <= max_units
+    # The longest prefix that fits: one more character would not.
+    longer = PARAGRAPH[:len(out) - 1] + ".."
+    assert metrics.text_width(longer, widths) > max_units
+
+
+def test_truncate_keeps_text_that_fits():
+    widths = metrics.glyph_widths("helvetica")
+    assert metrics.truncate("kort", 5000, widths) == "kort"
+
+
+def test_truncate_to_less_than_the_suffix():
+    widths = metrics.glyph_widths("helvetica")
+    assert metrics.truncate(PARAGRAPH, 300, widths) == "."
+    assert metrics.truncate(PARAGRAPH, 100, widths) == ""
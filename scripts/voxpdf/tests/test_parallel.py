@@ -0,0 +1,21 @@
+from voxpdf.document import render
+from voxpdf.parallel import render_parallel
+from voxpdf.project import SPEC_PATH
+from voxpdf.spec import load_spec
+from voxpdf.watch import SectionCache
+
+
+def outline(pdf):
+    """Page count and (name, level, page, top) of every outline section."""
+    pdf.output()
+    return pdf.pages_count, [(s.name, s.level, s.page_number, round(s.dest.top, 2))
+                             for s in pdf._outline]
+
+
+def test_stitched_documents_keep_the_table_of_contents():
+    spec = load_spec(SPEC_PATH)
+    assert spec.toc and spec.splittable
+    serial = outline(render(spec))
+    assert serial[1]
+    assert outline(render_parallel(spec, 2)) == serial
+    assert outline(SectionCache().render(spec)[0]) == serial
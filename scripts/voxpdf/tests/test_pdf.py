@@ -0,0 +1,30 @@
+import re
+
+from voxpdf.document import new_pdf
+
+TEXT = re.compile(rb"Tm \((.*?)\) Tj")
+
+
+def row_texts(pdf, cols, widths, wrap=True):
+    """The text lines of one table_row(), as drawn on the page."""
+    start = len(pdf.pages[pdf.page].contents)
+    pdf.table_row(cols, widths, wrap=wrap)
+    return [t.decode("latin-1") for t in TEXT.findall(bytes(pdf.pages[pdf.page].contents[start:]))]
+
+
+def test_table_row_is_never_taller_than_a_page():
+    pdf = new_pdf()
+    pdf.add_page()
+    texts = row_texts(pdf, ["kort", "woord " * 3000], [30, 60])
+    assert pdf.page == 1 and pdf.y <= pdf.page_break_trigger
+    assert texts[0] == "kort" and texts[-1] == "..."
+    assert len(texts) > 2
+
+
+def test_table_row_without_wrap_cuts_cells():
+    pdf = new_pdf()
+    pdf.add_page()
+    y = pdf.y
+    texts = row_texts(pdf, ["kort", "woord " * 30], [30, 60], wrap=False)
+    assert texts[0] == "kort" and texts[1].endswith("..") and len(texts) == 2
+    assert pdf.y == y + 6
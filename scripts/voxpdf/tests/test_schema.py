@@ -0,0 +1,73 @@
+from voxpdf.schema import load_schema, parse_alter, parse_file
+
+BASE = """
+CREATE TABLE IF NOT EXISTS businesses (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  name TEXT NOT NULL, -- shown on tickets
+  phone TEXT
+);
+CREATE TABLE pool_numbers (id UUID PRIMARY KEY, phone_number TEXT NOT NULL);
+CREATE TABLE forwarding_numbers (
+  id UUID PRIMARY KEY,
+  business_id UUID REFERENCES businesses(id) ON DELETE CASCADE,
+  pool_number_id UUID,
+  CONSTRAINT forwarding_numbers_pool_number_id_fkey
+    FOREIGN KEY (pool_number_id) REFERENCES phone_numbers(id)
+);
+CREATE TABLE old_logs (id SERIAL);
+"""
+
+MIGRATION = """
+ALTER TABLE businesses ADD COLUMN IF NOT EXISTS welcome_message TEXT DEFAULT 'Hallo; welkom';
+ALTER TABLE businesses ENABLE ROW LEVEL SECURITY;
+ALTER TABLE forwarding_numbers
+  DROP CONSTRAINT IF EXISTS forwarding_numbers_pool_number_id_fkey;
+ALTER TABLE forwarding_numbers
+  ADD CONSTRAINT forwarding_numbers_pool_number_id_fkey
+  FOREIGN KEY (pool_number_id) REFERENCES pool_numbers(id);
+ALTER TABLE businesses ALTER COLUMN name DROP NOT NULL, DROP COLUMN phone;
+ALTER TABLE pool_numbers RENAME COLUMN phone_number TO number;
+DROP TABLE IF EXISTS old_logs CASCADE;
+CREATE OR REPLACE FUNCTION touch() RETURNS trigger AS $$ BEGIN RETURN NEW; END; $$ LANGUAGE plpgsql;
+"""
+
+
+def write(root, name, sql):
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(sql, encoding="utf-8")
+    return path
+
+
+def test_migration_ops(tmp_path):
+    assert parse_file(write(tmp_path, "migrations/001.sql", MIGRATION)) == [
+        ["add_column", "businesses", {"name": "welcome_message", "type": "text", "not_null": False}],
+        ["drop_constraint", "forwarding_numbers", "forwarding_numbers_pool_number_id_fkey"],
+        ["add_fk", "forwarding_numbers", "forwarding_numbers_pool_number_id_fkey",
+         [["pool_number_id"], "pool_numbers", ["id"]]],
+        ["set_not_null", "businesses", "name", False],
+        ["drop_column", "businesses", "phone"],
+        ["rename_column", "pool_numbers", "phone_number", "number"],
+        ["drop_table", "old_logs"],
+    ]
+
+
+def test_migrations_apply_in_order(tmp_path, monkeypatch):
+    monkeypatch.setenv("VOXPDF_CACHE_DIR", str(tmp_path / "cache"))
+    write(tmp_path, "schema.sql", BASE)
+    write(tmp_path, "migrations/001.sql", MIGRATION)
+    tables = load_schema(("schema.sql", "migrations/*.sql"), tmp_path).tables
+    assert list(tables) == ["businesses", "pool_numbers", "forwarding_numbers"]
+    assert list(tables["businesses"]["columns"]) == ["id", "name", "welcome_message"]
+    assert not tables["businesses"]["columns"]["name"]["not_null"]
+    assert list(tables["pool_numbers"]["columns"]) == ["id", "number"]
+    assert tables["forwarding_numbers"]["fks"] == {
+        "forwarding_numbers_business_id_fkey": [["business_id"], "businesses", ["id"]],
+        "forwarding_numbers_pool_number_id_fkey": [["pool_number_id"], "pool_numbers", ["id"]],
+    }
+
+
+def test_incomplete_actions_are_skipped():
+    assert parse_alter("t", "drop") == []
+    assert parse_alter("t", "alter column") == []
+    assert parse_alter("t", "alter column x, drop constraint c") == [["drop_constraint", "t", "c"]]
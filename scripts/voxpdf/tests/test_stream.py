@@ -0,0 +1,31 @@
+import re
+import zlib
+
+from voxpdf.bench import stream_peak, synthetic_orders
+from voxpdf.stream import TABLES, stream_table
+
+ROWS = 20_000
+CONTENT = re.compile(rb"/Length (\d+)>>\nstream\n")
+
+
+def page_contents(data):
+    """Decompressed content stream of every page written by PageWriter."""
+    for m in CONTENT.finditer(data):
+        yield zlib.decompress(data[m.end():m.end() + int(m.group(1))])
+
+
+def test_peak_memory_does_not_grow_with_rows():
+    small, large = stream_peak(1_000), stream_peak(ROWS)
+    assert large < 1.5 * small, (small, large)
+
+
+def test_header_row_repeats_on_every_page(tmp_path):
+    out = tmp_path / "orders.pdf"
+    title, columns = TABLES["orders"]
+    pages = stream_table(synthetic_orders(ROWS), columns, str(out), title=title)
+    contents = list(page_contents(out.read_bytes()))
+    assert pages > 1 and len(contents) == pages
+    for content in contents:
+        for _, label, _ in columns:
+            assert b"(%s) Tj" % label.encode() in content
+    assert b"(Klant %d) Tj" % (ROWS - 1) in contents[-1]
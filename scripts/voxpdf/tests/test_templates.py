@@ -0,0 +1,43 @@
+from voxpdf import templates
+from voxpdf.document import render_bytes
+from voxpdf.pdf import VoxPDF
+from voxpdf.project import SPEC_PATH
+from voxpdf.spec import load_spec
+from voxpdf.templates import Template
+from voxpdf.tenant import tenant_document
+
+BUSINESS = {
+    "id": "b1", "name": "Kapsalon Els", "type": "salon", "plan": "pro",
+    "services": [{"name": "Knippen", "price": 25, "duration_minutes": 30}],
+    "staff": [{"name": "Els"}],
+}
+
+
+def render_twice(make_spec):
+    """The bytes of two renders in one process, the first with no
+    recordings yet."""
+    templates.RECORDINGS.clear()
+    return render_bytes(make_spec()), render_bytes(make_spec())
+
+
+def test_tenant_document_renders_the_same_twice():
+    first, second = render_twice(lambda: tenant_document(BUSINESS))
+    assert first == second
+
+
+def test_project_document_renders_the_same_twice():
+    first, second = render_twice(lambda: load_spec(SPEC_PATH))
+    assert first == second
+
+
+def test_recordings_follow_the_page_geometry():
+    templates.RECORDINGS.clear()
+    header = Template(lambda pdf: pdf.cell(0, 6, "Kop", border="B"), "kop")
+    # Only the right margin differs, which moves where the border ends.
+    for right in (10, 25):
+        pdf = VoxPDF()
+        pdf.set_margins(10, 10, right)
+        pdf.add_page()
+        pdf.set_font("Helvetica", "", 9)
+        header(pdf)
+    assert sum(key == "kop" for key, _ in templates.RECORDINGS) == 2
@@ -0,0 +1,12 @@
+from voxpdf.bench import synthetic_calls
+from voxpdf.transcripts import stream_transcripts
+
+
+def test_bad_durations_do_not_stop_the_export(tmp_path):
+    calls = list(synthetic_calls(31))
+    calls[15]["duration_seconds"] = "n/a"
+    calls[15]["transcript"][1]["time_in_call_secs"] = "?"
+    out = tmp_path / "calls.pdf"
+    count, pages = stream_transcripts(calls, str(out))
+    assert count == 31 and pages > 1
+    assert out.read_bytes().rstrip().endswith(b"%%EOF")
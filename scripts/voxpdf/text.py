@@ -0,0 +1,200 @@
+"""Text normalization for the latin-1 core fonts (and Unicode fonts, see
+cleaner())."""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+MEMO_SIZE = 4096
+# Longer text is translated without the memo: it rarely repeats, and the
+# memo would keep it alive.
+MEMO_MAX_LENGTH = 200
+
+# Hand-picked replacements; these win over the generic decomposition below.
+FALLBACKS = {
+    "\u2014": "-",    # em dash
+    "\u2013": "-",    # en dash
+    "\u2010": "-",    # hyphen
+    "\u2011": "-",    # non-breaking hyphen
+    "\u2012": "-",    # figure dash
+    "\u2015": "-",    # horizontal bar
+    "\u2212": "-",    # minus sign
+    "\u2018": "'",    # left single quote
+    "\u2019": "'",    # right single quote
+    "\u201a": "'",    # low single quote
+    "\u201b": "'",    # reversed single quote
+    "\u2032": "'",    # prime
+    "\u201c": '"',    # left double quote
+    "\u201d": '"',    # right double quote
+    "\u201e": '"',    # low double quote
+    "\u201f": '"',    # reversed double quote
+    "\u2033": '"',    # double prime
+    "\u2039": "<",    # single angle quote
+    "\u203a": ">",    # single angle quote
+    "\u2026": "...",  # ellipsis
+    "\u2022": "*",    # bullet
+    "\u2023": "*",    # triangular bullet
+    "\u2043": "*",    # hyphen bullet
+    "\u25cf": "*",    # black circle
+    "\u25aa": "*",    # small square
+    "\u2192": "->",   # arrow
+    "\u2190": "<-",   # arrow
+    "\u2194": "<->",  # arrow
+    "\u21d2": "=>",   # double arrow
+    "\u21d4": "<=>",  # double arrow
+    "\u2193": "v",    # down arrow
+    "\u2191": "^",    # up arrow
+    "\u2265": ">=",   # >=
+    "\u2264": "<=",   # <=
+    "\u2260": "!=",   # !=
+    "\u2248": "~",    # approx
+    "\u2713": "v",    # check mark
+    "\u2714": "v",    # heavy check mark
+    "\u2717": "x",    # ballot x
+    "\u2718": "x",    # heavy ballot x
+    "\u2122": "TM",   # trade mark
+    "\u20ac": "E",    # euro sign
+    "\u0152": "OE",   # ligature
+    "\u0153": "oe",   # ligature
+    "\u0141": "L",    # L stroke
+    "\u0142": "l",    # l stroke
+    "\u0110": "D",    # D stroke
+    "\u0111": "d",    # d stroke
+    "\u200b": "",     # zero width space
+    "\u200c": "",     # zero width non-joiner
+    "\u200d": "",     # zero width joiner
+    "\u2060": "",     # word joiner
+    "\ufeff": "",     # byte order mark
+}
+
+# Blocks that get a precomputed entry; anything else is resolved on first use.
+PRECOMPUTED_BLOCKS = (
+    (0x0100, 0x0250),  # Latin Extended-A/B
+    (0x1E00, 0x1F00),  # Latin Extended Additional
+    (0x2000, 0x2070),  # General Punctuation
+    (0x20A0, 0x20D0),  # Currency Symbols
+    (0x2100, 0x2150),  # Letterlike Symbols
+    (0x2190, 0x2200),  # Arrows
+    (0x2200, 0x2300),  # Mathematical Operators
+    (0xFB00, 0xFB07),  # Latin ligatures
+)
+
+
+class Normalized(str):
+    """A str that already went through clean(); later passes return it as is."""
+
+    __slots__ = ()
+
+
+def fallback(char):
+    """Latin-1 replacement for a single character."""
+    if char in FALLBACKS:
+        return FALLBACKS[char]
+    if ord(char) < 256:
+        return char
+    decomposed = unicodedata.normalize("NFKD", char)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    if stripped and all(ord(c) < 256 for c in stripped):
+        return stripped
+    return "?"
+
+
+def _build_table():
+    table = {cp: cp for cp in range(256)}
+    for start, stop in PRECOMPUTED_BLOCKS:
+        for cp in range(start, stop):
+            table[cp] = fallback(chr(cp))
+    for char, repl in FALLBACKS.items():
+        table[ord(char)] = repl
+    return table
+
+
+TABLE = _build_table()
+NOT_LATIN1 = re.compile("[^\x00-\xff]")
+
+
+def _common(text):
+    """The typography that report text is made of (see FALLBACKS). A
+    str.replace() of an absent character costs next to nothing, which
+    str.translate() with a dict cannot match on the whole text."""
+    return (text
+        .replace("\u2014", "-")
+        .replace("\u2013", "-")
+        .replace("\u2018", "'")
+        .replace("\u2019", "'")
+        .replace("\u201c", '"')
+        .replace("\u201d", '"')
+        .replace("\u2026", "...")
+        .replace("\u2022", "*")
+        .replace("\u2192", "->")
+        .replace("\u2190", "<-")
+        .replace("\u2265", ">=")
+        .replace("\u2264", "<=")
+        .replace("\u20ac", "E")
+    )
+
+
+def _resolve(text):
+    out = _common(text)
+    if out.isascii() or not NOT_LATIN1.search(out):
+        return Normalized(out)
+    out = out.translate(TABLE)
+    try:
+        out.encode("latin-1")
+    except UnicodeEncodeError:
+        # Code point outside the precomputed blocks: resolve it once, keep it.
+        for char in set(out):
+            if ord(char) > 255:
+                TABLE[ord(char)] = fallback(char)
+        out = out.translate(TABLE)
+    return Normalized(out)
+
+
+_translate = lru_cache(maxsize=MEMO_SIZE)(_resolve)
+
+
+def clean(text):
+    """Replace unicode chars not supported by latin-1 core fonts."""
+    if type(text) is Normalized:
+        return text
+    if text.isascii() or not NOT_LATIN1.search(text):
+        return Normalized(text)
+    if len(text) > MEMO_MAX_LENGTH:
+        return _resolve(text)
+    return _translate(text)
+
+
+def clean_lines(text):
+    """clean() text and split it into already-normalized lines."""
+    return [Normalized(line) for line in clean(text).split("\n")]
+
+
+class _FontTable(dict):
+    """str.translate() table that keeps the code points in `charset` and
+    resolves any other one with fallback() on first use."""
+
+    def __init__(self, charset):
+        super().__init__()
+        self.charset = charset
+
+    def __missing__(self, cp):
+        repl = self[cp] = cp if cp in self.charset else fallback(chr(cp))
+        return repl
+
+
+def cleaner(charset):
+    """clean() for a font that has the code points in `charset`: other
+    characters get the latin-1 replacements; the result is Normalized."""
+    table = _FontTable(charset)
+
+    def translate(text):
+        return Normalized(text.translate(table))
+
+    memo = lru_cache(maxsize=MEMO_SIZE)(translate)
+
+    def clean_for_font(text):
+        if type(text) is Normalized or text.isascii():
+            return Normalized(text)
+        return translate(text) if len(text) > MEMO_MAX_LENGTH else memo(text)
+
+    return clean_for_font
@@ -0,0 +1,256 @@
+"""Kitchen tickets and order receipts for restaurant tenants.
+
+An order is an `orders` row as JSON (see docs/KEUKENSCHERM_ORDERS.md):
+"items" of {product_name, quantity, price, options, notes}, plus
+delivery_type, delivery_time, customer_name, customer_phone,
+customer_address, notes and total_amount. Options are names, or
+{"name", "price"} objects for paid extras and modifiers (option_choices,
+menu_items.is_modifier).
+
+A ticket is one page of roll paper, TICKET_WIDTH mm wide and exactly as
+long as its content. TicketPrinter measures every line up front with the
+glyph-width tables of metrics.py, creates the page at its final length and
+writes all lines as one text object, so no fpdf2 cell layout runs per
+line. The printer keeps what does not depend on the order (imports, glyph
+widths, the creation date) for the life of the process: generate-pdf.py
+--tickets - reads orders as JSON lines and writes each ticket as it
+arrives, in one to two milliseconds.
+"""
+
+import json
+import os
+import re
+
+from . import metrics
+from .cache import atomic_write
+from .document import creation_date
+from .pdf import VoxPDF
+from .tenant import amount, euro
+from .text import clean
+
+TICKET_WIDTH = 80  # mm, the common thermal roll
+MARGIN = 4
+KINDS = ("kitchen", "receipt")
+DELIVERY_LABELS = {"pickup": "AFHALEN", "delivery": "LEVERING"}
+# Width of the quantity column and of the amount column on a receipt (mm).
+QUANTITY_WIDTH = 9
+AMOUNT_WIDTH = 16
+K = 72 / 25.4  # points per mm
+
+
+class TicketPDF(VoxPDF):
+    """A VoxPDF page of roll paper, without the document header and footer."""
+
+    def header(self):
+        pass
+
+    def footer(self):
+        pass
+
+    def draw_lines(self, lines):
+        """Write measured lines (see TicketPrinter.lines) from the top margin
+        down, as one text object."""
+        texts, y = [], self.t_margin
+        for style, size, h, x, align, text, advance in lines:
+            if text:
+                widths = metrics.glyph_widths("helvetica" + style)
+                w = metrics.text_width(text, widths) * size / 1000 / self.k
+                left = self.l_margin + x - {"L": 0, "C": w / 2, "R": w}[align]
+                texts.append((style, size, left, y + 0.5 * h + 0.3 * size / self.k, text))
+            if advance:
+                y += h
+        self.emit_texts(texts)
+
+
+def _quantity(item):
+    """The quantity of an order item; 1 when it is not given."""
+    value = item.get("quantity")
+    return 1.0 if value is None or value == "" else float(value)
+
+
+def _options(item):
+    """(name, price) of the options of an order item."""
+    out = []
+    for option in item.get("options") or ():
+        if isinstance(option, dict):
+            out.append((str(option.get("name", "")), float(option.get("price") or 0)))
+        else:
+            out.append((str(option), 0.0))
+    return out
+
+
+def order_items(order):
+    """The items of `order`, checked: a non-empty list of objects."""
+    items = order.get("items") if isinstance(order, dict) else None
+    if not isinstance(items, list) or not items or not all(isinstance(i, dict) for i in items):
+        raise ValueError(f"order {order.get('id') if isinstance(order, dict) else order!r}:"
+                         " expected a non-empty 'items' list")
+    return items
+
+
+def ticket_number(order):
+    """Short order number printed on the ticket."""
+    return str(order.get("order_number") or str(order.get("id") or "")[:8] or "-")
+
+
+class TicketPrinter:
+    """Renders kitchen tickets and receipts; reuse one per process."""
+
+    def __init__(self, business_name=None, width=TICKET_WIDTH):
+        self.business_name = business_name
+        self.width = width
+        self.room = width - 2 * MARGIN
+        # Measured once: the glyph widths and the separator line.
+        self.widths = {style: metrics.glyph_widths("helvetica" + style) for style in ("", "B", "I")}
+        dash = self.widths[""][ord("-")] * 9 / 1000 / K
+        self.separator = "-" * int(self.room / dash)
+        self.date = creation_date()
+
+    def _wrap(self, text, width, style, size):
+        max_units = width * K * 1000 / size
+        return metrics.wrap(clean(text), max_units, self.widths[style]) or [""]
+
+    def _text(self, lines, text, style="", size=9, h=None, x=0, align="L", width=None):
+        """Append `text` wrapped to `width` (default: to the right edge)."""
+        h = h or size / 2
+        if width is None:
+            width = self.room - x if align == "L" else self.room
+        for line in self._wrap(text, width, style, size):
+            lines.append((style, size, h, x, align, line, True))
+
+    def _row(self, lines, left, amount, style="", size=9, x=0):
+        """Wrapped `left` text with `amount` right-aligned on its first line."""
+        h = size / 2
+        wrapped = self._wrap(left, self.room - x - AMOUNT_WIDTH, style, size)
+        lines.append((style, size, h, self.room, "R", amount, False))
+        for line in wrapped:
+            lines.append((style, size, h, x, "L", line, True))
+
+    def _rule(self, lines):
+        lines.append(("", 9, 4, 0, "L", self.separator, True))
+
+    def _head(self, lines, order, title):
+        name = order.get("business_name") or self.business_name
+        if name:
+            self._text(lines, name, "B", 11, 6, self.room / 2, "C")
+        self._text(lines, f"{title} #{ticket_number(order)}", "B", 14, 8, self.room / 2, "C")
+        delivery = DELIVERY_LABELS.get(order.get("delivery_type"), "AFHALEN")
+        when = order.get("delivery_time")
+        self._text(lines, f"{delivery} {when}" if when else delivery, "B", 11, 6, self.room / 2, "C")
+
+    def lines(self, order, kind="kitchen"):
+        """Measured lines of a ticket: (style, size, height, x, align, text,
+        advance), with x in mm from the left margin and the alignment
+        relative to x; lines that do not advance share the next line's row."""
+        if kind not in KINDS:
+            raise ValueError(f"unknown ticket kind {kind!r} (expected {', '.join(KINDS)})")
+        items = order_items(order)
+        lines = []
+        self._head(lines, order, "KEUKEN" if kind == "kitchen" else "BESTELLING")
+        if order.get("customer_name"):
+            self._text(lines, order["customer_name"], "B", 10)
+        if order.get("customer_phone"):
+            self._text(lines, order["customer_phone"])
+        if order.get("delivery_type") == "delivery" and order.get("customer_address"):
+            self._text(lines, order["customer_address"])
+        self._rule(lines)
+        subtotal = 0.0
+        for item in items:
+            quantity = _quantity(item)
+            options = _options(item)
+            name = str(item.get("product_name") or item.get("name") or "?")
+            if kind == "kitchen":
+                lines.append(("B", 12, 6, 0, "L", f"{quantity:g}x", False))
+                self._text(lines, name, "B", 12, x=QUANTITY_WIDTH)
+                for option, _ in options:
+                    self._text(lines, "+ " + option, "", 10, x=QUANTITY_WIDTH + 2)
+            else:
+                unit = float(item.get("price") or 0) + sum(price for _, price in options)
+                subtotal += quantity * unit
+                self._row(lines, f"{quantity:g}x {name}", amount(quantity * unit))
+                for option, price in options:
+                    label = f"+ {option}" + (f" ({amount(price)})" if price else "")
+                    self._text(lines, label, "", 8, x=4)
+            if item.get("notes"):
+                self._text(lines, "! " + str(item["notes"]), "I", 10 if kind == "kitchen" else 8,
+                           x=QUANTITY_WIDTH + 2 if kind == "kitchen" else 4)
+        self._rule(lines)
+        if kind == "receipt":
+            total = order.get("total_amount")
+            total = subtotal if total is None else float(total)
+            fee = order.get("delivery_fee")
+            if fee is None and order.get("delivery_type") == "delivery":
+                fee = max(0.0, round(total - subtotal, 2))  # not a discount
+            self._row(lines, "Subtotaal", amount(subtotal))
+            if fee:
+                self._row(lines, "Bezorgkosten", amount(float(fee)))
+            self._row(lines, "TOTAAL", euro(total), "B", 11)
+            self._rule(lines)
+        if order.get("notes"):
+            self._text(lines, "Opmerking: " + str(order["notes"]), "I", 10 if kind == "kitchen" else 8)
+        if order.get("created_at"):
+            self._text(lines, str(order["created_at"]).replace("T", " ")[:16], "", 8,
+                       x=self.room / 2, align="C")
+        return lines
+
+    def render(self, order, kind="kitchen"):
+        """PDF bytes of the `kind` ticket for `order`."""
+        lines = self.lines(order, kind)
+        height = 2 * MARGIN + sum(line[2] for line in lines if line[6])
+        pdf = TicketPDF(format=(self.width, height))
+        pdf.set_creation_date(self.date)
+        pdf.set_margins(MARGIN, MARGIN, MARGIN)
+        pdf.set_auto_page_break(False)
+        pdf.add_page()
+        pdf.draw_lines(lines)
+        return bytes(pdf.output())
+
+
+def ticket_name(order, kind):
+    """File name of a ticket; order numbers repeat between businesses, so
+    the business id goes in front when the order has one."""
+    business = re.sub(r"[^\w.-]", "_", str(order.get("business_id") or ""))
+    return f"ticket-{business + '-' if business else ''}{ticket_number(order)}-{kind}.pdf"
+
+
+def _order_lines(lines):
+    for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield line.strip()  # not an order: print_tickets() skips it
+
+
+def read_orders(source):
+    """Orders from a JSON object or array, or from JSON lines (one order per
+    line, read as they arrive when `source` is a stream)."""
+    if hasattr(source, "readline"):
+        yield from _order_lines(source)
+        return
+    with open(source, encoding="utf-8") as f:
+        if str(source).endswith(".json"):
+            data = json.load(f)
+            yield from data if isinstance(data, list) else [data]
+            return
+        yield from _order_lines(f)
+
+
+def print_tickets(orders, out_dir, kinds=KINDS, printer=None, log=print):
+    """Write the `kinds` tickets of every order in `orders` to `out_dir`, in
+    one warm process; returns the number of files written."""
+    printer = printer or TicketPrinter()
+    os.makedirs(out_dir, exist_ok=True)
+    count = 0
+    for order in orders:
+        for kind in kinds:
+            try:
+                data = printer.render(order, kind)
+            except (TypeError, ValueError) as e:
+                log(f"Skipped: {e}")
+                break
+            path = os.path.join(out_dir, ticket_name(order, kind))
+            atomic_write(path, data)
+            log(path)
+            count += 1
+    return count
@@ -0,0 +1,233 @@
+"""Call transcripts as an archive document, streamed from a table dump.
+
+Rows of the conversations table are read one at a time (stream.read_rows).
+A transcript is the ElevenLabs list of turns ({role, message,
+time_in_call_secs}), that list as a JSON string, or plain text with one
+"Speaker: text" turn per line.
+
+Turns are wrapped word by word with metrics.iter_wrap() and drawn a page
+at a time; finished pages go to disk through stream.PageWriter. Neither a
+long transcript nor a month of calls is ever held as a list of wrapped
+lines. The words of every drawn page go into an inverted index, term ->
+page numbers, which ends the document as a back-of-book index.
+"""
+
+import json
+import os
+import re
+import tempfile
+from itertools import groupby, islice
+
+from . import metrics
+from .document import creation_date
+from .stream import PageWriter, _streaming_pdf_class, read_rows
+from .text import clean
+
+SPEAKERS = {"agent": "Agent", "assistant": "Agent", "user": "Klant", "customer": "Klant"}
+LINE_HEIGHT = 4.5
+# Width of the speaker column left of the turns (mm).
+SPEAKER_WIDTH = 22
+LABEL_SIZE = 8
+LABEL_COLOR = "0.196 0.196 0.314 rg"  # (50, 50, 80)
+TERM = re.compile(r"[^\W\d_]{4,}")
+# Frequent words of four letters or more that would fill the index.
+STOPWORDS = frozenset("""
+    aan alle alleen allemaal andere beetje bent bijvoorbeeld daar daarna daarom dank
+    dankjewel dankuwel dan dat deze dit doen door echt eens even geen gewoon goed
+    graag heb hebben heeft hier hierbij hallo hoor jullie kunnen kunt maar mijn
+    misschien moet moeten mogelijk naar niet niets nog onze ook over sorry toch
+    tot uitstekend voor waar want wat welke wordt worden zeker zijn zou zouden
+    zullen about also been could from have hello here just know like okay please
+    really sure thank thanks that their them then there they this want what when
+    which will with would your
+""".split())
+SEGMENT = re.compile(r"^\s*([^:\n]{1,20}):\s*(.*)$")
+
+
+def turns(transcript):
+    """(speaker, seconds or None, text) of every turn of `transcript`."""
+    if isinstance(transcript, str) and transcript.lstrip().startswith("["):
+        try:
+            transcript = json.loads(transcript)
+        except ValueError:
+            pass
+    if isinstance(transcript, list):
+        for turn in transcript:
+            if isinstance(turn, dict) and turn.get("message"):
+                role = str(turn.get("role") or "")
+                yield (SPEAKERS.get(role.lower(), role.capitalize()),
+                       turn.get("time_in_call_secs"), str(turn["message"]))
+        return
+    for line in str(transcript or "").splitlines():
+        m = SEGMENT.match(line)
+        if m:
+            speaker = m.group(1).strip()
+            yield SPEAKERS.get(speaker.lower(), speaker), None, m.group(2)
+        elif line.strip():
+            yield "", None, line
+
+
+def _clock(seconds):
+    """`seconds` as m:ss, or None when it is not a number."""
+    try:
+        seconds = int(float(seconds))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def select_calls(rows, business=None, month=None):
+    """The `rows` of one business (id) and/or one month (YYYY-MM)."""
+    for row in rows:
+        if business and str(row.get("business_id")) != business:
+            continue
+        if month and not str(row.get("created_at") or "").startswith(month):
+            continue
+        yield row
+
+
+class TermIndex:
+    """Inverted index: term -> pages it appears on, in order."""
+
+    def __init__(self):
+        self.pages = {}
+
+    def add(self, lines, page):
+        for line in lines:
+            for term in TERM.findall(line.lower()):
+                if term not in STOPWORDS:
+                    pages = self.pages.setdefault(term, [])
+                    if not pages or pages[-1] != page:
+                        pages.append(page)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def entries(self):
+        """(term, "3-5, 9") in alphabetical order."""
+        for term in sorted(self.pages):
+            ranges, pages = [], self.pages[term]
+            start = pages[0]
+            for prev, page in zip(pages, pages[1:] + [None]):
+                if page != prev + 1:
+                    ranges.append(str(start) if start == prev else f"{start}-{prev}")
+                    start = page
+            yield term, ", ".join(ranges)
+
+
+def draw_lines(pdf, lines, h, x, index=None):
+    """Draw the normalized `lines` (any iterable) at `x`, a page of them at a
+    time; their words go into `index` under the page they land on."""
+    lines = iter(lines)
+    for first in lines:
+        pdf._perform_page_break_if_need_be(h)
+        room = max(1, int((pdf.page_break_trigger - pdf.y) / h + 1e-9))
+        batch = [first, *islice(lines, room - 1)]
+        pdf.x = x
+        pdf._text_run(batch, h)
+        if index is not None:
+            index.add(batch, pdf.page_no())
+
+
+def _wrapped(pdf, text, x):
+    """Lines of `text` in the current font from `x` to the right margin."""
+    max_units = (pdf.w - pdf.r_margin - x - 2 * pdf.c_margin) * pdf.k * 1000 / pdf.font_size_pt
+    words = (m.group() for m in re.finditer(r"\S+", clean(text)))
+    return metrics.iter_wrap(words, max_units, pdf.glyph_widths())
+
+
+def _label(pdf, text):
+    """A speaker label in the left column of the current line, written as
+    plain text operators: a cell per turn would cost more than the turn."""
+    baseline = pdf.y + 0.5 * LINE_HEIGHT + 0.3 * LABEL_SIZE / pdf.k
+    pdf._out(f"q {LABEL_COLOR}")
+    pdf.emit_texts([("B", LABEL_SIZE, pdf.l_margin + pdf.c_margin, baseline, text)])
+    pdf._out("Q")
+
+
+def draw_call(pdf, row, index):
+    """One conversation: heading, facts, summary and transcript."""
+    when = str(row.get("created_at") or "").replace("T", " ")[:16]
+    heading = " - ".join(str(v) for v in (when, row.get("customer_phone")) if v) or "Gesprek"
+    if pdf.will_page_break(11 + 2 * LINE_HEIGHT):
+        pdf.add_page()
+    pdf.sub_header(heading)
+    duration = _clock(row["duration_seconds"]) if row.get("duration_seconds") else None
+    facts = [f"Duur {duration}" if duration else None,
+             row.get("status"), row.get("elevenlabs_conversation_id")]
+    pdf.set_font("Helvetica", "", 8)
+    pdf.set_text_color(120, 120, 120)
+    draw_lines(pdf, [clean(" - ".join(str(f) for f in facts if f))], 4, pdf.l_margin)
+    if row.get("summary"):
+        pdf.set_font("Helvetica", "I", 9)
+        pdf.set_text_color(60, 60, 80)
+        draw_lines(pdf, _wrapped(pdf, row["summary"], pdf.l_margin), LINE_HEIGHT, pdf.l_margin, index)
+        pdf.ln(1.5)
+    x = pdf.l_margin + SPEAKER_WIDTH
+    pdf.set_font("Helvetica", "", 9)
+    pdf.set_text_color(30, 30, 30)
+    for speaker, seconds, text in turns(row.get("transcript")):
+        pdf._perform_page_break_if_need_be(LINE_HEIGHT)
+        label = " ".join(s for s in (speaker, _clock(seconds)) if s)
+        if label:
+            _label(pdf, clean(label))
+        draw_lines(pdf, _wrapped(pdf, text, x), LINE_HEIGHT, x, index)
+        pdf.ln(1)
+
+
+def draw_index(pdf, index):
+    """The back-of-book index: terms by first letter, with their pages."""
+    pdf.add_page()
+    pdf.section_header("Index")
+    for letter, entries in groupby(index.entries(), key=lambda entry: entry[0][0]):
+        if pdf.will_page_break(7 + LINE_HEIGHT):
+            pdf.add_page()
+        pdf.set_font("Helvetica", "B", 10)
+        pdf.set_text_color(50, 50, 80)
+        pdf.cell(0, 7, clean(letter.upper()))
+        pdf.ln(7)
+        pdf.set_font("Helvetica", "", 8.5)
+        pdf.set_text_color(30, 30, 30)
+        draw_lines(pdf, (line for term, pages in entries
+                         for line in _wrapped(pdf, f"{term} {pages}", pdf.l_margin)),
+                   4, pdf.l_margin)
+
+
+def stream_transcripts(rows, out=None, title=None):
+    """Render the conversation `rows` (dicts) with a term index at the end.
+
+    `out` is a path or binary file object; with out=None the PDF is spilled
+    to a temporary file and returned as bytes. Returns (calls, pages) when
+    writing to `out`.
+    """
+    if out is None:
+        with tempfile.TemporaryFile() as tmp:
+            stream_transcripts(rows, tmp, title)
+            tmp.seek(0)
+            return tmp.read()
+    if not hasattr(out, "write"):
+        with open(out, "wb") as fh:
+            return stream_transcripts(rows, fh, title)
+
+    pdf = _streaming_pdf_class()()
+    pdf.set_creation_date(creation_date())
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.writer = PageWriter(out, pdf.w_pt, pdf.h_pt)
+    pdf.add_page()
+    pdf.section_header(title or "Gesprekstranscripten")
+    index, calls = TermIndex(), 0
+    for row in rows:
+        draw_call(pdf, row, index)
+        calls += 1
+    if index:
+        draw_index(pdf, index)
+    pdf.finish()
+    return calls, pdf.writer.pages
+
+
+def export_transcripts(path, out=None, business=None, month=None):
+    """Stream the transcripts in a conversations dump (JSONL or CSV) to a
+    PDF, optionally of one business and/or month only."""
+    title = f"Gesprekstranscripten ({os.path.basename(str(path))}"
+    title += "".join(f", {v}" for v in (business, month) if v) + ")"
+    return stream_transcripts(select_calls(read_rows(path), business, month), out, title)
@@ -0,0 +1,130 @@
+"""generate-pdf.py --watch: rebuild a document whenever its inputs change.
+
+The spec file, the source files its generated sections are built from
+(DocumentSpec.inputs), its images and its fonts are polled with os.stat()
+every POLL_INTERVAL seconds; nothing is read until a stamp changes. A
+change recompiles the spec in this process, where fpdf2 is already
+imported and the templates are recorded.
+
+Sections are drawn in the page groups of the parallel renderer (see
+parallel.py), and the page streams of every group are kept under the
+digests of its sections (DocumentSpec.section_digests). After an edit only
+the groups whose sections changed are drawn again; the document is
+stitched from the kept streams of the others. Specs that are not
+DocumentSpec.splittable are rendered whole.
+"""
+
+import os
+import time
+
+from .cache import BuildCache, atomic_write
+from .sources import REPO_ROOT
+from .spec import compile_spec, parse_spec
+
+POLL_INTERVAL = 0.3
+
+
+def stamps(paths):
+    """{path: (mtime_ns, size)} of the `paths` that exist."""
+    out = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        out[os.fspath(path)] = (st.st_mtime_ns, st.st_size)
+    return out
+
+
+def spec_files(spec_path, spec=None):
+    """The spec file and, once it compiled, every file `spec` was built from."""
+    yield spec_path
+    if spec is not None:
+        for pattern in spec.inputs:
+            yield from REPO_ROOT.glob(pattern)
+        for path, _, _ in spec.images:
+            yield path
+        yield from spec.fonts
+
+
+class SectionCache:
+    """Page streams of rendered section groups, under their section digests."""
+
+    def __init__(self):
+        self.groups = {}
+
+    def render(self, spec):
+        """(VoxPDF, groups drawn, groups in total) for `spec`."""
+        from .document import render
+        from .parallel import _render_group, group_names, stitch, toc_depths
+
+        if not spec.splittable or not spec.section_digests:
+            return render(spec), 1, 1
+        kept, results, drawn = {}, [], 0
+        all_names = group_names(spec)
+        for names, depth in zip(all_names, toc_depths(spec, all_names)):
+            key = (spec.language, depth, *(spec.section_digests[name] for name in names))
+            if spec.toc and spec.toc[0] in names:
+                key += spec.toc  # the entries it reserves pages for
+            result = kept.get(key) or self.groups.get(key)
+            if result is None:
+                result = _render_group([spec.sections[name] for name in names],
+                                       spec.language, depth)
+                drawn += 1
+            kept[key] = result
+            results.append(result)
+        self.groups = kept
+        return stitch(spec, results), drawn, len(results)
+
+
+def _wait(files, seen, interval):
+    """Poll until the stamps of `files()` differ from `seen`; returns them."""
+    while True:
+        current = stamps(files())
+        if current != seen:
+            return current
+        time.sleep(interval)
+
+
+def watch(spec_path, output, sections=None, language=None, font=None,
+          interval=POLL_INTERVAL, log=print):
+    """Build `output` from the spec at `spec_path`, then again after every
+    change to the spec or its inputs, until interrupted."""
+    spec_path = os.path.abspath(os.fspath(spec_path))
+    output = os.path.abspath(os.fspath(output))
+    cache, spec, seen = SectionCache(), None, None
+    while True:
+        seen = _wait(lambda: spec_files(spec_path, spec), seen, interval)
+        start = time.perf_counter()
+        try:
+            spec = compile_spec(parse_spec(spec_path), where=spec_path,
+                                language=language, font=font)
+            if sections is not None:
+                spec = spec.select(sections)
+            pdf, drawn, total = cache.render(spec)
+            atomic_write(output, bytes(pdf.output()))
+        except (OSError, ValueError) as e:
+            log(f"Not rebuilt: {e}")
+        else:
+            log(f"PDF updated: {output} ({drawn}/{total} page groups drawn,"
+                f" {(time.perf_counter() - start) * 1e3:.0f} ms)")
+        # Files the new spec reads for the first time count as seen now;
+        # the others keep their stamps from before the build, so an edit
+        # made during the build triggers the next one.
+        seen = {path: seen.get(path, stamp)
+                for path, stamp in stamps(spec_files(spec_path, spec)).items()}
+
+
+def watch_markdown(paths, out_dir=None, font=None, interval=POLL_INTERVAL, log=print):
+    """render_markdown() the files in `paths` whenever one is added or changed."""
+    from .markdown import markdown_files, render_markdown
+
+    cache, seen = BuildCache(), {}
+    while True:
+        current = _wait(lambda: markdown_files(paths), seen, interval)
+        changed = [path for path, stamp in current.items() if seen.get(path) != stamp]
+        seen = current
+        try:
+            render_markdown(changed, out_dir, cache, log, font)
+        except (OSError, ValueError) as e:
+            log(f"Not rebuilt: {e}")